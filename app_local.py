@@ -6,20 +6,73 @@ from flask import (
     Response, abort, send_from_directory
 )
 from werkzeug.exceptions import HTTPException
-from core.ffmpeg_processor import generate_final_video, group_images_by_prefix
-import os, tempfile, uuid, logging, threading, time, json, shutil
+from core.ffmpeg_processor import (
+    generate_final_video, generate_multi_video, group_images_by_prefix, parse_target
+)
+from core import adaptive, capacity, cost, jobqueue, jobstore, metrics, perflog, preflight, probe, profiles
+from core.hls import HlsWriter
+from core.plan import make_plan
+from core.scheduler import JobScheduler, job_cost
+import os, tempfile, uuid, logging, threading, time, json, shutil, importlib, signal
 from datetime import datetime, timedelta, timezone
 from flask_cors import CORS
 
+# renderer plugável: RENDERER=modulo:funcao (ex.: bench.stub_renderer:render
+# nos testes de carga — mesma assinatura de generate_final_video)
+_render = generate_final_video
+if os.environ.get("RENDERER"):
+    _mod, _fn = os.environ["RENDERER"].split(":")
+    _render = getattr(importlib.import_module(_mod), _fn)
+
 # ───────────────────────── CONTROLE DE PROGRESSO ──────────────────────────
 progress_data: dict[str, dict] = {}            # session_id → estado
 _progress_lock = threading.Lock()
 
 def _set_progress(session_id: str, **kwargs):
-    """Atualiza (com lock) o dicionário progress_data."""
+    """Atualiza (com lock) o dicionário progress_data (e a fila, se houver)."""
     with _progress_lock:
         progress_data.setdefault(session_id, {})
         progress_data[session_id].update(kwargs)
+    if QUEUE:
+        QUEUE.progress(session_id, kwargs)
+
+def _active_jobs(exclude: str | None = None) -> int:
+    """Jobs ainda não concluídos (fila + em processamento)."""
+    if QUEUE:                                     # todos os workers da fila
+        d = QUEUE.depth()
+        return max(0, d["queued"] + d["running"] - (1 if exclude else 0))
+    with _progress_lock:
+        return sum(1 for sid, st in progress_data.items()
+                   if sid != exclude and not st.get("completed")
+                   and st.get("status") != "awaiting_confirmation")
+
+def _queue_positions(positions: dict):
+    for sid, pos in positions.items():
+        _set_progress(sid, queue_position=pos)
+
+# prévias aguardando o usuário liberar o render completo
+_confirm: dict[str, dict] = {}                 # session_id → {event, render}
+
+def _await_confirmation(session_id: str, timeout: float) -> bool:
+    """Bloqueia o job até POST /confirm/<id>; False se recusado ou expirado."""
+    if QUEUE:                                     # /confirm chega em outro processo
+        _set_progress(session_id, status="awaiting_confirmation", confirm_render=None,
+                      message="Confira a prévia e confirme o render completo")
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            answer = QUEUE.get(session_id).get("confirm_render")
+            if answer is not None:
+                return bool(answer)
+            time.sleep(1)
+        return False
+    ev = threading.Event()
+    with _progress_lock:
+        _confirm[session_id] = {"event": ev, "render": False}
+    _set_progress(session_id, status="awaiting_confirmation",
+                  message="Confira a prévia e confirme o render completo")
+    ev.wait(timeout)
+    with _progress_lock:
+        return _confirm.pop(session_id)["render"]
 # ──────────────────────────────────────────────────────────────────────────
 
 app = Flask(__name__)
@@ -29,8 +82,11 @@ app.config['MAX_CONTENT_LENGTH'] = 512 * 1024 * 1024  # 512 MB
 CORS(app, resources={
     r"/get_signed_url": {"origins": "*"},
     r"/create_video":   {"origins": "*"},
+    r"/estimate":       {"origins": "*"},
     r"/progress/*":     {"origins": "*"},
-    r"/download/*":     {"origins": "*"}
+    r"/confirm/*":      {"origins": "*"},
+    r"/download/*":     {"origins": "*"},
+    r"/hls/*":          {"origins": "*"}
 })
 
 # ───────────────────────── HANDLERS DE ERRO BÁSICOS ───────────────────────
@@ -53,6 +109,21 @@ logger = logging.getLogger(__name__)
 LOCAL_STORAGE_DIR = os.path.join(os.getcwd(), "local_storage")
 UPLOADS_DIR = os.path.join(LOCAL_STORAGE_DIR, "uploads")
 VIDEOS_DIR = os.path.join(LOCAL_STORAGE_DIR, "videos")
+PRESCALE_DEFAULT = os.environ.get("PRESCALE_IMAGES", "0") == "1"   # reduz fotos gigantes antes do encode
+DEDUP_DEFAULT    = os.environ.get("DEDUP_IMAGES", "0") == "1"     # funde imagens repetidas seguidas (core.dedup)
+RENDER_ENGINE    = os.environ.get("RENDER_ENGINE", "blocks")      # "blocks" | "graph" | "pyav" | "distributed"
+RENDER_CHUNKS    = int(os.environ.get("RENDER_CHUNKS", "1"))      # trechos paralelos por bloco
+ADAPTIVE_PRESET  = os.environ.get("ADAPTIVE_PRESET", "0") == "1"  # preset conforme a fila (sem perfil fixado)
+PREVIEW_TIMEOUT  = float(os.environ.get("PREVIEW_CONFIRM_TIMEOUT", "3600"))  # s aguardando confirmação
+HLS_DEFAULT      = os.environ.get("HLS_OUTPUT", "0") == "1"      # playback durante o render
+MAX_JOBS         = int(os.environ.get("MAX_CONCURRENT_JOBS",
+                                      max(1, (os.cpu_count() or 2) // 2)))  # renders simultâneos
+PREVIEW_MODES    = {False: None, None: None, True: "auto", "auto": "auto", "confirm": "confirm"}
+scheduler        = JobScheduler(MAX_JOBS, _queue_positions)
+DRAIN_TIMEOUT    = float(os.environ.get("DRAIN_TIMEOUT_S", "8"))   # s esperando jobs no SIGTERM
+JOBS = (jobstore.LocalJobStore(os.path.join(LOCAL_STORAGE_DIR, "jobs"))   # estado durável
+        if os.environ.get("DURABLE_JOBS", "0") == "1" else None)
+QUEUE = jobqueue.open_queue(os.environ.get("RENDER_QUEUE"))   # None: render neste processo
 
 # Criar diretórios se não existirem
 os.makedirs(UPLOADS_DIR, exist_ok=True)
@@ -72,6 +143,92 @@ def generate_local_signed_url(filename):
     # Retorna uma URL local que será interceptada pelo nosso endpoint
     return f"http://localhost:8082/local_upload/{unique_filename}", unique_filename
 
+def _publish(path: str, key: str, name: str) -> str:
+    """Copia `path` para VIDEOS_DIR/<key>.mp4; devolve a URL local de download."""
+    shutil.copy2(path, os.path.join(VIDEOS_DIR, f'{key}.mp4'))
+    metrics.BYTES.inc(os.path.getsize(path), direction="upload")
+    return f"http://localhost:8082/download/{key}"
+
+def _audio_seconds(name: str) -> float:
+    """Duração de um áudio já enviado (para o /estimate)."""
+    if name.startswith('/') or '..' in name or '\\' in name:
+        raise ValueError("Nome de arquivo inválido")
+    path = os.path.join(UPLOADS_DIR, name)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Áudio não encontrado: {name}")
+    return probe.duration(path)
+
+def _job_cost(data: dict) -> float:
+    """Custo p/ o scheduler: imagens × duração do áudio × grupos."""
+    imgs = data['image_filenames']
+    try:
+        groups = len(group_images_by_prefix(imgs))
+    except (IndexError, ValueError):
+        groups = 1
+    audio_s = data.get('audio_seconds')
+    if audio_s is None and data.get('audio_filename'):
+        try:
+            audio_s = _audio_seconds(data['audio_filename'])
+        except (ValueError, OSError, RuntimeError):
+            audio_s = None                          # preflight reporta depois
+    return job_cost(len(imgs), float(audio_s or 60), groups)
+
+def _hls_publisher(session_id: str):
+    """publish(path) do HlsWriter: segmentos e playlist em VIDEOS_DIR/<id>/hls/."""
+    dst = os.path.join(VIDEOS_DIR, session_id, "hls")
+    os.makedirs(dst, exist_ok=True)
+
+    def publish(path: str):
+        name = os.path.basename(path)
+        shutil.copy2(path, os.path.join(dst, name + ".tmp"))
+        os.replace(os.path.join(dst, name + ".tmp"), os.path.join(dst, name))
+        metrics.BYTES.inc(os.path.getsize(path), direction="upload")
+        if name.endswith('.m3u8'):
+            _set_progress(session_id, hls_url=f"/hls/{session_id}/{name}")
+    return publish
+
+# ╭──────────────────────────── JOBS DURÁVEIS ═════════════════════════════╮
+# estado em jobs/<id>/ (core.jobstore): um worker reciclado ou uma instância
+# desligada deixa o job "interrupted" e outro processo o retoma do último
+# bloco salvo
+def _job_phase(session_id: str, phase: str, **fields):
+    if JOBS:
+        JOBS.update(session_id, phase=phase, **fields)
+
+def _job_done(session_id: str):
+    if JOBS:
+        JOBS.finish(session_id)
+
+def _resume_job(state: dict):
+    """Job órfão adotado por este processo: volta à fila com o mesmo id."""
+    sid = state["id"]
+    _set_progress(sid, status="queued", progress=0, completed=False, resumed=True)
+    scheduler.submit(sid, state.get("client"), _job_cost(state["spec"]),
+                     process_video_local, state["spec"], sid)
+
+def start_jobs():
+    """Heartbeat + adoção de órfãos neste processo (idempotente; pós-fork).
+    Com RENDER_QUEUE quem retoma jobs é a fila (core.jobqueue)."""
+    if JOBS and not QUEUE:
+        JOBS.start(_resume_job)
+
+def drain(timeout: float = DRAIN_TIMEOUT):
+    """SIGTERM/reciclagem: não inicia mais jobs, espera os ativos até
+    `timeout` s e deixa o resto marcado para retomada."""
+    left = scheduler.drain(timeout)
+    if JOBS:
+        JOBS.interrupt()
+    perflog.flush()
+    logger.info("🛑 Worker drenado (%d job(s) em andamento ficam para retomada)", left)
+
+def _sigterm(signum, frame):
+    drain()
+    raise SystemExit(0)
+
+# hooks do gunicorn.conf.py (post_worker_init / worker_exit)
+app.extensions["durable_jobs"] = {"start": start_jobs, "drain": drain}
+# ╰─────────────────────────────────────────────────────────────────────────╯
+
 # ╭─────────────────────────── GET SIGNED URL ══════════════════════════════╮
 @app.route("/get_signed_url", methods=["POST"])
 def get_signed_url():
@@ -116,13 +273,18 @@ def progress_stream(session_id):
     def event_stream():
         last = None
         while True:
-            with _progress_lock:
-                snap = progress_data.get(session_id, {}).copy()
+            if QUEUE:                             # progresso gravado pelo worker
+                snap = QUEUE.get(session_id)
+            else:
+                with _progress_lock:
+                    snap = progress_data.get(session_id, {}).copy()
 
             if snap and snap != last:
                 yield f"data: {json.dumps(snap)}\n\n"
                 last = snap
                 if snap.get("completed"):
+                    if QUEUE:
+                        QUEUE.forget(session_id)
                     with _progress_lock:
                         progress_data.pop(session_id, None)
                     break
@@ -152,22 +314,102 @@ def create_video():
     if not imgs or not isinstance(imgs, list):
         return jsonify(error="image_filenames (lista) é obrigatório"), 400
 
+    profile = data.get('profile')
+    if profile is not None and profile not in profiles.PROFILES:
+        return jsonify(error=f"profile inválido (opções: {', '.join(profiles.PROFILES)})"), 400
+
+    outputs = data.get('outputs')
+    if outputs is not None:
+        try:
+            if not isinstance(outputs, list) or not outputs:
+                raise ValueError("lista vazia")
+            lbls = [parse_target(o)[0] for o in outputs]
+            if len(set(lbls)) != len(lbls):
+                raise ValueError("alvos repetidos")
+        except (ValueError, TypeError) as e:
+            return jsonify(error=f"outputs inválido: {e}"), 400
+
+    if data.get('preview') not in PREVIEW_MODES:
+        return jsonify(error="preview inválido (false | true | \"auto\" | \"confirm\")"), 400
+
     aud = data.get('audio_filename')
     for f in imgs + ([aud] if aud else []):
         if f and (f.startswith('/') or '..' in f or '\\' in f):
             return jsonify(error="Nome de arquivo inválido"), 400
 
     session_id = str(uuid.uuid4())
+    client = str(data.get('client_id') or request.headers.get('X-Client-Id')
+                 or request.remote_addr)
+    if QUEUE:                                     # render num core.worker separado
+        QUEUE.put(session_id, data, client, _job_cost(data))
     _set_progress(session_id, status="queued", progress=0, completed=False)
 
-    threading.Thread(target=process_video_local,
-                     args=(data, session_id),
-                     daemon=True).start()
+    # fila local: menor custo primeiro, justa por cliente (core.scheduler)
+    if not QUEUE:
+        if JOBS:
+            start_jobs()                          # sem gunicorn: sobe o laço aqui
+            JOBS.create(session_id, data, client)
+        scheduler.submit(session_id, client, _job_cost(data), process_video_local, data, session_id)
 
     return jsonify(session_id=session_id,
                    message="Processo do vídeo iniciado (LOCAL)"), 202
 # ╰─────────────────────────────────────────────────────────────────────────╯
 
+# ╭───────────────────────────── ESTIMATIVA ═══════════════════════════════╮
+@app.route('/estimate', methods=['POST'])
+def estimate():
+    """Dry-run: RenderPlan + tempo, tamanho e disco previstos (core.cost)."""
+    data = request.get_json(silent=True) or {}
+    imgs = data.get('image_filenames')
+    if not imgs or not isinstance(imgs, list):
+        return jsonify(error="image_filenames (lista) é obrigatório"), 400
+
+    try:
+        audio_s = data.get('audio_seconds')
+        if audio_s is None:
+            if not data.get('audio_filename'):
+                raise ValueError("audio_filename ou audio_seconds é obrigatório")
+            audio_s = _audio_seconds(data['audio_filename'])
+        plan = make_plan(group_images_by_prefix(imgs),
+                         data.get('audio_filename'),
+                         float(data.get('green_duration', 3)),
+                         data.get('aspect_ratio', '9:16'),
+                         engine=data.get('engine', RENDER_ENGINE),
+                         profile=data.get('profile'),
+                         audio_s=float(audio_s))
+    except (ValueError, IndexError, FileNotFoundError) as e:
+        return jsonify(error=str(e)), 400
+
+    est    = cost.estimate(plan)
+    active = _active_jobs()
+    cpus   = os.cpu_count() or 1
+    eta_s  = est["encode_s"] * max(1.0, (active + 1) / cpus)   # CPU dividida com a fila
+    return jsonify(plan=plan.to_dict(), estimate=est,
+                   queue_depth=active, eta_s=round(eta_s, 1))
+# ╰─────────────────────────────────────────────────────────────────────────╯
+
+# ╭───────────────────────── CONFIRMAR RENDER ══════════════════════════════╮
+@app.route("/confirm/<session_id>", methods=["POST"])
+def confirm_render(session_id):
+    """Libera (ou cancela com {"render": false}) o render após a prévia."""
+    data   = request.get_json(silent=True) or {}
+    render = bool(data.get("render", True))
+    if QUEUE:                                     # o job roda num core.worker
+        pending = QUEUE.get(session_id).get("status") == "awaiting_confirmation"
+        if pending:
+            QUEUE.progress(session_id, {"confirm_render": render})
+    else:
+        with _progress_lock:
+            pending = _confirm.get(session_id)
+            if pending:
+                pending["render"] = render
+                pending["event"].set()
+    if not pending:
+        abort(404, description="Nenhuma prévia aguardando confirmação")
+    logger.info("✅ Render completo %s (%s)", "liberado" if render else "cancelado", session_id)
+    return jsonify(session_id=session_id, render=render)
+# ╰─────────────────────────────────────────────────────────────────────────╯
+
 # ╭────────────────────────── PROCESSAMENTO LOCAL ══════════════════════════╮
 def process_video_local(data, session_id):
     def cb(pct: int, phase: str = "processing", msg: str | None = None):
@@ -177,34 +419,66 @@ def process_video_local(data, session_id):
                     message=msg,
                     completed=False)
 
+    timings = metrics.begin_job()                 # tempos por etapa deste job
+    record  = perflog.JobRecord(session_id)       # 1 linha JSONL ao final
+    if QUEUE and JOBS:                            # modo fila: este worker assume o job
+        JOBS.create(session_id, data, data.get('client_id'))
+    state   = (JOBS.load(session_id) if JOBS else None) or {}   # retomada
     try:
         images       = data['image_filenames']
         audio        = data.get('audio_filename')
         filename     = data.get('filename', 'my_video.mp4')
         aspect_ratio = data.get('aspect_ratio', '9:16')
+        prescale     = bool(data.get('prescale', PRESCALE_DEFAULT))
+        dedup        = bool(data.get('dedup', DEDUP_DEFAULT))
+        engine       = data.get('engine', RENDER_ENGINE)
+        chunks       = int(data.get('chunks', RENDER_CHUNKS))
+        profile      = data.get('profile')
+        adaptive_on  = bool(data.get('adaptive', ADAPTIVE_PRESET))
+        preview      = PREVIEW_MODES[data.get('preview')]
+        outputs      = data.get('outputs')               # vários alvos num só passe
+        hls_on       = bool(data.get('hls', HLS_DEFAULT)) and not outputs
         green_sec    = float(data.get('green_duration', 3))
 
         logger.info("📥 %d imagens; áudio: %s (LOCAL)", len(images), bool(audio))
-        _set_progress(session_id, status="downloading", progress=0)
+
+        # nomes inválidos (sem número, extensão errada) falham antes da cópia
+        names = preflight.check_names(images, audio)
+        if not names["ok"]:
+            raise preflight.PreflightError(names)
+
+        _set_progress(session_id, status="downloading", progress=0, queue_position=None)
+        _job_phase(session_id, "downloading")
 
         # ── 1. copiar arquivos locais ────────────────────────────────────
         with tempfile.TemporaryDirectory() as tmp:
-            img_paths = []
-            for fname in images:
-                src = os.path.join(UPLOADS_DIR, fname)
-                if not os.path.exists(src):
-                    raise FileNotFoundError(f"Arquivo não encontrado: {fname}")
-                dst = os.path.join(tmp, os.path.basename(fname))
-                shutil.copy2(src, dst)
-                img_paths.append(dst)
-
-            audio_path = None
-            if audio:
-                audio_src = os.path.join(UPLOADS_DIR, audio)
-                if not os.path.exists(audio_src):
-                    raise FileNotFoundError(f"Áudio não encontrado: {audio}")
-                audio_path = os.path.join(tmp, 'audio.mp3')
-                shutil.copy2(audio_src, audio_path)
+            with metrics.stage("download"):
+                img_paths = []
+                for fname in images:
+                    src = os.path.join(UPLOADS_DIR, fname)
+                    if not os.path.exists(src):
+                        raise FileNotFoundError(f"Arquivo não encontrado: {fname}")
+                    dst = os.path.join(tmp, os.path.basename(fname))
+                    shutil.copy2(src, dst)
+                    img_paths.append(dst)
+
+                audio_path = None
+                if audio:
+                    audio_src = os.path.join(UPLOADS_DIR, audio)
+                    if not os.path.exists(audio_src):
+                        raise FileNotFoundError(f"Áudio não encontrado: {audio}")
+                    audio_path = os.path.join(tmp, 'audio.mp3')
+                    shutil.copy2(audio_src, audio_path)
+
+            in_bytes = sum(os.path.getsize(f) for f in img_paths + [audio_path] if f)
+            metrics.BYTES.inc(in_bytes, direction="download")
+            record.update(images=len(img_paths), input_bytes=in_bytes)
+
+            # ── 1b. preflight: cabeçalhos, dimensões, duração ─────────
+            cb(15, "processing", "Validando arquivos…")
+            with metrics.stage("preflight"):
+                preflight.run(img_paths, audio_path,
+                              image_names=images, audio_name=audio)
 
             # 20 % — arquivos copiados
             cb(20, "processing",
@@ -212,38 +486,143 @@ def process_video_local(data, session_id):
 
             # ── 2. gerar vídeo ────────────────────────────────────────
             groups   = group_images_by_prefix(img_paths)
+            record.update(groups=len(groups), audio_s=probe.duration(audio_path),
+                          requested_profile=profile)
             out_name = filename if filename.endswith('.mp4') else f'{filename}.mp4'
             out_path = os.path.join(tmp, out_name)
 
-            generate_final_video(
-                groups, audio_path, out_path,
-                green_sec, aspect_ratio.replace(':', 'x'),
-                cb
-            )
-
-            # 90 % — salvando vídeo
+            # ── 2a. prévia rápida (480p) antes do render completo ─────
+            if preview:
+                prev_url = state.get("preview_url")      # retomada: prévia já publicada
+                if not prev_url:
+                    prev_path = os.path.join(tmp, 'preview.mp4')
+
+                    def pcb(pct: int, phase: str = "processing", msg: str | None = None):
+                        _set_progress(session_id, status="preview",
+                                      preview_progress=int(pct), message=msg)
+
+                    with metrics.stage("preview"):
+                        pcb(0, msg="Gerando prévia…")
+                        _render(
+                            groups, audio_path, prev_path,
+                            green_sec, aspect_ratio.replace(':', 'x'),
+                            pcb,
+                            prescale=prescale,
+                            dedup=dedup,
+                            engine=engine,
+                            profile="preview"
+                        )
+                    prev_url = _publish(prev_path, f'{session_id}_preview', f'preview_{out_name}')
+                    _job_phase(session_id, "preview", preview_url=prev_url)
+                _set_progress(session_id, status="preview_ready",
+                              message="Prévia pronta!", preview_url=prev_url,
+                              preview_progress=100)
+                logger.info("👀 Prévia pronta: %s", prev_url)
+
+                if preview == "confirm" and not state.get("confirmed"):
+                    held = scheduler.release()           # slot livre enquanto o usuário decide
+                    if not _await_confirmation(session_id, PREVIEW_TIMEOUT):
+                        logger.info("⏹️ Render completo não confirmado (%s)", session_id)
+                        _set_progress(session_id, status="cancelled",
+                                      message="Render completo não confirmado",
+                                      progress=100, completed=True)
+                        metrics.JOBS.inc(status="cancelled")
+                        record.finish("cancelled", timings)
+                        _job_done(session_id)
+                        return
+                    _job_phase(session_id, "confirmed", confirmed=True)
+                    if held:                             # volta à fila pelo slot
+                        _set_progress(session_id, status="queued",
+                                      message="Na fila para o render completo")
+                        scheduler.reacquire(held)
+
+            # preset/CRF conforme fila, duração estimada e prazo do job
+            # (retomada: mesmo encode das partes já salvas)
+            decision = state.get("encoder")
+            if state.get("profile_used"):
+                profile = state["profile_used"]
+            elif adaptive_on and not profile:        # perfil pedido pelo cliente é mantido
+                plan = make_plan(groups, audio_path, green_sec,
+                                 aspect_ratio.replace(':', 'x'),
+                                 "graph" if outputs else engine)
+                profile, decision = adaptive.choose(
+                    plan, _active_jobs(session_id),
+                    deadline_s=data.get('deadline_s'), outputs=len(outputs or [1]))
+                _set_progress(session_id, encoder=decision)
+            _job_phase(session_id, "rendering",
+                       profile_used=profiles.get(profile), encoder=decision)
+
+            with metrics.stage("render"):
+                targets = None
+                if outputs:
+                    # proporções/resoluções extras: um decode, split no graph
+                    labels  = [parse_target(o) for o in outputs]
+                    base    = out_name[:-4]
+                    targets = [(os.path.join(tmp, f'{base}_{lbl}.mp4'), res)
+                               for lbl, res in labels]
+                    stats = generate_multi_video(
+                        groups, audio_path, targets,
+                        green_sec, cb,
+                        prescale=prescale,
+                        profile=profile
+                    )
+                else:
+                    # HLS: segmentos publicados a cada bloco pronto
+                    hls = (HlsWriter(os.path.join(tmp, 'hls'), _hls_publisher(session_id))
+                           if hls_on else None)
+                    stats = _render(
+                        groups, audio_path, out_path,
+                        green_sec, aspect_ratio.replace(':', 'x'),
+                        cb,
+                        prescale=prescale,
+                        dedup=dedup,
+                        engine=engine,
+                        chunks=chunks,
+                        profile=profile,
+                        hls=hls,
+                        checkpoint=JOBS.checkpoint(session_id) if JOBS else None
+                    )
+            stats["encoder"] = decision
+            record.stats(stats)
+
+            # 90 % — salvando vídeo (cada saída separada)
             cb(90, "uploading", "Salvando vídeo…")
 
-            # Salvar vídeo final
-            final_video_path = os.path.join(VIDEOS_DIR, f'{session_id}.mp4')
-            shutil.copy2(out_path, final_video_path)
-
-            # URL de download local
-            download_url = f"http://localhost:8082/download/{session_id}"
+            with metrics.stage("upload"):
+                if targets:
+                    results = []
+                    for (lbl, res), (path, _) in zip(labels, targets):
+                        name = os.path.basename(path)
+                        results.append({"label": lbl, "resolution": list(res),
+                                        "filename": name,
+                                        "download_url": _publish(path, f'{session_id}_{lbl}', name)})
+                        _set_progress(session_id, outputs=list(results))
+                    download_url, out_name = results[0]["download_url"], results[0]["filename"]
+                else:
+                    download_url = _publish(out_path, session_id, out_name)
 
         _set_progress(session_id,
                       status="completed",
                       message="Video ready!",
                       download_url=download_url,
                       filename=out_name,
+                      stats=stats,
+                      timings=timings,
                       progress=100,
                       completed=True)
+        metrics.JOBS.inc(status="completed")
+        record.finish("completed", timings)
+        _job_done(session_id)
         logger.info("🎉 Vídeo pronto (LOCAL): %s", download_url)
 
     except Exception as e:
         logger.exception("❌ Erro no processamento (LOCAL)")
         _set_progress(session_id,
-                      status="error", message=str(e), completed=True)
+                      status="error", message=str(e), completed=True,
+                      preflight=getattr(e, "report", None), timings=timings)
+        metrics.JOBS.inc(status="error")
+        record.finish("error", timings, error=str(e))
+        _job_done(session_id)
 # ╰─────────────────────────────────────────────────────────────────────────╯
 
 # ╭──────────────────────— ROTAS DE ARQUIVOS ESTÁTICOS —────────────────────╮
@@ -260,6 +639,17 @@ def favicon():                     return send_from_directory('static', 'favicon
 def vite_client():                 return '', 204
 # ╰─────────────────────────────────────────────────────────────────────────╯
 
+# ╭──────────────────────────── HLS PROGRESSIVO ════════════════════════════╮
+@app.route("/hls/<session_id>/<name>")
+def hls_file(session_id, name):
+    """Playlist e segmentos HLS gravados durante o render."""
+    resp = send_from_directory(os.path.join(VIDEOS_DIR, session_id, "hls"), name)
+    if name.endswith(".m3u8"):
+        resp.headers["Cache-Control"] = "no-cache"
+        resp.mimetype = "application/vnd.apple.mpegurl"
+    return resp
+# ╰─────────────────────────────────────────────────────────────────────────╯
+
 # ╭────────────────────────── DOWNLOAD DE VÍDEO ════════════════════════════╮
 @app.route("/download/<session_id>", methods=["GET"])
 def download_video(session_id):
@@ -278,6 +668,18 @@ def list_videos():
     videos = [f for f in os.listdir(VIDEOS_DIR) if f.endswith('.mp4')]
     return jsonify(videos)
 
+@app.route("/metrics")
+def metrics_endpoint():
+    """Métricas no formato texto do Prometheus."""
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+@app.route("/ready")
+def ready_check():
+    """Prontidão (LB/autoscaler): 503 quando a instância não aceita mais jobs."""
+    ok, rep = capacity.report(QUEUE.depth() if QUEUE else scheduler.snapshot(),
+                              local=not QUEUE)
+    return jsonify(rep), 200 if ok else 503
+
 @app.route("/health")
 def health_check():
     return jsonify(status="healthy",
@@ -292,4 +694,7 @@ if __name__ == "__main__":
     print("🎬 Processamento real de vídeo com FFmpeg")
     print("📊 Server-Sent Events para progresso")
     print("=" * 50)
+    signal.signal(signal.SIGTERM, _sigterm)
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":     # processo filho do reloader
+        start_jobs()
     app.run(host="0.0.0.0", port=8082, debug=True)
\ No newline at end of file
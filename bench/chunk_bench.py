@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Benchmark do encode em chunks paralelos de um bloco (_make_block chunks=K)
+
+Para cada nº de núcleos (via sched_setaffinity, herdado pelos ffmpeg filhos)
+mede o tempo com K = 1, 2, 4, … chunks e reporta o speedup sobre K = 1.
+Também confere que os timestamps dos frames são idênticos ao encode único.
+
+Uso:
+    python -m bench.chunk_bench --images 200 --audio 300 --cores 1,2,4
+"""
+import argparse, json, os, subprocess, tempfile, time
+
+from core import ffmpeg_processor as fp
+from bench.synth import make_audio, make_images
+
+
+def frame_pts(path: str) -> list[str]:
+    out = subprocess.check_output(
+        ["ffprobe", "-v", "error", "-select_streams", "v:0",
+         "-show_entries", "packet=pts_time", "-of", "csv=p=0", path], text=True)
+    return sorted(out.split(), key=float)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--images", type=int, default=200)
+    ap.add_argument("--audio", type=float, default=300, help="segundos de áudio")
+    ap.add_argument("--cores", default=",".join(
+        str(c) for c in (1, 2, 4, 8) if c <= (os.cpu_count() or 1)))
+    ap.add_argument("--chunks", default="1,2,4,8")
+    args = ap.parse_args()
+
+    all_cpus = sorted(os.sched_getaffinity(0))
+    results = []
+    with tempfile.TemporaryDirectory() as src:
+        imgs  = make_images(os.path.join(src, "img"), {"A": args.images})
+        audio = make_audio(src, args.audio)
+        imgs  = fp.group_images_by_prefix(imgs)["A"]
+        ref   = None
+
+        for cores in (int(c) for c in args.cores.split(",")):
+            os.sched_setaffinity(0, all_cpus[:cores])
+            base = None
+            for k in (int(c) for c in args.chunks.split(",")):
+                out = os.path.join(src, f"c{cores}_k{k}.mp4")
+                t0 = time.perf_counter()
+                fp._make_block(imgs, audio, out, (1080, 1920), chunks=k)
+                wall = time.perf_counter() - t0
+                base = base or wall
+                pts = frame_pts(out)
+                ref = ref or pts
+                results.append({"cores": cores, "chunks": k,
+                                "wall_s": round(wall, 2),
+                                "speedup": round(base / wall, 2),
+                                "same_timing": pts == ref})
+        os.sched_setaffinity(0, all_cpus)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark dos motores de render: "blocks" × "graph" × …
+
+Mede tempo de parede e pico de disco temporário de generate_final_video
+para o mesmo conjunto sintético de imagens/áudio e confere cada motor
+contra o "blocks" (duração ±0,1 s por bloco e PSNR ≥ --min-psnr). Por
+padrão as imagens misturam tamanhos e formatos (jpg/png/bmp), como os
+uploads reais; --uniform usa todas iguais (--size). Sai com código 1 se
+algum motor divergir.
+
+Uso:
+    python -m bench.engine_bench --groups 3 --images 40 --audio 60
+"""
+import argparse, json, os, shutil, sys, tempfile, time
+
+from core import ffmpeg_processor as fp
+from bench.pyav_bench import _stats, psnr
+from bench.synth import DiskHighWater, make_audio, make_images, make_mixed_images
+
+
+def run_engine(engine: str, groups, audio: str, aspect: str, green: float,
+               out: str) -> dict:
+    work = tempfile.mkdtemp(prefix=f"bench_{engine}_")
+    old_tmp, tempfile.tempdir = tempfile.tempdir, work    # mede só este job
+    try:
+        t0 = time.perf_counter()
+        with DiskHighWater(work) as disk:
+            fp.generate_final_video(groups, audio, out, green, aspect,
+                                    lambda *a: None, engine=engine)
+        return {"engine": engine,
+                "wall_s": round(time.perf_counter() - t0, 2),
+                "peak_tmp_mb": round(disk.peak / 2**20, 1),
+                "output_mb": round(os.path.getsize(out) / 2**20, 2)}
+    finally:
+        tempfile.tempdir = old_tmp
+        shutil.rmtree(work, ignore_errors=True)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--groups", type=int, default=3)
+    ap.add_argument("--images", type=int, default=40, help="imagens por grupo")
+    ap.add_argument("--audio", type=float, default=60, help="segundos de áudio")
+    ap.add_argument("--green", type=float, default=3)
+    ap.add_argument("--aspect", default="9x16")
+    ap.add_argument("--size", default="1920x1080", help="tamanho das imagens (--uniform)")
+    ap.add_argument("--uniform", action="store_true", help="imagens todas iguais")
+    ap.add_argument("--min-psnr", type=float, default=35.0)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as src:
+        layout = {chr(ord("A") + g): args.images for g in range(args.groups)}
+        size   = tuple(int(x) for x in args.size.split("x"))
+        imgs   = (make_images(os.path.join(src, "img"), layout, size) if args.uniform
+                  else make_mixed_images(os.path.join(src, "img"), layout))
+        audio  = make_audio(src, args.audio)
+        groups = fp.group_images_by_prefix(imgs)
+
+        results, outs = [], {}
+        for e in fp.ENGINES:
+            if e == "distributed" and not os.environ.get("DIST_SHARED_DIR"):
+                continue
+            outs[e] = os.path.join(src, f"{e}.mp4")
+            try:
+                results.append(run_engine(e, groups, audio, args.aspect, args.green,
+                                          outs[e]))
+            except Exception as ex:               # falha de render também diverge
+                results.append({"engine": e, "error": str(ex)})
+                del outs[e]
+
+        ref = _stats(outs["blocks"])["duration"]
+        for r in results:
+            if r["engine"] == "blocks" or "error" in r:
+                continue
+            dur = _stats(outs[r["engine"]])["duration"]
+            r["duration_diff_s"] = round(dur - ref, 3)
+            r["psnr_vs_blocks_db"] = psnr(outs["blocks"], outs[r["engine"]])
+            r["equivalent"] = (abs(dur - ref) <= 0.1 * args.groups
+                               and r["psnr_vs_blocks_db"] >= args.min_psnr)
+    print(json.dumps(results, indent=2))
+    sys.exit(0 if all(r.get("equivalent", "error" not in r) for r in results) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Teste de carga da camada HTTP (app_local + renderer falso)
+
+Sobe o app_local (gunicorn com gunicorn.conf.py, ou o servidor do Flask) com
+RENDERER=bench.stub_renderer:render — encode simulado, sem ffmpeg — e roda:
+
+  1. carga mista: --users usuários virtuais repetem o fluxo real
+     get_signed_url → PUT local_upload (imagens + áudio) → create_video →
+     SSE /progress até "completed", durante --duration segundos;
+  2. capacidade de conexões: abre SSE ociosos um a um (até --sse-max) e
+     conta quantos recebem o 1º evento em --sse-timeout segundos.
+
+Reporta latência p50/p90/p99 por rota, taxa de erros, jobs concluídos,
+tempo fim-a-fim, conexões SSE simultâneas e RSS do servidor (início, pico,
+fim). As entradas são PNG/WAV minúsculos gerados em Python puro, então o
+preflight e o probe reais rodam normalmente.
+
+Uso:
+    python -m bench.load_test --users 8 --duration 60
+    python -m bench.load_test --workers 2 --worker-class gthread --threads 32
+    python -m bench.load_test --server flask --users 4 --sse-max 200
+"""
+import argparse, json, os, socket, struct, subprocess, sys, tempfile, threading, time, zlib
+import urllib.request
+from collections import defaultdict
+
+from bench.perf_report import pct
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# ── entradas minúsculas (sem ffmpeg) ──────────────────────────────────────
+def tiny_png(seed: int, size: int = 16) -> bytes:
+    def chunk(t, d):
+        return struct.pack(">I", len(d)) + t + d + struct.pack(">I", zlib.crc32(t + d))
+    row = bytes([0] + [(seed * 37 + x) % 256 for x in range(size * 3)])
+    return (b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(row * size))
+            + chunk(b"IEND", b""))
+
+
+def tiny_wav(seconds: float, rate: int = 8000) -> bytes:
+    data = b"\0\0" * int(seconds * rate)
+    return (b"RIFF" + struct.pack("<I", 36 + len(data)) + b"WAVE"
+            + b"fmt " + struct.pack("<IHHIIHH", 16, 1, 1, rate, rate * 2, 2, 16)
+            + b"data" + struct.pack("<I", len(data)) + data)
+
+
+# ── servidor ──────────────────────────────────────────────────────────────
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(args, workdir: str, port: int) -> subprocess.Popen:
+    env = {**os.environ, "PYTHONPATH": REPO, "RENDERER": "bench.stub_renderer:render",
+           "PERF_LOG_PATH": os.path.join(workdir, "perf.jsonl"),
+           "COST_MODEL_PATH": os.path.join(workdir, "cost.json")}
+    if args.server == "flask":
+        cmd = [sys.executable, "-c",
+               f"from app_local import app; app.run(host='127.0.0.1', port={port}, threaded=True)"]
+    else:
+        cmd = [sys.executable, "-m", "gunicorn", "-c", os.path.join(REPO, "gunicorn.conf.py"),
+               "--bind", f"127.0.0.1:{port}", "--workers", str(args.workers),
+               "--worker-class", args.worker_class, "--threads", str(args.threads),
+               "--access-logfile", os.devnull, "app_local:app"]
+    proc = subprocess.Popen(cmd, cwd=workdir, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    for _ in range(100):
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1).read()
+            return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.kill()
+    sys.exit("Servidor não respondeu em /health")
+
+
+def rss_mb(pid: int) -> float:
+    """RSS do processo e de todos os descendentes (Linux /proc)."""
+    total, stack = 0, [pid]
+    while stack:
+        p = stack.pop()
+        try:
+            with open(f"/proc/{p}/status") as f:
+                total += next(int(l.split()[1]) for l in f if l.startswith("VmRSS"))
+            for t in os.listdir(f"/proc/{p}/task"):
+                with open(f"/proc/{p}/task/{t}/children") as f:
+                    stack += [int(c) for c in f.read().split()]
+        except (OSError, StopIteration):
+            pass
+    return total / 1024
+
+
+class MemSampler(threading.Thread):
+    def __init__(self, pid: int, interval: float = 0.5):
+        super().__init__(daemon=True)
+        self.pid, self.interval = pid, interval
+        self.start_mb = self.peak_mb = self.end_mb = rss_mb(pid)
+        self._stop = threading.Event()
+
+    def run(self):
+        while not self._stop.wait(self.interval):
+            self.peak_mb = max(self.peak_mb, rss_mb(self.pid))
+
+    def stop(self):
+        self._stop.set()
+        self.join()
+        self.end_mb = rss_mb(self.pid)
+
+
+# ── cliente ───────────────────────────────────────────────────────────────
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.lat = defaultdict(list)
+        self.err = defaultdict(int)
+        self.jobs, self.e2e = 0, []
+
+    def timed(self, route: str, fn):
+        t0 = time.perf_counter()
+        try:
+            out = fn()
+        except (OSError, ValueError) as e:
+            with self.lock:
+                self.err[route] += 1
+            raise RuntimeError(f"{route}: {e}") from e
+        with self.lock:
+            self.lat[route].append(time.perf_counter() - t0)
+        return out
+
+
+def _req(base: str, path: str, method: str = "GET", body: bytes | None = None,
+         json_body=None, timeout: float = 30):
+    headers = {}
+    if json_body is not None:
+        body, headers["Content-Type"] = json.dumps(json_body).encode(), "application/json"
+    req = urllib.request.Request(base + path, data=body, method=method, headers=headers)
+    with urllib.request.urlopen(req, timeout=timeout) as r:
+        data = r.read()
+    return json.loads(data) if data[:1] in (b"{", b"[") else data
+
+
+def _sse_until_done(base: str, sid: str, timeout: float) -> dict:
+    deadline = time.monotonic() + timeout
+    with urllib.request.urlopen(f"{base}/progress/{sid}", timeout=timeout) as r:
+        for raw in r:
+            line = raw.decode().strip()
+            if line.startswith("data:"):
+                ev = json.loads(line[5:])
+                if ev.get("completed"):
+                    return ev
+            if time.monotonic() > deadline:
+                break
+    raise ValueError("SSE terminou sem 'completed'")
+
+
+def user_loop(uid: int, base: str, args, stats: Stats, stop: threading.Event):
+    wav = tiny_wav(args.audio)
+    while not stop.is_set():
+        try:
+            t0 = time.perf_counter()
+            names = []
+            files = [(f"A{i}.png", tiny_png(uid * 1000 + i)) for i in range(1, args.images + 1)]
+            files.append(("audio.wav", wav))
+            for fname, blob in files:
+                ftype = "audio" if fname.endswith(".wav") else "image"
+                r = stats.timed("get_signed_url", lambda: _req(
+                    base, "/get_signed_url", "POST",
+                    json_body={"filename": fname, "file_type": ftype}))
+                path = "/local_upload/" + r["filename"]     # URL devolvida aponta p/ :8082
+                stats.timed("local_upload", lambda: _req(base, path, "PUT", body=blob))
+                names.append(r["filename"])
+            job = stats.timed("create_video", lambda: _req(
+                base, "/create_video", "POST", json_body={
+                    "image_filenames": names[:-1], "audio_filename": names[-1],
+                    "client_id": f"user{uid}", "green_duration": 0}))
+            ev = stats.timed("progress_sse", lambda: _sse_until_done(
+                base, job["session_id"], args.job_timeout))
+            if ev.get("status") != "completed":
+                with stats.lock:
+                    stats.err["job"] += 1
+                continue
+            with stats.lock:
+                stats.jobs += 1
+                stats.e2e.append(time.perf_counter() - t0)
+        except RuntimeError:
+            time.sleep(0.2)                               # erro já contado
+
+
+def sse_capacity(base: str, maximum: int, timeout: float) -> int:
+    """Abre SSE ociosos até um falhar em receber o 1º evento."""
+    conns, opened = [], 0
+    try:
+        for i in range(maximum):
+            try:
+                r = urllib.request.urlopen(f"{base}/progress/idle-{i}", timeout=timeout)
+                while not r.readline().startswith(b"data:"):
+                    pass
+            except OSError:
+                break
+            conns.append(r)
+            opened += 1
+    finally:
+        for r in conns:
+            r.close()
+    return opened
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--server", choices=("gunicorn", "flask"), default="gunicorn")
+    ap.add_argument("--workers", type=int, default=1)
+    ap.add_argument("--worker-class", default="sync")
+    ap.add_argument("--threads", type=int, default=1)
+    ap.add_argument("--users", type=int, default=4)
+    ap.add_argument("--duration", type=float, default=30)
+    ap.add_argument("--images", type=int, default=10, help="imagens por job")
+    ap.add_argument("--audio", type=float, default=2, help="segundos do WAV")
+    ap.add_argument("--job-timeout", type=float, default=120)
+    ap.add_argument("--sse-max", type=int, default=100)
+    ap.add_argument("--sse-timeout", type=float, default=5)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="load_test_") as workdir:
+        port = _free_port()
+        base = f"http://127.0.0.1:{port}"
+        server = start_server(args, workdir, port)
+        mem = MemSampler(server.pid)
+        mem.start()
+        try:
+            stats, stop = Stats(), threading.Event()
+            users = [threading.Thread(target=user_loop, args=(u, base, args, stats, stop),
+                                      daemon=True) for u in range(args.users)]
+            t0 = time.perf_counter()
+            for t in users:
+                t.start()
+            time.sleep(args.duration)
+            stop.set()
+            for t in users:
+                t.join(args.job_timeout)
+            elapsed = time.perf_counter() - t0
+
+            capacity = sse_capacity(base, args.sse_max, args.sse_timeout)
+        finally:
+            mem.stop()
+            server.terminate()
+            server.wait(10)
+
+    total = sum(len(v) for v in stats.lat.values()) + sum(stats.err.values())
+    row = lambda v: {"p50_ms": round(pct(v, 50) * 1e3, 1), "p90_ms": round(pct(v, 90) * 1e3, 1),
+                     "p99_ms": round(pct(v, 99) * 1e3, 1), "n": len(v)}
+    report = {
+        "config": vars(args),
+        "latency": {route: row(v) for route, v in sorted(stats.lat.items())},
+        "errors": dict(stats.err),
+        "error_rate": round(sum(stats.err.values()) / max(total, 1), 4),
+        "jobs_completed": stats.jobs,
+        "jobs_per_min": round(stats.jobs / elapsed * 60, 1),
+        "job_e2e_s": row(stats.e2e) if stats.e2e else None,
+        "open_sse_capacity": capacity,
+        "server_rss_mb": {"start": round(mem.start_mb, 1), "peak": round(mem.peak_mb, 1),
+                          "end": round(mem.end_mb, 1),
+                          "growth": round(mem.end_mb - mem.start_mb, 1)},
+    }
+    if report["job_e2e_s"]:
+        report["job_e2e_s"] = {k.replace("_ms", "_s"): round(v / 1e3, 2) if k != "n" else v
+                               for k, v in report["job_e2e_s"].items()}
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Resumo dos registros de desempenho por job (core.perflog, JSONL)
+
+Percentis (p50/p90/p99) de throughput — segundos de vídeo por segundo de
+parede, imagens/s, MB de saída/s — e da duração de cada etapa, por
+motor/perfil. Só jobs com status "completed" entram no throughput.
+
+Uso:
+    python -m bench.perf_report perf_records.jsonl
+    python -m bench.perf_report perf_records.jsonl --by engine --since 2025-01-01
+"""
+import argparse, json, sys
+from collections import defaultdict
+
+from core import perflog
+
+
+def pct(values: list[float], q: float) -> float:
+    """Percentil por interpolação linear (q em 0‥100)."""
+    v = sorted(values)
+    if not v:
+        return float("nan")
+    k = (len(v) - 1) * q / 100
+    lo, hi = int(k), min(int(k) + 1, len(v) - 1)
+    return v[lo] + (v[hi] - v[lo]) * (k - lo)
+
+
+def load(path: str, since: str | None = None) -> list[dict]:
+    out = []
+    with open(path) as f:
+        for n, line in enumerate(f, 1):
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                print(f"linha {n} ignorada (JSON inválido)", file=sys.stderr)
+                continue
+            if "job_id" in rec and (not since or rec.get("ts", "") >= since):
+                out.append(rec)
+    return out
+
+
+def summarize(records: list[dict], by: str) -> dict:
+    groups = defaultdict(list)
+    for r in records:
+        groups[str(r.get(by, "?"))].append(r)
+
+    report = {}
+    for key, recs in sorted(groups.items()):
+        ok = [r for r in recs if r.get("status") == "completed" and r.get("wall_s")]
+        series = {
+            "realtime_x":   [r["media_s"] / r["wall_s"] for r in ok if r.get("media_s")],
+            "images_per_s": [r["images"] / r["wall_s"] for r in ok if r.get("images")],
+            "out_mb_per_s": [r["output_bytes"] / 1e6 / r["wall_s"]
+                             for r in ok if r.get("output_bytes")],
+            "wall_s":       [r["wall_s"] for r in ok],
+            "child_cpu_s":  [r.get("child_cpu_user_s", 0) + r.get("child_cpu_sys_s", 0)
+                             for r in ok],
+        }
+        phases = defaultdict(list)
+        for r in ok:
+            for ph, dt in (r.get("phases") or {}).items():
+                phases[ph].append(dt)
+
+        row = lambda v: {"p50": round(pct(v, 50), 2), "p90": round(pct(v, 90), 2),
+                         "p99": round(pct(v, 99), 2), "n": len(v)}
+        report[key] = {
+            "jobs": len(recs),
+            "failed": sum(r.get("status") == "error" for r in recs),
+            **{k: row(v) for k, v in series.items() if v},
+            "phases_s": {ph: row(v) for ph, v in sorted(phases.items())},
+        }
+    return report
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("path", nargs="?", default=perflog.LOG_PATH)
+    ap.add_argument("--by", default="engine",
+                    help="campo de agrupamento (engine, profile, status…)")
+    ap.add_argument("--since", help="só registros com ts ≥ (ISO 8601)")
+    args = ap.parse_args()
+
+    records = load(args.path, args.since)
+    if not records:
+        sys.exit(f"Nenhum registro em {args.path}")
+    print(json.dumps(summarize(records, args.by), indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark: core.media_headers (Python puro) × ffprobe
+
+Uso:
+    python -m bench.probe_bench /caminho/do/corpus
+    python -m bench.probe_bench --synth 300      # gera corpus com lavfi
+    python -m bench.probe_bench --mp3            # só o caso gapless do MP3
+
+O caso MP3 confere a duração Xing/Info descontando atraso e padding da tag
+LAME contra o ffprobe com tolerância de 2 ms (a tolerância geral de 50 ms
+esconderia o erro de ~50 ms por arquivo).
+"""
+import argparse, os, statistics, subprocess, tempfile, time
+
+from core import media_headers, probe
+
+AUDIO_EXTS = ("mp3", "wav", "flac", "ogg", "m4a")
+IMAGE_EXTS = ("jpg", "png", "gif", "bmp", "webp")
+
+
+def synth_corpus(dst: str, n: int) -> list[str]:
+    """Gera `n` arquivos alternando formatos de áudio e imagem."""
+    exts, files = AUDIO_EXTS + IMAGE_EXTS, []
+    for i in range(n):
+        ext = exts[i % len(exts)]
+        path = os.path.join(dst, f"s{i:04d}.{ext}")
+        if ext in AUDIO_EXTS:
+            src = ["-f", "lavfi", "-i", f"sine=frequency={200 + i}:duration={1 + i % 7}"]
+            if ext == "ogg":
+                src += ["-c:a", "libvorbis"]
+        else:
+            w, h = 320 + 16 * (i % 40), 240 + 8 * (i % 50)
+            src = ["-f", "lavfi", "-i", f"testsrc=s={w}x{h}", "-frames:v", "1"]
+        subprocess.run(["ffmpeg", "-v", "error", "-y", *src, path], check=True)
+        files.append(path)
+    return files
+
+
+MP3_TOL_S = 0.002
+
+
+def mp3_gapless(dst: str) -> dict:
+    """MP3 CBR/VBR em várias durações e taxas: headers × ffprobe."""
+    errs = []
+    for n, (secs, rate, mode) in enumerate([(1.0, 44100, ["-b:a", "128k"]),
+                                            (2.5, 48000, ["-b:a", "192k"]),
+                                            (7.3, 44100, ["-q:a", "4"]),
+                                            (13.7, 22050, ["-q:a", "2"]),
+                                            (30.0, 48000, ["-b:a", "64k", "-ac", "1"])]):
+        path = os.path.join(dst, f"gapless{n}.mp3")
+        subprocess.run(["ffmpeg", "-v", "error", "-y", "-f", "lavfi",
+                        "-i", f"sine=frequency=330:duration={secs}:sample_rate={rate}",
+                        "-c:a", "libmp3lame", *mode, path], check=True)
+        hdr, ff = media_headers.parse(path), probe._ffprobe(path)
+        errs.append(abs(hdr["duration"] - ff["duration"]) if hdr else float("inf"))
+    return {"files": len(errs), "max_err_ms": round(max(errs) * 1000, 2),
+            "ok": max(errs) <= MP3_TOL_S}
+
+
+def _timed(fn, path):
+    t0 = time.perf_counter()
+    try:
+        out = fn(path)
+    except Exception:
+        out = None
+    return time.perf_counter() - t0, out
+
+
+def _agree(a: dict, b: dict) -> bool:
+    if a["width"] or b["width"]:
+        return (a["width"], a["height"]) == (b["width"], b["height"])
+    if a["duration"] is None or b["duration"] is None:
+        return False
+    return abs(a["duration"] - b["duration"]) <= max(0.05, 0.01 * b["duration"])
+
+
+def run(files: list[str]) -> dict:
+    t_hdr, t_ff, fallback, mismatch = [], [], 0, []
+    for p in files:
+        dt_h, hdr = _timed(media_headers.parse, p)
+        dt_f, ff  = _timed(probe._ffprobe, p)
+        t_ff.append(dt_f)
+        if hdr is None:
+            fallback += 1
+            continue
+        t_hdr.append(dt_h)
+        if ff and not _agree(hdr, ff):
+            mismatch.append((os.path.basename(p), hdr, ff))
+
+    ms = lambda xs: round(statistics.median(xs) * 1000, 3) if xs else None
+    report = {
+        "files":            len(files),
+        "parsed_in_python": len(t_hdr),
+        "fallback_ffprobe": fallback,
+        "mismatches":       len(mismatch),
+        "headers_total_s":  round(sum(t_hdr), 3),
+        "ffprobe_total_s":  round(sum(t_ff), 3),
+        "headers_median_ms": ms(t_hdr),
+        "ffprobe_median_ms": ms(t_ff),
+    }
+    for name, hdr, ff in mismatch[:10]:
+        print(f"⚠️  {name}: headers={hdr} ffprobe={ff}")
+    return report
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("corpus", nargs="?", help="diretório com mídias")
+    ap.add_argument("--synth", type=int, default=0,
+                    help="gera N arquivos sintéticos (requer ffmpeg)")
+    ap.add_argument("--mp3", action="store_true", help="só o caso gapless do MP3")
+    args = ap.parse_args()
+
+    if args.mp3:
+        with tempfile.TemporaryDirectory() as tmp:
+            report = {"mp3_gapless": mp3_gapless(tmp)}
+    elif args.corpus:
+        files = sorted(os.path.join(args.corpus, f) for f in os.listdir(args.corpus)
+                       if f.lower().rsplit(".", 1)[-1] in AUDIO_EXTS + IMAGE_EXTS + ("jpeg",))
+        report = run(files)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            report = run(synth_corpus(tmp, args.synth or 300))
+            report["mp3_gapless"] = mp3_gapless(tmp)
+
+    for k, v in report.items():
+        print(f"{k:>18}: {v}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Motor "pyav" × motor "blocks": equivalência e throughput
+
+Renderiza o mesmo job sintético nos dois motores e confere:
+  • duração total (tolerância de 0,1 s por bloco);
+  • PSNR médio entre as duas saídas reamostradas a 25 fps (≥ --min-psnr dB),
+    o que pega imagem trocada, fora de ordem ou no instante errado.
+Reporta imagens/s e frames/s de cada motor. Sai com código 1 se divergirem.
+
+Uso:
+    python -m bench.pyav_bench --groups 2 --images 60 --audio 45
+"""
+import argparse, json, os, re, subprocess, sys, tempfile, time
+
+from core import ffmpeg_processor as fp
+from bench.synth import make_audio, make_images
+
+
+def _stats(path: str) -> dict:
+    out = subprocess.check_output(
+        ["ffprobe", "-v", "error", "-count_packets", "-select_streams", "v:0",
+         "-show_entries", "stream=nb_read_packets:format=duration",
+         "-of", "json", path], text=True)
+    raw = json.loads(out)
+    return {"duration": float(raw["format"]["duration"]),
+            "video_frames": int(raw["streams"][0]["nb_read_packets"])}
+
+
+def psnr(a: str, b: str) -> float:
+    """PSNR médio (dB) entre duas saídas, amostradas a 25 fps constantes."""
+    r = subprocess.run(["ffmpeg", "-i", a, "-i", b, "-filter_complex",
+                        "[0:v]fps=25[x];[1:v]fps=25[y];[x][y]psnr",
+                        "-f", "null", "-"],
+                       text=True, capture_output=True)
+    m = re.search(r"average:([\d.]+|inf)", r.stderr)
+    return float("inf") if m and m.group(1) == "inf" else float(m.group(1)) if m else 0.0
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--groups", type=int, default=2)
+    ap.add_argument("--images", type=int, default=60, help="imagens por grupo")
+    ap.add_argument("--audio", type=float, default=45, help="segundos de áudio")
+    ap.add_argument("--green", type=float, default=2)
+    ap.add_argument("--min-psnr", type=float, default=35.0)
+    args = ap.parse_args()
+
+    report = {}
+    with tempfile.TemporaryDirectory() as src:
+        layout = {chr(ord("A") + g): args.images for g in range(args.groups)}
+        imgs   = make_images(os.path.join(src, "img"), layout)
+        audio  = make_audio(src, args.audio)
+        groups = fp.group_images_by_prefix(imgs)
+
+        outs = {}
+        for engine in ("blocks", "pyav"):
+            outs[engine] = os.path.join(src, f"{engine}.mp4")
+            t0 = time.perf_counter()
+            fp.generate_final_video(groups, audio, outs[engine], args.green,
+                                    "9x16", lambda *a: None, engine=engine)
+            wall = time.perf_counter() - t0
+            st = _stats(outs[engine])
+            report[engine] = {**st, "wall_s": round(wall, 2),
+                              "images_per_s": round(len(imgs) / wall, 1),
+                              "frames_per_s": round(st["video_frames"] / wall, 1)}
+
+        report["psnr_db"] = psnr(outs["blocks"], outs["pyav"])
+
+    b, p = report["blocks"], report["pyav"]
+    ok = (abs(b["duration"] - p["duration"]) <= 0.1 * args.groups
+          and report["psnr_db"] >= args.min_psnr)
+    report["equivalent"] = ok
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
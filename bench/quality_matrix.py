@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Matriz qualidade × velocidade dos parâmetros de encode (_make_block)
+
+Renderiza as mesmas entradas — sintéticas e, opcionalmente, um slideshow
+real (--images-dir + --audio-file) — numa grade de preset × CRF × fps ×
+tune. Por combinação registra tempo de encode, tamanho/bitrate e qualidade
+objetiva (filtros psnr e ssim do ffmpeg) contra uma referência sem perdas
+(CRF 0) no mesmo fps. Marca a fronteira de Pareto (nenhuma outra combinação
+é mais rápida, menor E melhor ao mesmo tempo) e, para cada perfil de
+core.profiles, sugere a combinação mais rápida da fronteira que atinge o
+SSIM mínimo do perfil (QUALITY_FLOOR).
+
+Uso:
+    python -m bench.quality_matrix --images 20 --audio 30
+    python -m bench.quality_matrix --presets ultrafast,veryfast,medium --crfs 16,18,23
+    python -m bench.quality_matrix --images-dir ~/slides --audio-file narr.mp3 --fps 15,25
+"""
+import argparse, itertools, json, os, re, subprocess, sys, tempfile, time
+
+from core import ffmpeg_processor as fp, profiles
+from bench.synth import make_audio, make_images
+
+# SSIM mínimo (Y+U+V) de cada perfil ao escolher seus padrões
+QUALITY_FLOOR = {"preview": 0.90, "draft": 0.95, "standard": 0.985, "archival": 0.995}
+
+
+def quality(dist: str, ref: str) -> dict:
+    """PSNR médio (dB) e SSIM (All) de `dist` contra `ref`."""
+    err = subprocess.run(
+        ["ffmpeg", "-hide_banner", "-i", dist, "-i", ref, "-filter_complex",
+         "[0:v]split[a0][a1];[1:v]split[b0][b1];[a0][b0]ssim;[a1][b1]psnr",
+         "-f", "null", "-"], capture_output=True, text=True, check=True).stderr
+    ssim = re.search(r"SSIM .*All:([\d.]+)", err)
+    psnr = re.search(r"PSNR .*average:([\d.]+|inf)", err)
+    return {"ssim": float(ssim.group(1)) if ssim else None,
+            "psnr_db": float(psnr.group(1)) if psnr else None}
+
+
+def pareto(rows: list[dict]) -> None:
+    """Marca `pareto=True` nas linhas não dominadas (tempo↓, tamanho↓, SSIM↑)."""
+    def dominates(a, b):
+        ge = (a["encode_s"] <= b["encode_s"] and a["bytes"] <= b["bytes"]
+              and a["ssim"] >= b["ssim"])
+        return ge and (a["encode_s"], a["bytes"], -a["ssim"]) != \
+                      (b["encode_s"], b["bytes"], -b["ssim"])
+    for r in rows:
+        r["pareto"] = not any(dominates(o, r) for o in rows if o is not r)
+
+
+def suggest(rows: list[dict]) -> dict:
+    """Por perfil: a combinação mais rápida da fronteira com SSIM ≥ piso."""
+    front = sorted((r for r in rows if r["pareto"]), key=lambda r: r["encode_s"])
+    out = {}
+    for name, floor in QUALITY_FLOOR.items():
+        ok = [r for r in front if r["ssim"] >= floor]
+        out[name] = ({k: ok[0][k] for k in ("preset", "crf", "fps", "tune", "ssim", "kbps")}
+                     if ok else None)
+    return out
+
+
+def table(rows: list[dict]) -> str:
+    head = "| preset | crf | fps | tune | encode_s | kbps | psnr_db | ssim | pareto |"
+    lines = [head, "|---" * (head.count("|") - 1) + "|"]
+    for r in sorted(rows, key=lambda r: r["encode_s"]):
+        lines.append(f"| {r['preset']} | {r['crf']} | {r['fps']} | {r['tune'] or '-'} "
+                     f"| {r['encode_s']} | {r['kbps']} | {r['psnr_db']} | {r['ssim']} "
+                     f"| {'★' if r['pareto'] else ''} |")
+    return "\n".join(lines)
+
+
+def run_input(label: str, imgs: list[str], audio: str, res, grid, work: str) -> dict:
+    dur_a = fp._audio_duration(audio)
+    base  = profiles.get()
+    refs, rows = {}, []
+    for preset, crf, fps, tune in grid:
+        if fps not in refs:                                   # referência sem perdas
+            refs[fps] = os.path.join(work, f"{label}_ref{fps}.mp4")
+            fp._make_block(imgs, audio, refs[fps], res, fps=fps, dur_a=dur_a, profile={
+                **base, "preset": "ultrafast", "crf": 0, "tune": None,
+                "profile": "high444", "fps": fps})
+        prof = {**base, "name": "matrix", "preset": preset, "crf": crf, "fps": fps,
+                "tune": None if tune == "none" else tune}
+        out  = os.path.join(work, f"{label}_{preset}_{crf}_{fps}_{tune}.mp4")
+        t0 = time.perf_counter()
+        fp._make_block(imgs, audio, out, res, fps=fps, dur_a=dur_a, profile=prof)
+        wall = time.perf_counter() - t0
+        size = os.path.getsize(out)
+        rows.append({"preset": preset, "crf": crf, "fps": fps, "tune": prof["tune"],
+                     "encode_s": round(wall, 2), "bytes": size,
+                     "kbps": round(size * 8 / dur_a / 1000, 1), **quality(out, refs[fps])})
+        os.remove(out)
+        print(f"✔ {label} {preset} crf={crf} fps={fps} tune={tune} → "
+              f"{rows[-1]['encode_s']}s ssim={rows[-1]['ssim']}", file=sys.stderr)
+    pareto(rows)
+    return {"images": len(imgs), "audio_s": round(dur_a, 2), "resolution": list(res),
+            "results": rows, "suggested": suggest(rows)}
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--presets", default="ultrafast,superfast,veryfast,faster,medium")
+    ap.add_argument("--crfs", default="14,18,23,28")
+    ap.add_argument("--fps", default="15,25")
+    ap.add_argument("--tunes", default="none,stillimage")
+    ap.add_argument("--aspect", default="9:16")
+    ap.add_argument("--images", type=int, default=20, help="imagens sintéticas")
+    ap.add_argument("--size", default="1920x1080", help="tamanho das sintéticas")
+    ap.add_argument("--audio", type=float, default=30, help="segundos de áudio sintético")
+    ap.add_argument("--images-dir", help="slideshow real (todas as imagens do diretório)")
+    ap.add_argument("--audio-file", help="áudio do slideshow real")
+    ap.add_argument("--table", action="store_true", help="tabela Markdown em vez de JSON")
+    args = ap.parse_args()
+
+    grid = list(itertools.product(args.presets.split(","),
+                                  [int(c) for c in args.crfs.split(",")],
+                                  [int(f) for f in args.fps.split(",")],
+                                  args.tunes.split(",")))
+    res = fp._resolution(args.aspect)
+    report = {"grid_size": len(grid), "cpus": os.cpu_count(), "inputs": {}}
+    with tempfile.TemporaryDirectory(prefix="quality_matrix_") as work:
+        size  = tuple(int(x) for x in args.size.split("x"))
+        imgs  = make_images(os.path.join(work, "img"), {"A": args.images}, size)
+        audio = make_audio(work, args.audio)
+        report["inputs"]["synthetic"] = run_input(
+            "synthetic", fp.group_images_by_prefix(imgs)["A"], audio, res, grid, work)
+        if args.images_dir and args.audio_file:
+            real = [os.path.join(args.images_dir, f) for f in os.listdir(args.images_dir)
+                    if f.lower().endswith((".jpg", ".jpeg", ".png", ".webp"))]
+            real = [p for g in fp.group_images_by_prefix(real).values() for p in g]
+            report["inputs"]["real"] = run_input("real", real, args.audio_file,
+                                                 res, grid, work)
+
+    if args.table:
+        for label, rep in report["inputs"].items():
+            print(f"## {label}\n\n{table(rep['results'])}\n")
+            print(json.dumps(rep["suggested"], indent=2), "\n")
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""
+Renderer falso para testes de carga da camada HTTP (bench.load_test)
+
+Mesma assinatura de generate_final_video: dorme o tempo de encode simulado,
+chama progress_cb como o pipeline real e grava um MP4 "vazio". Ativado no
+app_local com RENDERER=bench.stub_renderer:render.
+
+    STUB_BASE_S            tempo fixo por job (s)            [1.0]
+    STUB_SECONDS_PER_IMAGE tempo por imagem (s)              [0.05]
+    STUB_TICK_S            intervalo entre callbacks (s)     [0.25]
+"""
+import os, time
+
+BASE_S      = float(os.environ.get("STUB_BASE_S", "1.0"))
+PER_IMAGE_S = float(os.environ.get("STUB_SECONDS_PER_IMAGE", "0.05"))
+TICK_S      = float(os.environ.get("STUB_TICK_S", "0.25"))
+
+
+def render(image_groups, audio_path: str, output_path: str, green_sec,
+           aspect_ratio: str, progress_cb, **kwargs) -> dict:
+    n     = sum(len(v) for v in image_groups.values())
+    total = BASE_S + n * PER_IMAGE_S
+    steps = max(1, round(total / TICK_S))
+    for i in range(1, steps + 1):
+        time.sleep(total / steps)
+        progress_cb(10 + int(i / steps * 78), "processing",
+                    f"Renderizando (stub) {i}/{steps}")
+    with open(output_path, "wb") as f:
+        f.write(b"\0" * 1024)
+    progress_cb(100, "completed", "Pronto!")
+    prof = kwargs.get("profile") or "standard"
+    return {"engine": "stub", "profile": prof["name"] if isinstance(prof, dict) else prof,
+            "elapsed_s": round(total, 2), "output_bytes": 1024}
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Suíte offline de benchmark do pipeline (group_images_by_prefix → generate_final_video)
+
+Sintetiza imagens (tamanho, quantidade, layout de grupos) e narração com as
+fontes lavfi do ffmpeg e roda cada caso de uma matriz de parâmetros num
+processo filho. Por caso registra, em JSON:
+  • wall_s        – tempo de parede do render (medido no filho);
+  • cpu_s         – CPU do filho + todos os ffmpeg dele (os.wait4);
+  • peak_rss_mb   – maior RSS da árvore de processos;
+  • peak_tmp_mb   – pico de disco no TMPDIR exclusivo do caso;
+  • output_mb     – tamanho do MP4 final.
+
+Comparação: --save grava a rodada como baseline; --compare BASE sinaliza
+métricas acima de BASE × (1 + tolerância) e sai com código 1.
+
+Uso:
+    python -m bench.suite --matrix smoke
+    python -m bench.suite --matrix default --save bench_baseline.json
+    python -m bench.suite --matrix default --compare bench_baseline.json --tolerance 0.15
+    python -m bench.suite --matrix minha_matriz.json      # {"param": [valores…]}
+"""
+import argparse, itertools, json, os, shutil, subprocess, sys, tempfile, time
+
+from bench.synth import DiskHighWater, make_audio, make_images
+
+MATRICES = {
+    "smoke": {"size": ["640x360"], "images": [6], "groups": [2],
+              "audio": [5], "engine": ["blocks"], "profile": ["draft"]},
+    "default": {"size": ["1280x720", "4000x3000"], "images": [20, 100],
+                "groups": [1, 3], "audio": [30], "engine": ["blocks", "graph"],
+                "profile": ["standard"]},
+}
+DEFAULTS = {"size": "1920x1080", "images": 20, "groups": 1, "audio": 30,
+            "green": 2, "aspect": "9x16", "engine": "blocks", "profile": "standard",
+            "chunks": 1, "prescale": False}
+METRICS   = ("wall_s", "cpu_s", "peak_rss_mb", "peak_tmp_mb", "output_mb")
+ABS_FLOOR = {"wall_s": 0.5, "cpu_s": 0.5, "peak_rss_mb": 10,
+             "peak_tmp_mb": 1, "output_mb": 0.05}     # ruído abaixo disso é ignorado
+
+
+def expand(matrix: dict) -> list[dict]:
+    """Produto cartesiano {"param": [v1, v2]} → [{...DEFAULTS, param: v}, …]."""
+    keys = list(matrix)
+    return [{**DEFAULTS, **dict(zip(keys, vals))}
+            for vals in itertools.product(*(matrix[k] for k in keys))]
+
+
+def case_id(case: dict) -> str:
+    return "|".join(f"{k}={case[k]}" for k in sorted(case))
+
+
+# ── filho: só o render ────────────────────────────────────────────────────
+def _child(spec: dict):
+    from core import ffmpeg_processor as fp
+    groups = fp.group_images_by_prefix(spec["images"])
+    t0 = time.perf_counter()
+    stats = fp.generate_final_video(
+        groups, spec["audio"], spec["out"], spec["green"], spec["aspect"],
+        lambda *a: None, engine=spec["engine"], profile=spec["profile"],
+        chunks=spec["chunks"], prescale=spec["prescale"])
+    json.dump({"wall_s": time.perf_counter() - t0, "stats": stats}, sys.stdout)
+
+
+# ── pai: entradas, medição, comparação ────────────────────────────────────
+def _inputs(case: dict, cache: dict, root: str):
+    """Imagens/áudio sintéticos, reaproveitados entre casos iguais."""
+    key = (case["size"], case["images"], case["groups"], case["audio"])
+    if key not in cache:
+        d = os.path.join(root, f"in{len(cache)}")
+        per = max(1, case["images"] // case["groups"])
+        layout = {chr(ord("A") + g): per for g in range(case["groups"])}
+        size = tuple(int(x) for x in case["size"].split("x"))
+        cache[key] = (make_images(os.path.join(d, "img"), layout, size),
+                      make_audio(d, case["audio"]))
+    return cache[key]
+
+
+def run_case(case: dict, cache: dict, root: str) -> dict:
+    imgs, audio = _inputs(case, cache, root)
+    work = tempfile.mkdtemp(prefix="case_", dir=root)
+    spec = {**case, "images": imgs, "audio": audio,
+            "out": os.path.join(work, "out.mp4")}
+    env  = {**os.environ, "TMPDIR": work,
+            "COST_MODEL_PATH": os.path.join(root, "cost_model.json"),
+            "PERF_LOG_PATH": os.devnull}
+    try:
+        with DiskHighWater(work) as disk:
+            proc = subprocess.Popen([sys.executable, "-m", "bench.suite",
+                                     "--child", json.dumps(spec)],
+                                    stdout=subprocess.PIPE, env=env, text=True)
+            out = proc.stdout.read()
+            _, status, ru = os.wait4(proc.pid, 0)
+            proc.returncode = os.waitstatus_to_exitcode(status)
+        if proc.returncode:
+            return {"case": case, "error": f"exit {proc.returncode}"}
+        res = json.loads(out)
+        return {"case": case,
+                "wall_s":      round(res["wall_s"], 2),
+                "cpu_s":       round(ru.ru_utime + ru.ru_stime, 2),
+                "peak_rss_mb": round(ru.ru_maxrss / 1024, 1),
+                "peak_tmp_mb": round(disk.peak / 2**20, 1),
+                "output_mb":   round(os.path.getsize(spec["out"]) / 2**20, 2)}
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+def compare(results: list[dict], baseline: list[dict], tol: float) -> list[dict]:
+    base = {case_id(r["case"]): r for r in baseline if "error" not in r}
+    flags = []
+    for r in results:
+        b = base.get(case_id(r["case"]))
+        if not b or "error" in r:
+            continue
+        for m in METRICS:
+            limit = b[m] * (1 + tol) + ABS_FLOOR[m]
+            if r[m] > limit:
+                flags.append({"case": r["case"], "metric": m, "baseline": b[m],
+                              "current": r[m], "ratio": round(r[m] / max(b[m], 1e-9), 2)})
+    return flags
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--matrix", default="smoke",
+                    help=f"{' | '.join(MATRICES)} ou arquivo JSON")
+    ap.add_argument("--repeat", type=int, default=1, help="rodadas por caso (fica a mediana)")
+    ap.add_argument("--save", help="grava os resultados como baseline")
+    ap.add_argument("--compare", help="baseline para detectar regressões")
+    ap.add_argument("--tolerance", type=float, default=0.15)
+    ap.add_argument("--child", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        return _child(json.loads(args.child))
+
+    if args.matrix in MATRICES:
+        matrix = MATRICES[args.matrix]
+    else:
+        with open(args.matrix) as f:
+            matrix = json.load(f)
+
+    results, cache = [], {}
+    with tempfile.TemporaryDirectory(prefix="bench_suite_") as root:
+        for case in expand(matrix):
+            runs = [run_case(case, cache, root) for _ in range(args.repeat)]
+            ok = [r for r in runs if "error" not in r]
+            if not ok:
+                results.append(runs[-1])
+                continue
+            results.append({"case": case, **{
+                m: sorted(r[m] for r in ok)[len(ok) // 2] for m in METRICS}})
+            print(f"✔ {case_id(case)} → {results[-1]['wall_s']}s", file=sys.stderr)
+
+    report = {"matrix": matrix, "cpus": os.cpu_count(), "results": results}
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            report["regressions"] = compare(results, json.load(f)["results"],
+                                            args.tolerance)
+    print(json.dumps(report, indent=2))
+    if report.get("regressions") or any("error" in r for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Entradas sintéticas para benchmarks (ffmpeg lavfi) + medição de disco.
+"""
+import os, subprocess, threading, time
+from typing import Dict, List
+
+
+def _image(path: str, w: int, h: int, i: int):
+    subprocess.run(["ffmpeg", "-v", "error", "-y", "-f", "lavfi",
+                    "-i", f"testsrc2=s={w}x{h}:r=1,hue=h={i * 7.3 % 360},"
+                          f"drawbox=x={i * 97 % w}:y={i * 53 % h}:"
+                          f"w={h // 6}:h={h // 6}:color=white:t=fill",
+                    "-frames:v", "1", "-q:v", "3", path],
+                   check=True)
+
+
+def make_images(dst: str, layout: Dict[str, int],
+                size: tuple[int, int] = (1920, 1080), ext: str = "jpg") -> List[str]:
+    """Gera imagens `<PREFIXO><n>.<ext>` — ex.: {'A': 10, 'B': 5}."""
+    os.makedirs(dst, exist_ok=True)
+    w, h, paths = *size, []
+    for pref, n in layout.items():
+        for i in range(1, n + 1):
+            path = os.path.join(dst, f"{pref}{i}.{ext}")
+            _image(path, w, h, i)
+            paths.append(path)
+    return paths
+
+
+# uploads reais: tamanhos e pix_fmts diferentes dentro do mesmo bloco
+MIXED = [((1920, 1080), "jpg"), ((1080, 1350), "png"),
+         ((640, 480), "bmp"), ((3000, 2000), "jpg")]
+
+
+def make_mixed_images(dst: str, layout: Dict[str, int]) -> List[str]:
+    """Como make_images, alternando tamanho e formato (yuvj420p/rgb24/bgr24)."""
+    os.makedirs(dst, exist_ok=True)
+    paths = []
+    for pref, n in layout.items():
+        for i in range(1, n + 1):
+            (w, h), ext = MIXED[i % len(MIXED)]
+            path = os.path.join(dst, f"{pref}{i}.{ext}")
+            _image(path, w, h, i)
+            paths.append(path)
+    return paths
+
+
+def make_audio(dst: str, seconds: float, name: str = "audio.mp3") -> str:
+    """Narração falsa: senoide + ruído rosa, MP3 44,1 kHz estéreo."""
+    os.makedirs(dst, exist_ok=True)
+    path = os.path.join(dst, name)
+    subprocess.run(["ffmpeg", "-v", "error", "-y",
+                    "-f", "lavfi", "-i", f"sine=frequency=220:duration={seconds}",
+                    "-f", "lavfi", "-i", f"anoisesrc=color=pink:amplitude=0.05:duration={seconds}",
+                    "-filter_complex", "amix=inputs=2,aformat=channel_layouts=stereo",
+                    "-ar", "44100", "-c:a", "libmp3lame", "-b:a", "128k", path],
+                   check=True)
+    return path
+
+
+def dir_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for f in files:
+            try:
+                total += os.path.getsize(os.path.join(root, f))
+            except OSError:
+                pass
+    return total
+
+
+class DiskHighWater:
+    """Amostra o tamanho de `path` em background e guarda o pico (bytes)."""
+
+    def __init__(self, path: str, interval: float = 0.1):
+        self.path, self.interval, self.peak = path, interval, 0
+        self._stop = threading.Event()
+        self._t = threading.Thread(target=self._loop, daemon=True)
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, dir_size(self.path))
+            time.sleep(self.interval)
+
+    def __enter__(self):
+        self._t.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._t.join()
+        self.peak = max(self.peak, dir_size(self.path))
@@ -0,0 +1,88 @@
+# ─────────────────────────────────────────────────────────────────────────────
+#  adaptive.py  –  preset/CRF do x264 conforme a carga da instância
+# ─────────────────────────────────────────────────────────────────────────────
+#  Com fila cheia preferimos entregar vídeos um pouco maiores a deixar o
+#  usuário esperando: a cada nível de carga o preset sobe um degrau na
+#  escada (mais rápido, arquivo maior); com a instância ociosa volta ao
+#  preset do perfil. Um prazo por job (deadline) força degraus extras e, se
+#  nem o ultrafast couber, sobe o CRF. O tempo de cada degrau vem do modelo
+#  calibrado de core.cost. Só para jobs sem perfil escolhido pelo cliente
+#  (ADAPTIVE_PRESET=1 ou "adaptive": true no /create_video).
+# ─────────────────────────────────────────────────────────────────────────────
+import os, logging
+from dataclasses import replace
+
+from core import cost
+
+logger = logging.getLogger(__name__)
+
+LADDER = ["slow", "medium", "fast", "faster", "veryfast", "superfast", "ultrafast"]
+
+MAX_CRF_BUMP = 6                          # +6 CRF ≈ metade do bitrate
+
+
+def _steps_for_load(load: float) -> int:
+    """load = jobs ativos por CPU → degraus acima do preset base."""
+    if load < 0.5:
+        return 0
+    if load < 1:
+        return 1
+    if load < 2:
+        return 2
+    return 3
+
+
+def predict(plan, preset: str, active: int, cpus: int) -> float:
+    """Segundos de parede previstos: encode calibrado (core.cost) do plano
+    com `preset`, com a CPU dividida entre os jobs ativos."""
+    alt   = replace(plan, profile={**plan.profile, "preset": preset})
+    share = max(1.0, (active + 1) / cpus)
+    return cost.estimate(alt)["encode_s"] * share
+
+
+def choose(plan, queue_depth: int, deadline_s: float | None = None,
+           cpus: int | None = None, outputs: int = 1) -> tuple[dict, dict]:
+    """Ajusta preset/CRF do perfil do plano; devolve (perfil ajustado, decisão).
+
+    Quem chama só adapta jobs sem perfil fixado pelo cliente: aqui o preset
+    pode ficar mais rápido e o CRF subir. `outputs`: alvos renderizados."""
+    prof  = dict(plan.profile)
+    cpus  = cpus or os.cpu_count() or 1
+    load  = queue_depth / cpus
+    base  = prof["preset"] if prof["preset"] in LADDER else "veryfast"
+    i     = min(len(LADDER) - 1, LADDER.index(base) + _steps_for_load(load))
+    crf   = base_crf = prof["crf"]
+
+    bump  = 0
+    est   = lambda: predict(plan, LADDER[i], queue_depth, cpus) * outputs * (1 - 0.04 * bump)
+
+    if deadline_s:
+        while i < len(LADDER) - 1 and est() > deadline_s:
+            i += 1
+        # nem o ultrafast cabe → sobe o CRF (menos bits p/ o encoder)
+        while bump < MAX_CRF_BUMP and est() > deadline_s:
+            bump += 2
+        crf += bump
+
+    preset = LADDER[i]
+    prof.update(preset=preset, crf=crf)
+    decision = {
+        "profile":          prof["name"],
+        "base_preset":      base,
+        "preset":           preset,
+        "crf":              crf,
+        "queue_depth":      queue_depth,
+        "cpus":             cpus,
+        "load":             round(load, 2),
+        "media_s":          round(plan.media_s * outputs, 1),
+        "deadline_s":       deadline_s,
+        "predicted_encode_s": round(est(), 1),
+        "calibration_samples": cost.estimate(plan)["samples"],
+        "predicted_size_factor": round(cost.SIZE[preset] / cost.SIZE[base]
+                                       * 2 ** (-(crf - base_crf) / 6), 2),
+    }
+    logger.info("⚖️  Preset adaptativo: %s → %s (CRF %d) | fila %d em %d CPUs | "
+                "previsto %.0fs, tamanho ×%.2f",
+                base, preset, crf, queue_depth, cpus,
+                decision["predicted_encode_s"], decision["predicted_size_factor"])
+    return prof, decision
@@ -0,0 +1,182 @@
+# ─────────────────────────────────────────────────────────────────────────────
+#  batch.py  –  render em lote a partir de um manifesto JSONL (sem o web)
+# ─────────────────────────────────────────────────────────────────────────────
+#  Para a madrugada com centenas de vídeos de mídias já baixadas: uma linha
+#  por job, executados num pool de processos do tamanho da máquina.
+#
+#      {"id": "ep01", "images": ["a/A1.jpg", "a/A2.jpg", …] | "images_dir": "a/",
+#       "audio": "a/narr.mp3", "output": "out/ep01.mp4",
+#       "aspect_ratio": "9:16", "green_duration": 3,
+#       "profile": "standard", "engine": "blocks", "prescale": false}
+#
+#  Retomável: ao terminar, cada saída ganha um "<saída>.done.json" com o
+#  fingerprint do job (tamanho/mtime das entradas + parâmetros); rodar o
+#  mesmo manifesto de novo pula as saídas cujo fingerprint confere. O MP4 é
+#  gravado num temporário e renomeado, então um job interrompido nunca
+#  parece pronto.
+#
+#      python -m core.batch manifesto.jsonl
+#      python -m core.batch manifesto.jsonl --jobs 4 --report resultado.jsonl
+# ─────────────────────────────────────────────────────────────────────────────
+import os, sys, json, time, hashlib, logging, argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".gif", ".bmp", ".webp")
+DEFAULTS   = {"aspect_ratio": "9:16", "green_duration": 3, "profile": None,
+              "engine": "blocks", "prescale": False, "chunks": 1}
+
+
+def load_manifest(path: str) -> list[dict]:
+    """Linhas do manifesto com padrões aplicados; ValueError se inválida."""
+    jobs = []
+    with open(path) as f:
+        for n, line in enumerate(f, 1):
+            if not line.strip() or line.lstrip().startswith("#"):
+                continue
+            try:
+                job = {**DEFAULTS, **json.loads(line)}
+            except ValueError as e:
+                raise ValueError(f"linha {n}: JSON inválido ({e})")
+            if job.get("images_dir"):
+                d = job["images_dir"]
+                job["images"] = [os.path.join(d, f) for f in os.listdir(d)
+                                 if f.lower().endswith(IMAGE_EXTS)]
+            missing = [k for k in ("images", "audio", "output") if not job.get(k)]
+            if missing:
+                raise ValueError(f"linha {n}: faltam {', '.join(missing)}")
+            job.setdefault("id", os.path.splitext(os.path.basename(job["output"]))[0])
+            jobs.append(job)
+    return jobs
+
+
+def fingerprint(job: dict) -> str:
+    """Entradas (caminho, tamanho, mtime) + parâmetros que mudam o vídeo."""
+    files = [(p, os.path.getsize(p), int(os.path.getmtime(p)))
+             for p in sorted(job["images"]) + [job["audio"]]]
+    params = {k: job[k] for k in DEFAULTS}
+    return hashlib.sha1(json.dumps([files, params]).encode()).hexdigest()
+
+
+def _marker(job: dict) -> str:
+    return job["output"] + ".done.json"
+
+
+def is_done(job: dict) -> bool:
+    try:
+        with open(_marker(job)) as f:
+            return (os.path.exists(job["output"])
+                    and json.load(f)["fingerprint"] == fingerprint(job))
+    except (OSError, ValueError, KeyError):
+        return False
+
+
+def render_one(job: dict) -> dict:
+    """Roda no processo filho: renderiza, grava o marcador e devolve o resultado."""
+    from core import perflog
+    from core.ffmpeg_processor import generate_final_video, group_images_by_prefix
+    t0  = time.perf_counter()
+    rec = perflog.JobRecord(f"batch:{job['id']}")
+    out = job["output"]
+    tmp = f"{out}.part.mp4"
+    try:
+        fp = fingerprint(job)
+        os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+        groups = group_images_by_prefix(job["images"])
+        rec.update(images=len(job["images"]), groups=len(groups), source="batch")
+        stats = generate_final_video(
+            groups, job["audio"], tmp, float(job["green_duration"]),
+            job["aspect_ratio"].replace(":", "x"), lambda *a: None,
+            prescale=bool(job["prescale"]), engine=job["engine"],
+            chunks=int(job["chunks"]), profile=job["profile"])
+        os.replace(tmp, out)
+        with open(_marker(job), "w") as f:
+            json.dump({"fingerprint": fp, "stats": stats}, f, default=str)
+        rec.stats(stats)
+        rec.finish("completed")
+        return {"id": job["id"], "status": "completed", "output": out,
+                "wall_s": round(time.perf_counter() - t0, 2),
+                "media_s": stats.get("media_s", 0), "output_bytes": stats.get("output_bytes", 0)}
+    except Exception as e:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        rec.finish("error", error=str(e))
+        return {"id": job["id"], "status": "error", "output": out,
+                "wall_s": round(time.perf_counter() - t0, 2), "error": str(e)}
+    finally:
+        perflog.flush()                     # filhos do pool não rodam atexit
+
+
+def summarize(results: list[dict], wall_s: float) -> dict:
+    ok     = [r for r in results if r["status"] == "completed"]
+    media  = sum(r["media_s"] for r in ok)
+    return {
+        "jobs":           len(results),
+        "completed":      len(ok),
+        "skipped":        sum(r["status"] == "skipped" for r in results),
+        "failed":         [{"id": r["id"], "error": r["error"]}
+                           for r in results if r["status"] == "error"],
+        "wall_s":         round(wall_s, 1),
+        "jobs_per_hour":  round(len(ok) / wall_s * 3600, 1) if wall_s else 0,
+        "media_s":        round(media, 1),
+        "realtime_x":     round(media / wall_s, 2) if wall_s else 0,
+        "output_mb":      round(sum(r["output_bytes"] for r in ok) / 2**20, 1),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Render em lote (manifesto JSONL)")
+    ap.add_argument("manifest")
+    ap.add_argument("--jobs", type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                    help="renders simultâneos (cada ffmpeg já usa várias threads)")
+    ap.add_argument("--force", action="store_true", help="ignora saídas já prontas")
+    ap.add_argument("--report", help="grava um resultado por job (JSONL)")
+    ap.add_argument("-v", "--verbose", action="store_true")
+    args = ap.parse_args()
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+
+    try:
+        jobs = load_manifest(args.manifest)
+    except (OSError, ValueError) as e:
+        sys.exit(f"Manifesto inválido: {e}")
+    outs = [j["output"] for j in jobs]
+    if len(set(outs)) != len(outs):
+        sys.exit("Manifesto inválido: saídas repetidas")
+
+    results, todo = [], []
+    for job in jobs:
+        if not args.force and is_done(job):
+            results.append({"id": job["id"], "status": "skipped", "output": job["output"]})
+        else:
+            todo.append(job)
+    print(f"📋 {len(jobs)} jobs — {len(results)} já prontos, {len(todo)} a renderizar "
+          f"({args.jobs} simultâneos)", file=sys.stderr)
+
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.jobs) as ex:
+        futures = {ex.submit(render_one, job): job for job in todo}
+        for n, fut in enumerate(as_completed(futures), 1):
+            try:
+                r = fut.result()
+            except Exception as e:              # filho morto (OOM/sinal) quebra o pool
+                job = futures[fut]
+                r = {"id": job["id"], "status": "error", "output": job["output"],
+                     "wall_s": 0, "error": f"{type(e).__name__}: {e}"}
+            results.append(r)
+            mark = "✔" if r["status"] == "completed" else "✖"
+            print(f"{mark} [{n}/{len(todo)}] {r['id']} → {r['wall_s']}s"
+                  + (f" ({r['error']})" if r.get("error") else ""), file=sys.stderr)
+
+    if args.report:
+        with open(args.report, "w") as f:
+            for r in results:
+                f.write(json.dumps(r) + "\n")
+    summary = summarize(results, time.perf_counter() - t0)
+    print(json.dumps(summary, indent=2, ensure_ascii=False))
+    if summary["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
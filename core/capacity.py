@@ -0,0 +1,96 @@
+# ─────────────────────────────────────────────────────────────────────────────
+#  capacity.py  –  /ready: a instância aceita mais um job agora?
+# ─────────────────────────────────────────────────────────────────────────────
+#  /health só diz que o processo está vivo (liveness). /ready junta fila e
+#  slots do scheduler, carga de CPU, disco livre no temporário, memória
+#  disponível (limite do cgroup, se houver) e a vazão recente de encode; sai
+#  503 quando algum limite estoura, para o load balancer / autoscaler mandar
+#  o próximo job a uma instância ociosa.
+#
+#      READY_MAX_QUEUED   slots cheios + esta fila → 503          (0)
+#      READY_MAX_LOAD     load1 por núcleo                        (1.5)
+#      READY_MIN_TMP_MB   livre em tempfile.gettempdir()          (1024)
+#      READY_MIN_MEM_MB   memória disponível                      (512)
+# ─────────────────────────────────────────────────────────────────────────────
+import os, shutil, tempfile
+
+from core import metrics
+
+MAX_QUEUED = int(os.environ.get("READY_MAX_QUEUED", "0"))
+MAX_LOAD   = float(os.environ.get("READY_MAX_LOAD", "1.5"))
+MIN_TMP_MB = float(os.environ.get("READY_MIN_TMP_MB", "1024"))
+MIN_MEM_MB = float(os.environ.get("READY_MIN_MEM_MB", "512"))
+WINDOW_S   = float(os.environ.get("READY_THROUGHPUT_WINDOW_S", "900"))
+
+
+def _cores() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _cgroup_free_mb() -> float | None:
+    """Folga até o limite do cgroup v2 (Cloud Run/Docker); None sem limite."""
+    try:
+        with open("/sys/fs/cgroup/memory.max") as f:
+            limit = f.read().strip()
+        if limit == "max":
+            return None
+        with open("/sys/fs/cgroup/memory.current") as f:
+            return (int(limit) - int(f.read())) / 2**20
+    except (OSError, ValueError):
+        return None
+
+
+def memory() -> dict:
+    info = {}
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                key, val = line.split(":", 1)
+                info[key] = int(val.split()[0]) / 1024          # kB → MB
+    except (OSError, ValueError):
+        pass
+    avail = [v for v in (info.get("MemAvailable"), _cgroup_free_mb()) if v is not None]
+    return {"available_mb": round(min(avail)) if avail else None,
+            "total_mb": round(info["MemTotal"]) if "MemTotal" in info else None}
+
+
+def report(jobs: dict, local: bool = True) -> tuple[bool, dict]:
+    """(pronta?, relatório). `jobs`: snapshot do scheduler ({"slots",
+    "running", "queued", "paused"}) ou profundidade da fila (local=False:
+    o render é dos workers, então slots/fila não bloqueiam o web)."""
+    reasons = []
+    jobs = dict(jobs)
+    if local:
+        jobs["free_slots"] = max(0, jobs["slots"] - jobs["running"])
+        if jobs.get("paused"):
+            reasons.append("drenando")
+        if not jobs["free_slots"] and jobs["queued"] >= MAX_QUEUED:
+            reasons.append(f"sem slot livre ({jobs['queued']} na fila)")
+
+    cores = _cores()
+    load1 = os.getloadavg()[0]
+    if load1 / cores > MAX_LOAD:
+        reasons.append(f"CPU {load1:.1f}/{cores} núcleos")
+
+    tmp  = tempfile.gettempdir()
+    free = shutil.disk_usage(tmp).free / 2**20
+    if free < MIN_TMP_MB:
+        reasons.append(f"{tmp} com {free:.0f} MB livres")
+
+    mem = memory()
+    if mem["available_mb"] is not None and mem["available_mb"] < MIN_MEM_MB:
+        reasons.append(f"memória com {mem['available_mb']} MB livres")
+
+    return not reasons, {
+        "ready":      not reasons,
+        "reasons":    reasons,
+        "jobs":       jobs,
+        "cpu":        {"load1": round(load1, 2), "cores": cores,
+                       "load_per_core": round(load1 / cores, 2)},
+        "tmp":        {"path": tmp, "free_mb": round(free)},
+        "memory":     mem,
+        "throughput": metrics.throughput(WINDOW_S),
+    }
@@ -0,0 +1,103 @@
+# ─────────────────────────────────────────────────────────────────────────────
+#  cost.py  –  previsão de tempo de encode, tamanho final e pico de disco
+# ─────────────────────────────────────────────────────────────────────────────
+#  Modelo base (por RenderPlan) × fator de calibração por motor. Cada job
+#  concluído informa o real (observe) e o fator segue uma média móvel
+#  exponencial, persistida em JSON — a previsão melhora com o uso.
+# ─────────────────────────────────────────────────────────────────────────────
+import os, json, logging, tempfile, threading
+
+logger = logging.getLogger(__name__)
+
+MODEL_PATH = os.environ.get(
+    "COST_MODEL_PATH",
+    os.path.join(tempfile.gettempdir(), "mergevideo_cost_model.json"))
+
+ALPHA     = 0.2                      # peso de cada job novo na média móvel
+PX_1080   = 1920 * 1080
+FRAME_KB  = 180                      # KB por imagem distinta (1080p, CRF 18)
+DECODE_S  = 0.04                     # s por imagem decodificada/normalizada
+METRICS   = ("encode_s", "output_bytes", "peak_tmp_bytes")
+
+# custo relativo de encode por preset (s de CPU por s de vídeo 1080p,
+# slideshow) e tamanho relativo ao veryfast no mesmo CRF: ponto de partida
+# do modelo; o fator de calibração por motor corrige para esta máquina
+SPEED = {"slow": 0.90, "medium": 0.55, "fast": 0.42, "faster": 0.33,
+         "veryfast": 0.25, "superfast": 0.17, "ultrafast": 0.11}
+SIZE  = {"slow": 0.86, "medium": 0.90, "fast": 0.93, "faster": 0.96,
+         "veryfast": 1.00, "superfast": 1.30, "ultrafast": 1.75}
+
+_lock  = threading.Lock()
+_model: dict | None = None           # motor → {métrica: fator, "samples": n}
+
+
+def _load() -> dict:
+    global _model
+    if _model is None:
+        try:
+            with open(MODEL_PATH) as f:
+                _model = json.load(f)
+        except (OSError, ValueError):
+            _model = {}
+    return _model
+
+
+def _save():
+    tmp = f"{MODEL_PATH}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "w") as f:
+            json.dump(_model, f, indent=1)
+        os.replace(tmp, MODEL_PATH)
+    except OSError as e:                           # sem disco → só em memória
+        logger.warning("⚠️ Modelo de custo não salvo: %s", e)
+
+
+def base(plan) -> dict:
+    """Previsão sem calibração (constantes iniciais)."""
+    p   = plan.profile
+    w, h = plan.resolution
+    px  = w * h / PX_1080
+    crf = 2 ** (-(p["crf"] - 18) / 6)              # +6 CRF ≈ metade dos bits
+
+    encode_s = (plan.media_s * SPEED.get(p["preset"], 0.25) * px * p["fps"] / 25
+                + plan.unique_images * DECODE_S)
+    video_b  = plan.frames * FRAME_KB * 1024 * px * crf * SIZE.get(p["preset"], 1.0)
+    audio_b  = plan.media_s * int(p["audio_bitrate"].rstrip("k")) * 1000 / 8
+    out_b    = video_b + audio_b
+
+    if plan.engine == "blocks":                    # partes + MP4 final + PNGs do dedup
+        repeated = plan.images - plan.unique_images
+        tmp_b = 2 * out_b + min(repeated, plan.unique_images) * w * h * 1.5
+    else:
+        tmp_b = out_b
+    return {"encode_s": encode_s, "output_bytes": out_b, "peak_tmp_bytes": tmp_b}
+
+
+def estimate(plan) -> dict:
+    """Previsão calibrada para o plano."""
+    raw = base(plan)
+    with _lock:
+        cal = dict(_load().get(plan.engine, {}))
+    est = {k: raw[k] * cal.get(k, 1.0) for k in METRICS}
+    return {"encode_s":       round(est["encode_s"], 1),
+            "output_bytes":   int(est["output_bytes"]),
+            "peak_tmp_bytes": int(est["peak_tmp_bytes"]),
+            "samples":        cal.get("samples", 0)}
+
+
+def observe(plan, encode_s: float, output_bytes: int, peak_tmp_bytes: int):
+    """Registra o custo real de um job e atualiza os fatores do motor."""
+    raw  = base(plan)
+    real = {"encode_s": encode_s, "output_bytes": output_bytes,
+            "peak_tmp_bytes": peak_tmp_bytes}
+    with _lock:
+        cal = _load().setdefault(plan.engine, {"samples": 0})
+        for k in METRICS:
+            if raw[k] > 0 and real[k]:
+                ratio = real[k] / raw[k]
+                cal[k] = ratio if not cal["samples"] else \
+                    (1 - ALPHA) * cal.get(k, 1.0) + ALPHA * ratio
+        cal["samples"] += 1
+        _save()
+    logger.info("📐 Custo real (%s): %.1fs, %.1f MB, tmp %.1f MB",
+                plan.engine, encode_s, output_bytes / 1e6, peak_tmp_bytes / 1e6)
@@ -0,0 +1,77 @@
+# ─────────────────────────────────────────────────────────────────────────────
+#  dedup.py  –  imagens repetidas dentro do mesmo job
+# ─────────────────────────────────────────────────────────────────────────────
+#  Cartelas de título e logos aparecem várias vezes num job. Aqui as imagens
+#  são identificadas por hash de conteúdo e cada imagem repetida é
+#  normalizada (scale+pad na resolução final) uma vez; as ocorrências passam
+#  a apontar para esse quadro.
+#
+#  O que isso economiza no motor "blocks": só ocorrências seguidas (mesmo
+#  conteúdo com nomes diferentes) viram uma entrada no concat (_write_concat).
+#  Repetições não seguidas continuam sendo lidas uma vez cada (do PNG já na
+#  resolução final). O motor "pyav" guarda quadros por caminho, então ali
+#  cada repetição unificada é decodificada uma vez (enquanto couber no LRU).
+#  Como o passe faz hash de todas as imagens, fica desligado por padrão
+#  (dedup=True / DEDUP_IMAGES=1).
+# ─────────────────────────────────────────────────────────────────────────────
+import os, time, logging
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+from core import probe
+from core.ffmpeg_processor import _run, _runs
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize(src: str, dst: str, res: Tuple[int, int]) -> None:
+    w, h = res
+    _run(["ffmpeg", "-y", "-v", "error", "-i", src,
+          "-vf", (f"scale={w}:{h}:force_original_aspect_ratio=decrease,"
+                  f"pad={w}:{h}:(ow-iw)/2:(oh-ih)/2"),
+          "-frames:v", "1", dst])
+
+
+def dedup_groups(image_groups: Dict[str, List[str]], res: Tuple[int, int],
+                 dst_dir: str, workers: int | None = None
+                 ) -> Tuple[Dict[str, List[str]], dict]:
+    """Troca ocorrências repetidas por um único quadro normalizado (funde as
+    seguidas no concat; ver cabeçalho)."""
+    t0 = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    flat = [p for imgs in image_groups.values() for p in imgs]
+
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        hashes = dict(zip(flat, ex.map(probe.file_hash, flat)))
+    counts = Counter(hashes.values())
+    dups   = {h for h, c in counts.items() if c > 1}
+
+    stats = {"images": len(flat), "unique": len(counts),
+             "repeated": len(dups), "decodes_avoided": 0, "cheap_decodes": 0}
+    if not dups:
+        stats["elapsed_s"] = round(time.perf_counter() - t0, 2)
+        return image_groups, stats
+
+    os.makedirs(dst_dir, exist_ok=True)
+    first = {}
+    for p in flat:
+        first.setdefault(hashes[p], p)
+    norm = {h: os.path.join(dst_dir, f"{h[:16]}.png") for h in dups}
+    normed = set(norm.values())
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        list(ex.map(_normalize, [first[h] for h in dups],
+                    [norm[h] for h in dups], [res] * len(dups)))
+
+    out = {pref: [norm.get(hashes[p], p) for p in imgs]
+           for pref, imgs in image_groups.items()}
+    for imgs in out.values():
+        runs = _runs(imgs)
+        stats["decodes_avoided"] += len(imgs) - len(runs)      # entradas fundidas
+        stats["cheap_decodes"]   += sum(1 for p, _ in runs if p in normed)
+    stats["elapsed_s"] = round(time.perf_counter() - t0, 2)
+    logger.info("♻️  Dedup: %d imagens, %d únicas, %d repetidas → %d decodes evitados, "
+                "%d do quadro normalizado (%.2fs)",
+                stats["images"], stats["unique"], stats["repeated"],
+                stats["decodes_avoided"], stats["cheap_decodes"], stats["elapsed_s"])
+    return out, stats
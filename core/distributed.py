@@ -0,0 +1,202 @@
+# ─────────────────────────────────────────────────────────────────────────────
+#  distributed.py  –  motor "distributed": blocos renderizados em outras instâncias
+# ─────────────────────────────────────────────────────────────────────────────
+#  Um job longo no motor "blocks" fica preso aos núcleos de uma instância.
+#  Aqui o coordenador (o processo do job) divide o RenderPlan em uma tarefa
+#  por bloco numa fila compartilhada (core.jobqueue); workers em outras
+#  instâncias pegam as tarefas, renderizam o bloco (_make_block) e gravam o
+#  MP4 no diretório compartilhado; o coordenador gera a tela verde e faz o
+#  concat em stream copy, como no motor "blocks".
+#
+#      DIST_SHARED_DIR=/shared                       NFS / Filestore / gcsfuse
+#      python -m core.worker --queue dir:/shared/queue \
+#             --target core.distributed:render_task --slots 2
+#
+#      DIST_SHARED_DIR/jobs/<job>/in/      entradas copiadas pelo coordenador
+#      DIST_SHARED_DIR/jobs/<job>/parts/   MP4 de cada bloco (rename atômico)
+#
+#  O coordenador também renderiza as tarefas do próprio job com
+#  DIST_LOCAL_SLOTS slots (0 = só coordena). Worker morto: a tarefa volta à
+#  fila após RENDER_QUEUE_LEASE_S. Job que falha tira da fila as tarefas
+#  ainda não pegas; as que estão em andamento descartam o resultado.
+#  Teste local: vários `python -m core.worker` apontando para o mesmo
+#  diretório.
+# ─────────────────────────────────────────────────────────────────────────────
+import os, time, uuid, shutil, socket, logging, tempfile, threading
+from collections import Counter
+
+from core import jobqueue, metrics
+
+logger = logging.getLogger(__name__)
+
+SHARED_DIR   = os.environ.get("DIST_SHARED_DIR", "")
+QUEUE_URL    = os.environ.get("DIST_QUEUE") or (
+    f"dir:{os.path.join(SHARED_DIR, 'queue')}" if SHARED_DIR else "")
+LOCAL_SLOTS  = int(os.environ.get("DIST_LOCAL_SLOTS", "1"))
+TASK_TIMEOUT = float(os.environ.get("DIST_TASK_TIMEOUT_S", "1800"))   # sem nenhum bloco novo
+POLL_S       = 0.5
+
+
+def _publish(src: str, dst: str) -> bool:
+    """Cópia + rename: o coordenador nunca vê uma parte pela metade. Sem
+    criar diretório: parts/ sumiu = job cancelado, devolve False."""
+    try:
+        shutil.copyfile(src, dst + ".tmp")
+        os.replace(dst + ".tmp", dst)
+    except FileNotFoundError:
+        return False
+    return True
+
+
+# ╭──────────────────────────────────────────────────────────────────────────╮
+# │ Worker: uma tarefa = um bloco                                           │
+# ╰──────────────────────────────────────────────────────────────────────────╯
+def render_task(spec: dict, task_id: str):
+    """Alvo de core.worker: renderiza o bloco de `spec` e publica em spec["out"]."""
+    from core.ffmpeg_processor import _make_block
+    q  = jobqueue.open_queue(spec["queue"])
+    if not os.path.exists(spec["audio"]):          # coordenador desistiu e limpou
+        logger.info("⏭️  Tarefa %s descartada (job cancelado)", task_id)
+        return
+    t0 = time.perf_counter()
+    try:
+        with tempfile.TemporaryDirectory() as tmpd:
+            blk = os.path.join(tmpd, "block.mp4")
+            with metrics.stage("block"):
+                _make_block(spec["images"], spec["audio"], blk, tuple(spec["res"]),
+                            dur_a=spec["dur_a"], chunks=spec["chunks"],
+                            profile=spec["profile"])
+            if not _publish(blk, spec["out"]):
+                logger.info("⏭️  Bloco %s descartado (job cancelado)", task_id)
+                return
+    except Exception as e:
+        q.progress(task_id, {"status": "error", "error": str(e)})
+        raise
+    q.progress(task_id, {"status": "completed",
+                         "worker": f"{socket.gethostname()}:{os.getpid()}",
+                         "elapsed_s": round(time.perf_counter() - t0, 2)})
+    logger.info("🧱 Bloco %s pronto → %s (plano %s)", task_id, spec["out"],
+                spec.get("plan_fp"))
+
+
+# ╭──────────────────────────────────────────────────────────────────────────╮
+# │ Coordenador                                                             │
+# ╰──────────────────────────────────────────────────────────────────────────╯
+def _stage_inputs(image_groups, audio_path: str, root: str):
+    """Copia áudio e imagens (talvez em /tmp local) para o diretório compartilhado."""
+    inp = os.path.join(root, "in")
+    os.makedirs(inp, exist_ok=True)
+    os.makedirs(os.path.join(root, "parts"), exist_ok=True)
+    audio = os.path.join(inp, "audio" + os.path.splitext(audio_path)[1])
+    shutil.copyfile(audio_path, audio)
+    groups = {}
+    for pref, imgs in image_groups.items():
+        groups[pref] = []
+        for n, src in enumerate(imgs):
+            dst = os.path.join(inp, f"{pref}_{n:05d}{os.path.splitext(src)[1]}")
+            shutil.copyfile(src, dst)
+            groups[pref].append(dst)
+    return groups, audio
+
+
+def _local_worker(q: jobqueue.JobQueue, job: str):
+    """Slots do coordenador só para as tarefas `<job>.*` (None com
+    DIST_LOCAL_SLOTS=0) — bloco de outro job não segura este."""
+    if LOCAL_SLOTS <= 0:
+        return None
+    from core.worker import Worker
+    w = Worker(q, render_task, LOCAL_SLOTS, poll_s=POLL_S, prefix=f"{job}.")
+    threading.Thread(target=w.serve, daemon=True, name="dist-local").start()
+    return w
+
+
+def render_distributed(plan, output_path: str, tmpd: str, progress_cb,
+                       chunks: int = 1, image_groups: dict | None = None) -> dict:
+    """Uma tarefa por bloco do RenderPlan na fila DIST_QUEUE; concat local.
+
+    Cada tarefa leva o tempo por imagem, a resolução e o perfil do plano
+    (os mesmos dos outros motores) e o fingerprint dele (core.jobstore).
+    `image_groups`: caminhos já trocados por dedup/prescale, por prefixo."""
+    from core.ffmpeg_processor import _concat_parts, _green
+    from core.jobstore import fingerprint
+    if not SHARED_DIR or not QUEUE_URL:
+        raise RuntimeError("Motor 'distributed' requer DIST_SHARED_DIR (diretório "
+                           "compartilhado com os workers)")
+    res, prof, green_sec = plan.resolution, plan.profile, plan.green_s
+    images = {b.prefix: (image_groups or {}).get(b.prefix, b.images) for b in plan.blocks}
+    q     = jobqueue.open_queue(QUEUE_URL)
+    job   = uuid.uuid4().hex[:12]
+    fp    = fingerprint(plan)
+    root  = os.path.join(SHARED_DIR, "jobs", job)
+    order = [b.prefix for b in plan.blocks]
+    total = len(order)
+    local, pending = None, {}
+    try:
+        progress_cb(8, "processing", "Distribuindo blocos…")
+        with metrics.stage("stage_inputs"):
+            groups, audio = _stage_inputs(images, plan.audio_path, root)
+        tasks = {}
+        for i, blk in enumerate(plan.blocks):
+            tid = f"{job}.{blk.prefix}"
+            q.put(tid, {"queue": QUEUE_URL, "images": groups[blk.prefix], "audio": audio,
+                        "res": list(res), "dur_a": blk.image_s * len(blk.images),
+                        "chunks": chunks, "profile": prof, "plan_fp": fp,
+                        "out": os.path.join(root, "parts", f"{blk.prefix}.mp4")},
+                  client=job, cost=float(i))       # ordem da timeline
+            tasks[tid] = pending[tid] = blk.prefix
+        logger.info("🛰️  Job %s (plano %s): %d bloco(s) na fila %s",
+                    job, fp, total, QUEUE_URL)
+        local = _local_worker(q, job)
+
+        # todas as telas verdes são iguais: uma só, repetida no concat
+        green = None
+        if total > 1 and green_sec > 0:
+            green = os.path.join(tmpd, "green.mp4")
+            with metrics.stage("green"):
+                _green(green, green_sec, res, prof)
+
+        workers = Counter()
+        last, beat = time.monotonic(), 0.0
+        with metrics.stage("remote_blocks"):
+            while pending:
+                for tid in list(pending):
+                    st = q.get(tid)
+                    if st.get("status") == "error":
+                        raise RuntimeError(f"Bloco {pending[tid]} falhou no worker: "
+                                           f"{st.get('error')}")
+                    if st.get("status") == "completed":
+                        workers[st.get("worker", "?")] += 1
+                        q.forget(tid)
+                        del pending[tid]
+                        last = time.monotonic()
+                        done = total - len(pending)
+                        progress_cb(10 + int(done / total * 70), "processing",
+                                    f"Bloco {done}/{total} pronto ({tasks[tid]})")
+                if not pending:
+                    break
+                now = time.monotonic()
+                if now - last > TASK_TIMEOUT:
+                    raise TimeoutError(f"Nenhum bloco concluído em {TASK_TIMEOUT:.0f}s "
+                                       f"({len(pending)} pendente(s)) — há workers na fila?")
+                if not local and now - beat > jobqueue.LEASE_S / 4:
+                    beat = now                     # sem worker local: ninguém mais varre
+                    q.requeue_stale()
+                time.sleep(POLL_S)
+
+        parts = []
+        for i, pref in enumerate(order, 1):
+            parts.append(os.path.join(root, "parts", f"{pref}.mp4"))
+            if i != total and green:
+                parts.append(green)
+        progress_cb(88, "processing", "Concatenando blocos…")
+        _concat_parts(parts, output_path, tmpd, prof)
+    finally:
+        if local:
+            local.stop()                           # tarefa local em curso termina sozinha
+        for tid in pending:                        # erro/timeout: não deixa órfãs na fila
+            q.cancel(tid)
+            q.forget(tid)
+        shutil.rmtree(root, ignore_errors=True)
+
+    logger.info("🛰️  Job %s concluído: %s", job, dict(workers))
+    return {"tasks": total, "workers": dict(workers), "queue": QUEUE_URL, "plan_fp": fp}
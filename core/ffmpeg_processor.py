@@ -1,10 +1,13 @@
 # ─────────────────────────────────────────────────────────────────────────────
 #  ffmpeg_processor.py  –  release “sem-surpresa”
 # ─────────────────────────────────────────────────────────────────────────────
-import os, re, json, logging, shutil, tempfile, subprocess, shlex
+import os, re, time, logging, shutil, tempfile, subprocess, shlex
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Tuple
 
+from core import cost, metrics, probe, profiles
+
 logger = logging.getLogger(__name__)
 
 # ╭──────────────────────────────────────────────────────────────────────────╮
@@ -14,19 +17,35 @@ def _run(cmd: list[str]) -> None:
     """Executa subprocess, loga stderr se falhar."""
     logger.info("🖥️  %s", shlex.join(cmd))
     try:
-        subprocess.run(cmd, check=True, text=True,
-                       stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        with metrics.ffmpeg_run():
+            subprocess.run(cmd, check=True, text=True,
+                           stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
     except subprocess.CalledProcessError as e:
         logger.error("❌ FFmpeg erro:\n%s", e.stdout)
         raise
 
+def _run_progress(cmd: list[str], total_s: float, on_pct) -> None:
+    """Como _run, mas lê `-progress pipe:1` e chama on_pct(0‥1)."""
+    cmd = cmd[:1] + ["-progress", "pipe:1", "-nostats"] + cmd[1:]
+    logger.info("🖥️  %s", shlex.join(cmd))
+    tail: list[str] = []
+    with metrics.ffmpeg_run():
+        with subprocess.Popen(cmd, text=True, stdout=subprocess.PIPE,
+                              stderr=subprocess.STDOUT) as proc:
+            for line in proc.stdout:
+                if line.startswith("out_time_us=") and total_s > 0:
+                    us = line.split("=", 1)[1].strip()
+                    if us.isdigit():
+                        on_pct(min(1.0, int(us) / 1e6 / total_s))
+                elif "=" not in line:
+                    tail = (tail + [line])[-50:]
+        if proc.returncode:
+            logger.error("❌ FFmpeg erro:\n%s", "".join(tail))
+            raise subprocess.CalledProcessError(proc.returncode, cmd, "".join(tail))
+
 def _audio_duration(path: str) -> float:
-    out = subprocess.check_output(
-        ["ffprobe", "-v", "quiet", "-print_format", "json",
-         "-show_entries", "format=duration", path],
-        text=True
-    )
-    return float(json.loads(out)["format"]["duration"])
+    """Duração em segundos (memoizada em core.probe)."""
+    return probe.duration(path)
 
 def _resolution(ratio: str) -> Tuple[int, int]:
     """Converte razão → (W,H). Aceita '9:16', '9x16', 'portrait'."""
@@ -38,63 +57,196 @@ def _resolution(ratio: str) -> Tuple[int, int]:
     else:                         # fallback: mantém original
         return (1920, 1080)
 
+MAX_OUTPUT_SIDE = 4096
+
+def _scaled_res(res: Tuple[int, int], short_side: int | None) -> Tuple[int, int]:
+    """Reduz (W,H) mantendo a proporção até o menor lado = short_side (pares)."""
+    w, h = res
+    if not short_side or short_side >= min(w, h):
+        return res
+    s = short_side / min(w, h)
+    return (round(w * s / 2) * 2, round(h * s / 2) * 2)
+
+def parse_target(spec: dict) -> Tuple[str, Tuple[int, int]]:
+    """Alvo de saída → (rótulo, (W,H)). ValueError se inválido.
+
+    {"aspect_ratio": "9:16"}, {"aspect_ratio": "16:9", "resolution": "720p"}
+    (menor lado em px; aceita int) ou tamanho livre {"width": .., "height": ..}."""
+    if not isinstance(spec, dict):
+        raise ValueError(f"Alvo inválido: {spec!r}")
+    if spec.get("width") or spec.get("height"):
+        w, h = int(spec.get("width") or 0), int(spec.get("height") or 0)
+        if not (16 <= w <= MAX_OUTPUT_SIDE and 16 <= h <= MAX_OUTPUT_SIDE):
+            raise ValueError(f"Tamanho inválido: {w}x{h}")
+        w, h = w - w % 2, h - h % 2                # yuv420p exige pares
+        return f"{w}x{h}", (w, h)
+    ratio = str(spec.get("aspect_ratio", "9:16"))
+    res   = _resolution(ratio)
+    short = spec.get("resolution")
+    if short is not None:
+        short = int(str(short).lower().rstrip("p"))
+        if not 16 <= short <= MAX_OUTPUT_SIDE:
+            raise ValueError(f"Resolução inválida: {spec['resolution']}")
+        res = _scaled_res(res, short)
+    return f"{ratio.replace(':', 'x')}_{min(res)}p", res
+
+
+def _group_key(path: str) -> str:
+    """Prefixo alfabético do nome ('A12.jpg' → 'A'); sem prefixo → DEFAULT."""
+    m = re.match(r'^([A-Za-z]+)', os.path.basename(path))
+    return m.group(1).upper() if m else "DEFAULT"
+
+def _sort_key(path: str) -> int:
+    """1º número do nome ('A12.jpg' → 12). IndexError se não houver dígitos."""
+    return int(re.findall(r'\d+', os.path.basename(path))[0])
 
 def group_images_by_prefix(imgs: List[str]):
     g = defaultdict(list)
     for p in imgs:
-        m = re.match(r'^([A-Za-z]+)', os.path.basename(p))
-        key = m.group(1).upper() if m else "DEFAULT"
-        g[key].append(p)
+        g[_group_key(p)].append(p)
     for lst in g.values():
-        lst.sort(key=lambda x: int(re.findall(r'\d+', os.path.basename(x))[0]))
+        lst.sort(key=_sort_key)
     logger.info("✅ Prefixos: %s", list(g))
     return g
 
+def _runs(images: List[str]) -> List[Tuple[str, int]]:
+    """Agrupa ocorrências consecutivas iguais: [a, a, b] → [(a, 2), (b, 1)]."""
+    out: List[Tuple[str, int]] = []
+    for img in images:
+        if out and out[-1][0] == img:
+            out[-1] = (img, out[-1][1] + 1)
+        else:
+            out.append((img, 1))
+    return out
+
+def _write_concat(images: List[str], dur_f: float, path: str,
+                  closed: bool = False, lead_us: int = 0) -> None:
+    """Lista do demuxer concat; repetições seguidas viram uma entrada só.
+
+    Durações vão em microssegundos exatos (o demuxer lê no máx. 6 casas), p/
+    que N entradas somem sempre N × dur_f. `closed=True` dá duração também à
+    última imagem (a lista inteira dura len(images) * dur_f), útil quando o
+    vídeo não passa pelo mux de bloco. `lead_us` corrige a 1ª duração (chunks)."""
+    d_us = round(dur_f * 1e6)
+    runs = _runs(images)
+    entries = [(img, n) for img, n in runs[:-1]]
+    img, n = runs[-1]
+    last = n if closed else n - 1
+    if last:
+        entries.append((img, last))
+    with open(path, "w") as f:
+        for k, (img, n) in enumerate(entries):
+            us = d_us * n + (lead_us if k == 0 else 0)
+            f.write(f"file '{img}'\n")
+            f.write(f"duration {us / 1e6:.6f}\n")
+        f.write(f"file '{img}'\n")
+
 # ╭──────────────────────────────────────────────────────────────────────────╮
 # │ 2. Bloco A/B/C                                                         │
 # ╰──────────────────────────────────────────────────────────────────────────╯
+def _video_cmd(concat_txt: str, res: Tuple[int, int], fps: int, out: str,
+               extra: list[str] = (), prof: dict | None = None) -> list[str]:
+    w, h = res
+    prof = prof or profiles.get()
+    return [
+        "ffmpeg", "-y",
+        "-protocol_whitelist", "file,pipe",
+        "-f", "concat", "-safe", "0", "-i", concat_txt,
+        "-vsync", "vfr", "-r", str(fps),
+        "-vf", (f"scale={w}:{h}:force_original_aspect_ratio=decrease,"   # ← fix
+                f"pad={w}:{h}:(ow-iw)/2:(oh-ih)/2"),
+        "-pix_fmt", "yuv420p",
+        #"-c:v", "libx264", "-preset", "veryfast",
+        *profiles.video_args(prof),
+        *extra,
+        out
+    ]
+
+def _chunk_count(n_images: int, dur_f: float, fps: int, chunks: int) -> int:
+    """Nº efetivo de chunks: ≥2 imagens por chunk e ≥1 frame por imagem."""
+    if chunks <= 1 or dur_f * fps <= 1:
+        return 1
+    return max(1, min(chunks, n_images // 2))
+
+def _encode_chunked(images: List[str], dur_f: float, res: Tuple[int, int],
+                    fps: int, k: int, out: str, prof: dict | None = None) -> None:
+    """Divide o bloco em `k` trechos (em fronteiras de imagem), codifica em
+    paralelo com GOP fechado e junta com concat em stream copy.
+
+    Cada trecho começa no frame global F = round(início × fps); a 1ª duração
+    é corrigida (`lead_us`) para que todo frame caia no mesmo instante do
+    encode único, e a lista de junção fixa a duração de cada trecho em
+    (F_seguinte − F) / fps."""
+    n, d_us, tick = len(images), round(dur_f * 1e6), 1e6 / fps
+    bounds  = sorted({round(i * n / k) for i in range(k + 1)})
+    starts  = bounds[:-1]
+    frame0  = [(s * d_us * fps + 500_000) // 1_000_000 for s in starts]
+    threads = str(max(1, (os.cpu_count() or 1) // len(starts)))
+    tmpd    = tempfile.mkdtemp()
+    logger.info("🧩 %d imgs em %d chunks paralelos (%s threads cada)",
+                n, len(starts), threads)
+
+    cmds, parts = [], []
+    for i, (a, b) in enumerate(zip(bounds, bounds[1:])):
+        lst  = os.path.join(tmpd, f"c{i}.txt")
+        part = os.path.join(tmpd, f"c{i}.mp4")
+        _write_concat(images[a:b], dur_f, lst,
+                      lead_us=a * d_us - round(frame0[i] * tick))
+        cmds.append(_video_cmd(lst, res, fps, part,
+                               ["-x264-params", "open-gop=0", "-threads", threads],
+                               prof))
+        parts.append(part)
+
+    with ThreadPoolExecutor(max_workers=len(cmds)) as ex:
+        list(ex.map(_run, cmds))
+
+    stitch = os.path.join(tmpd, "stitch.txt")
+    with open(stitch, "w") as f:
+        for i, part in enumerate(parts):
+            f.write(f"file '{part}'\n")
+            if i + 1 < len(parts):
+                f.write(f"duration {(frame0[i + 1] - frame0[i]) * tick / 1e6:.6f}\n")
+    _run(["ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", stitch,
+          "-c", "copy", out])
+    shutil.rmtree(tmpd, ignore_errors=True)
+
 def _make_block(images: List[str], audio: str, out_mp4: str,
-                res: Tuple[int, int], fps: int = 25) -> None:
-    """Renderiza um bloco (imagens + áudio integral) na resolução `res`."""
+                res: Tuple[int, int], fps: int | None = None,
+                dur_a: float | None = None, chunks: int = 1,
+                profile: str | dict | None = None) -> None:
+    """Renderiza um bloco (imagens + áudio integral) na resolução `res`.
+
+    `chunks > 1` codifica o vídeo em trechos paralelos (ver _encode_chunked);
+    `profile` escolhe preset/CRF/fps/GOP/áudio (ver core.profiles)."""
     if not images:
         raise ValueError("Lista de imagens vazia")
+    prof = profiles.get(profile)
+    fps  = fps or prof["fps"]
 
-    dur_a = _audio_duration(audio)
+    if dur_a is None:
+        dur_a = _audio_duration(audio)
     dur_f = dur_a / len(images)
-    w, h  = res
     logger.info("🖼️  %d imgs | %.2fs áudio → %.3fs/frame",
                 len(images), dur_a, dur_f)
 
     # arquivo-lista para o concat
     concat_txt = tempfile.NamedTemporaryFile(delete=False, suffix=".txt").name
-    with open(concat_txt, "w") as f:
-        for img in images[:-1]:
-            f.write(f"file '{img}'\n")
-            f.write(f"duration {dur_f}\n")
-        f.write(f"file '{images[-1]}'\n")
+    _write_concat(images, dur_f, concat_txt)
 
     # 1. vídeo silencioso escalado/pad
     vid_tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".mp4").name
-    _run([
-        "ffmpeg", "-y",
-        "-protocol_whitelist", "file,pipe",
-        "-f", "concat", "-safe", "0", "-i", concat_txt,
-        "-vsync", "vfr", "-r", str(fps),
-        "-vf", (f"scale={w}:{h}:force_original_aspect_ratio=decrease,"   # ← fix
-                f"pad={w}:{h}:(ow-iw)/2:(oh-ih)/2"),
-        "-pix_fmt", "yuv420p",
-        #"-c:v", "libx264", "-preset", "veryfast",
-        "-c:v", "libx264", "-preset", "veryfast", "-crf", "18",
-        "-profile:v", "high", "-level", "4.2",
-        vid_tmp
-    ])
+    k = _chunk_count(len(images), dur_f, fps, chunks)
+    if k > 1:
+        _encode_chunked(images, dur_f, res, fps, k, vid_tmp, prof)
+    else:
+        _run(_video_cmd(concat_txt, res, fps, vid_tmp, prof=prof))
 
     # 2. muxa áudio integral
     _run([
         "ffmpeg", "-y",
         "-i", vid_tmp, "-i", audio,
         "-c:v", "copy",
-        "-c:a", "aac", "-b:a", "192k", "-ar", "48000", "-ac", "2",
+        *profiles.audio_args(prof),
         "-map", "0:v:0", "-map", "1:a:0",
         out_mp4
     ])
@@ -107,14 +259,16 @@ def _make_block(images: List[str], audio: str, out_mp4: str,
 # ╭──────────────────────────────────────────────────────────────────────────╮
 # │ 3. Tela verde                                                          │
 # ╰──────────────────────────────────────────────────────────────────────────╯
-def _green(path: str, dur: int, res: Tuple[int, int]) -> None:
+def _green(path: str, dur: int, res: Tuple[int, int],
+           profile: str | dict | None = None) -> None:
     w, h = res
+    prof = profiles.get(profile)
     _run([
         "ffmpeg", "-y",
-        "-f", "lavfi", "-i", f"color=00ff00:s={w}x{h}:d={dur}",
+        "-f", "lavfi", "-i", f"color=00ff00:s={w}x{h}:r={prof['fps']}:d={dur}",
         "-f", "lavfi", "-i", "anullsrc=sample_rate=48000:cl=stereo",
-        "-c:v", "libx264", "-pix_fmt", "yuv420p",
-        "-c:a", "aac", "-shortest", "-t", str(dur),
+        *profiles.video_args(prof), "-pix_fmt", "yuv420p",
+        *profiles.audio_args(prof), "-shortest", "-t", str(dur),
         path
     ])
     logger.info("🟩 Tela verde %ss", dur)
@@ -122,18 +276,23 @@ def _green(path: str, dur: int, res: Tuple[int, int]) -> None:
 # ╭──────────────────────────────────────────────────────────────────────────╮
 # │ 4. Pipeline final                                                      │
 # ╰──────────────────────────────────────────────────────────────────────────╯
-def generate_final_video(image_groups,
-                         audio_path: str,
-                         output_path: str,
-                         green_sec: int,
-                         aspect_ratio: str,
-                         progress_cb):
-    res  = _resolution(aspect_ratio)
-    tmpd = tempfile.mkdtemp()
-    parts = []
+# "pyav" depende de PyAV + NumPy (opcionais: pip install -r requirements-pyav.txt);
+# sem eles o job falha com RuntimeError ao começar o render
+ENGINES = ("blocks", "graph", "pyav", "distributed")
 
+
+def _render_blocks(image_groups, audio_path: str, output_path: str,
+                   green_sec: float, res: Tuple[int, int], dur_a: float,
+                   tmpd: str, progress_cb, chunks: int = 1,
+                   prof: dict | None = None, hls=None, checkpoint=None) -> None:
+    """Motor "blocks": um MP4 por bloco/tela verde + concat em stream copy.
+
+    Com `hls` (core.hls.HlsWriter) cada parte é publicada assim que fica pronta;
+    com `checkpoint` (core.jobstore) blocos já salvos são reaproveitados e os
+    novos são salvos ao ficarem prontos."""
+    parts = []
     total = len(image_groups)
-    logger.info("🎬 %d blocos – resolução %s", total, res)
+    prof  = prof or profiles.get()
 
     for i, (pref, imgs) in enumerate(sorted(image_groups.items()), 1):
         pct = 10 + int((i - 1) / total * 70)           # 10‑80 %
@@ -142,36 +301,218 @@ def generate_final_video(image_groups,
 
         # arquivo MP4 do bloco
         blk = os.path.join(tmpd, f"{pref}.mp4")
-        _make_block(imgs, audio_path, blk, res)
+        if not (checkpoint and checkpoint.restore(pref, blk)):
+            with metrics.stage("block"):
+                _make_block(imgs, audio_path, blk, res, dur_a=dur_a, chunks=chunks,
+                            profile=prof)
+            if checkpoint:
+                with metrics.stage("checkpoint"):
+                    checkpoint.save(pref, blk)
         parts.append(blk)
+        if hls:
+            with metrics.stage("hls"):
+                hls.add(blk)
 
         if i != total:
             # Só gera a tela verde se a duração for maior que 0
             if i != total and green_sec > 0:
                 progress_cb(pct + 2, "processing", "Gerando tela verde…")
                 green = os.path.join(tmpd, f"green_{i}.mp4")
-                _green(green, green_sec, res)
+                with metrics.stage("green"):
+                    _green(green, green_sec, res, prof)
                 parts.append(green)
+                if hls:
+                    with metrics.stage("hls"):
+                        hls.add(green)
 
 
     # após todos os blocos
     progress_cb(88, "processing", "Concatenando blocos…")
+    _concat_parts(parts, output_path, tmpd, prof)
 
+
+def _concat_parts(parts: List[str], output_path: str, tmpd: str, prof: dict) -> None:
+    """Junta as partes (mesmo codec/resolução) em stream copy."""
     concat = os.path.join(tmpd, "all.txt")
     with open(concat, "w") as f:
         for p in parts:
             f.write(f"file '{p}'\n")
 
-    _run([
-        "ffmpeg", "-y", "-protocol_whitelist", "file,pipe",
-        "-f", "concat", "-safe", "0", "-i", concat,
-        "-c:v", "copy", "-c:a", "aac", "-b:a", "192k",
-        "-movflags", "+faststart", output_path
-    ])
+    with metrics.stage("concat"):
+        _run([
+            "ffmpeg", "-y", "-protocol_whitelist", "file,pipe",
+            "-f", "concat", "-safe", "0", "-i", concat,
+            "-c:v", "copy", "-c:a", "aac", "-b:a", prof["audio_bitrate"],
+            "-movflags", "+faststart", output_path
+        ])
+
+
+def _prescale_groups(image_groups, res: Tuple[int, int], tmpd: str, progress_cb):
+    """Reduz fotos gigantes (core.prescale) mantendo os grupos."""
+    from core.prescale import prescale_images
+    progress_cb(10, "processing", "Reduzindo imagens grandes…")
+    flat = [p for _, imgs in sorted(image_groups.items()) for p in imgs]
+    small, st = prescale_images(flat, res, os.path.join(tmpd, "prescaled"))
+    it = iter(small)
+    return {pref: [next(it) for _ in imgs]
+            for pref, imgs in sorted(image_groups.items())}, st
+
+
+def generate_final_video(image_groups,
+                         audio_path: str,
+                         output_path: str,
+                         green_sec: int,
+                         aspect_ratio: str,
+                         progress_cb,
+                         prescale: bool = False,
+                         dedup: bool = False,
+                         engine: str = "blocks",
+                         chunks: int = 1,
+                         profile: str | dict | None = None,
+                         hls=None,
+                         checkpoint=None) -> dict:
+    """Renderiza todos os blocos + telas verdes e concatena em `output_path`.
+
+    `engine`: "blocks" (um MP4 por parte + concat), "graph" (um único
+    filter_complex, ver core.graph_engine) ou "pyav" (em processo, ver
+    core.pyav_engine). `chunks` divide cada bloco em trechos codificados em
+    paralelo (só no motor "blocks"). `profile` é o perfil de encode de
+    core.profiles, seguido por todas as etapas (o perfil "preview" também
+    reduz a resolução para 480p). `hls` (core.hls.HlsWriter) recebe as
+    partes já prontas para playback progressivo; nos motores graph/pyav só
+    ao final. `checkpoint` (core.jobstore.Checkpoint) grava o plano e os
+    blocos prontos para retomada. Monta o RenderPlan (core.plan) e o
+    executa; devolve estatísticas do job (ex.: `stats["prescale"]`)."""
+    from core.plan import make_plan
+    prof = profiles.get(profile)
+    if hls:                                        # keyframe a cada segmento (por tempo)
+        prof = {**prof, "keyint_s": hls.seg_s}
+    with metrics.stage("probe"):
+        plan = make_plan(image_groups, audio_path, green_sec, aspect_ratio,
+                         engine, prof)             # 1 probe por job
+    return execute_plan(plan, output_path, progress_cb, prescale=prescale,
+                        dedup=dedup, chunks=chunks, hls=hls, checkpoint=checkpoint)
 
-    # sai com 100 %
+
+def _dir_size(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(d, f))
+               for d, _, files in os.walk(path) for f in files)
+
+
+def execute_plan(plan, output_path: str, progress_cb, prescale: bool = False,
+                 dedup: bool = False, chunks: int = 1, hls=None,
+                 checkpoint=None) -> dict:
+    """Executa um RenderPlan; calibra core.cost com o custo real."""
+    engine, prof, res = plan.engine, plan.profile, plan.resolution
+    image_groups, audio_path = plan.groups, plan.audio_path
+    green_sec, dur_a = plan.green_s, plan.audio_s
+    tmpd = tempfile.mkdtemp()
+    stats = {"engine": engine, "profile": prof["name"], "resolution": list(res),
+             "estimate": cost.estimate(plan)}
+    t0 = time.perf_counter()
+
+    logger.info("🎬 %d blocos – resolução %s – áudio %.2fs – motor %s – perfil %s",
+                len(plan.blocks), res, dur_a, engine, prof["name"])
+    if checkpoint:
+        checkpoint.begin(plan)
+
+    if dedup:
+        from core.dedup import dedup_groups
+        with metrics.stage("dedup"):
+            image_groups, stats["dedup"] = dedup_groups(
+                image_groups, res, os.path.join(tmpd, "dedup"))
+
+    if prescale:
+        with metrics.stage("prescale"):
+            image_groups, stats["prescale"] = _prescale_groups(
+                image_groups, res, tmpd, progress_cb)
+
+    side = ("hls", "checkpoint")                   # não são custo do motor
+    side0, t_enc = metrics.stage_total(*side), time.perf_counter()
+    with metrics.stage("encode"):
+        if engine == "graph":
+            from core.graph_engine import render_graph
+            render_graph(image_groups, audio_path, output_path,
+                         green_sec, res, dur_a, progress_cb, prof)
+        elif engine == "pyav":
+            from core.pyav_engine import render_pyav
+            stats["pyav"] = render_pyav(image_groups, audio_path, output_path,
+                                        green_sec, res, dur_a, progress_cb, prof)
+        elif engine == "distributed":
+            from core.distributed import render_distributed
+            stats["distributed"] = render_distributed(
+                plan, output_path, tmpd, progress_cb, chunks, image_groups)
+        else:
+            _render_blocks(image_groups, audio_path, output_path,
+                           green_sec, res, dur_a, tmpd, progress_cb, chunks, prof, hls,
+                           checkpoint)
+    encode_s = (time.perf_counter() - t_enc) - (metrics.stage_total(*side) - side0)
+    if hls:
+        with metrics.stage("hls"):
+            if engine != "blocks":
+                hls.add(output_path)
+            hls.close()
+        stats["hls"] = {"segments": len(hls.entries), "seconds": round(hls.offset, 2)}
+
+    # custo real → calibração das próximas estimativas: só o tempo do motor
+    # (sem dedup/prescale/HLS/checkpoint); retomada e prévia não calibram
+    stats["elapsed_s"] = round(time.perf_counter() - t0, 2)
+    stats["encode_s"]  = round(encode_s, 2)
+    metrics.record_encode(plan.media_s, stats["elapsed_s"], engine)
+    out_b = os.path.getsize(output_path)
+    stats.update(media_s=round(plan.media_s, 3), output_bytes=out_b,
+                 tmp_peak_bytes=_dir_size(tmpd) + out_b)  # partes ficam até o fim
+    resumed = bool(checkpoint and checkpoint.restored)
+    if resumed or prof["name"] == "preview":
+        logger.info("📐 Calibração ignorada (%s)", "retomada" if resumed else "prévia")
+    else:
+        cost.observe(plan, encode_s, out_b, stats["tmp_peak_bytes"])
+
+    # sai com 100 %
     progress_cb(100, "completed", "Pronto!")
     logger.info("🎉 Final → %s", output_path)
     shutil.rmtree(tmpd, ignore_errors=True)
+    return stats
+
+
+def generate_multi_video(image_groups,
+                         audio_path: str,
+                         targets: List[Tuple[str, Tuple[int, int]]],
+                         green_sec: int,
+                         progress_cb,
+                         prescale: bool = False,
+                         profile: str | dict | None = None) -> dict:
+    """Mesma timeline em vários alvos [(saída, (W,H)), …] num só passe.
+
+    Cada imagem é decodificada uma vez e o filter_complex (core.graph_engine)
+    faz o split para cada proporção/resolução. Sem dedup: a normalização dele
+    é para uma única resolução."""
+    from core.graph_engine import render_graph_multi
+    prof = profiles.get(profile)
+    targets = [(p, _scaled_res(r, prof.get("short_side"))) for p, r in targets]
+    tmpd = tempfile.mkdtemp()
+    stats = {"engine": "graph", "profile": prof["name"],
+             "outputs": [list(r) for _, r in targets]}
+
+    dur_a = _audio_duration(audio_path)
+    logger.info("🎬 %d blocos – %d saídas %s – áudio %.2fs – perfil %s",
+                len(image_groups), len(targets), [r for _, r in targets],
+                dur_a, prof["name"])
+
+    if prescale:                                   # cobre o maior alvo
+        bound = (max(r[0] for _, r in targets), max(r[1] for _, r in targets))
+        image_groups, stats["prescale"] = _prescale_groups(
+            image_groups, bound, tmpd, progress_cb)
+
+    render_graph_multi(image_groups, audio_path, targets,
+                       green_sec, dur_a, progress_cb, prof)
+    n = len(image_groups)
+    stats.update(media_s=round(n * dur_a + (n - 1) * max(green_sec, 0), 3),
+                 output_bytes=sum(os.path.getsize(p) for p, _ in targets))
+
+    progress_cb(100, "completed", "Pronto!")
+    logger.info("🎉 Final → %s", ", ".join(p for p, _ in targets))
+    shutil.rmtree(tmpd, ignore_errors=True)
+    return stats
 
 # ─────────────────────────────────────────────────────────────────────────────
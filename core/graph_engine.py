@@ -0,0 +1,133 @@
+# ─────────────────────────────────────────────────────────────────────────────
+#  graph_engine.py  –  timeline inteira num único ffmpeg (filter_complex)
+# ─────────────────────────────────────────────────────────────────────────────
+#  O motor "blocks" (ffmpeg_processor) gera um MP4 por bloco e por tela verde
+#  e depois concatena: N inicializações do ffmpeg/x264 e vários GB de
+#  intermediários no tmp. Aqui cada bloco entra como uma lista concat de
+#  imagens, as telas verdes vêm de `color`/`anullsrc`, a narração entra uma
+#  vez por bloco (uma entrada `-i` cada) e tudo sai de um só encode. Com vários alvos
+#  (proporções/resoluções) o mesmo decode é dividido com `split`.
+# ─────────────────────────────────────────────────────────────────────────────
+import os, logging, tempfile, shutil
+from typing import Dict, List, Tuple
+
+from core import profiles
+from core.ffmpeg_processor import _run_progress, _write_concat
+
+logger = logging.getLogger(__name__)
+
+
+def build_command(lists: List[str], audio_path: str, output_path: str,
+                  green_sec: float, res: Tuple[int, int], dur_a: float,
+                  prof: dict | None = None) -> list[str]:
+    """Comando ffmpeg: [bloco, verde, bloco, verde, …, bloco] → output_path."""
+    return build_multi_command(lists, audio_path, [(output_path, res)],
+                               green_sec, dur_a, prof)
+
+
+def build_multi_command(lists: List[str], audio_path: str,
+                        targets: List[Tuple[str, Tuple[int, int]]],
+                        green_sec: float, dur_a: float,
+                        prof: dict | None = None) -> list[str]:
+    """Mesma timeline para vários alvos [(saída, (W,H)), …].
+
+    Cada lista concat é decodificada uma vez e dividida (`split`) entre os
+    alvos; a trilha de áudio é montada uma vez e replicada com `asplit`.
+    A narração de cada bloco é uma entrada própria: com um só decode +
+    `asplit={n}` o concat (que consome em ordem) deixaria os ramos dos blocos
+    seguintes guardando todo o PCM decodificado até a vez deles."""
+    prof = prof or profiles.get()
+    fps  = prof["fps"]
+    n, T = len(lists), len(targets)
+    inputs, chains = [], []
+
+    # -reinit_filter 0: imagem de tamanho/pix_fmt diferente no meio da lista
+    # não reconstrói o grafo (zeraria concat/asplit/color e perderia frames);
+    # o scale de cada cadeia absorve a mudança
+    for lst in lists:
+        inputs += ["-reinit_filter", "0", "-f", "concat", "-safe", "0", "-i", lst]
+    for _ in lists:                                # entradas n … 2n-1: narração
+        inputs += ["-i", audio_path]
+    gaps = [k for k in range(n - 1) if green_sec > 0]
+
+    # áudio: narração por bloco + silêncio nas telas verdes → T cópias
+    a_seq = []
+    for k in range(n):
+        chains.append(f"[{n + k}:a]aresample=48000,aformat=channel_layouts=stereo[a{k}]")
+        a_seq.append(f"[a{k}]")
+        if k in gaps:
+            chains.append(f"anullsrc=r=48000:cl=stereo,"
+                          f"atrim=duration={green_sec}[ga{k}]")
+            a_seq.append(f"[ga{k}]")
+    chains.append("".join(a_seq) + f"concat=n={len(a_seq)}:v=0:a=1,"
+                  f"asplit={T}" + "".join(f"[aout{t}]" for t in range(T)))
+
+    # vídeo: decode único por bloco, split → scale/pad por alvo
+    for k in range(n):
+        src = [f"[{k}:v]"]
+        if T > 1:
+            chains.append(f"[{k}:v]split={T}" + "".join(f"[s{k}_{t}]" for t in range(T)))
+            src = [f"[s{k}_{t}]" for t in range(T)]
+        for t, (_, (w, h)) in enumerate(targets):
+            chains.append(
+                f"{src[t]}scale={w}:{h}:force_original_aspect_ratio=decrease,"
+                f"pad={w}:{h}:(ow-iw)/2:(oh-ih)/2,setsar=1,fps={fps},"
+                f"format=yuv420p,trim=duration={dur_a},setpts=PTS-STARTPTS[v{k}_{t}]")
+    outs = []
+    for t, (path, (w, h)) in enumerate(targets):
+        v_seq = []
+        for k in range(n):
+            v_seq.append(f"[v{k}_{t}]")
+            if k in gaps:
+                chains.append(f"color=c=0x00ff00:s={w}x{h}:r={fps}:d={green_sec},"
+                              f"format=yuv420p,setsar=1[gv{k}_{t}]")
+                v_seq.append(f"[gv{k}_{t}]")
+        chains.append("".join(v_seq) + f"concat=n={len(v_seq)}:v=1:a=0[vout{t}]")
+        outs += ["-map", f"[vout{t}]", "-map", f"[aout{t}]",
+                 "-r", str(fps), "-pix_fmt", "yuv420p",
+                 *profiles.video_args(prof),
+                 *profiles.audio_args(prof),
+                 "-movflags", "+faststart", path]
+
+    return ["ffmpeg", "-y", "-protocol_whitelist", "file,pipe",
+            *inputs,
+            "-filter_complex", ";".join(chains),
+            *outs]
+
+
+def render_graph(image_groups: Dict[str, List[str]], audio_path: str,
+                 output_path: str, green_sec: float, res: Tuple[int, int],
+                 dur_a: float, progress_cb, prof: dict | None = None) -> None:
+    """Motor "graph": mesma timeline do motor por blocos, um único processo."""
+    render_graph_multi(image_groups, audio_path, [(output_path, res)],
+                       green_sec, dur_a, progress_cb, prof)
+
+
+def render_graph_multi(image_groups: Dict[str, List[str]], audio_path: str,
+                       targets: List[Tuple[str, Tuple[int, int]]],
+                       green_sec: float, dur_a: float, progress_cb,
+                       prof: dict | None = None) -> None:
+    """Um único processo, uma decodificação, uma saída por alvo."""
+    tmpd  = tempfile.mkdtemp()
+    lists = []
+    try:
+        for pref, imgs in sorted(image_groups.items()):
+            if not imgs:
+                raise ValueError("Lista de imagens vazia")
+            lst = os.path.join(tmpd, f"{pref}.txt")
+            _write_concat(imgs, dur_a / len(imgs), lst, closed=True)
+            lists.append(lst)
+
+        n     = len(lists)
+        total = n * dur_a + (n - 1) * max(green_sec, 0)
+        logger.info("🕸️  Graph: %d blocos, %.1fs de timeline num só encode → %d saída(s)",
+                    n, total, len(targets))
+        progress_cb(10, "processing", f"Renderizando {n} blocos (graph)…")
+
+        cmd = build_multi_command(lists, audio_path, targets,
+                                  green_sec, dur_a, prof)
+        _run_progress(cmd, total,
+                      lambda f: progress_cb(10 + int(f * 78), "processing",
+                                            f"Renderizando timeline… {int(f * 100)}%"))
+    finally:
+        shutil.rmtree(tmpd, ignore_errors=True)
@@ -0,0 +1,108 @@
+# ─────────────────────────────────────────────────────────────────────────────
+#  hls.py  –  saída HLS progressiva (segmentos publicados durante o render)
+# ─────────────────────────────────────────────────────────────────────────────
+#  No motor "blocks" cada bloco/tela verde vira um MP4 completo antes do
+#  próximo começar. Assim que uma parte fica pronta ela é fatiada em
+#  segmentos MPEG-TS (stream copy, sem reencode), com os timestamps
+#  deslocados pela duração real (probe) das partes anteriores, e a playlist
+#  EVENT cresce: o player começa a tocar segundos depois do 1º bloco. Cada
+#  parte nova abre com #EXT-X-DISCONTINUITY (o priming do AAC de cada MP4
+#  não emenda sem lacuna). O keyframe sai a cada `seg_s` segundos (perfil
+#  "keyint_s"), não a cada N frames — o motor "blocks" é vfr. O MP4 final
+#  continua sendo o concat das mesmas partes.
+# ─────────────────────────────────────────────────────────────────────────────
+import os, math, logging
+from typing import Callable, List, Tuple
+
+from core import probe
+from core.ffmpeg_processor import _run
+
+logger = logging.getLogger(__name__)
+
+PLAYLIST = "index.m3u8"
+SEG_S    = 6                                      # duração alvo dos segmentos
+
+
+def _parse(m3u8: str) -> List[Tuple[float, str]]:
+    """[(duração, arquivo), …] de uma playlist gerada pelo ffmpeg."""
+    out, dur = [], None
+    with open(m3u8) as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith("#EXTINF:"):
+                dur = float(line[8:].split(",")[0])
+            elif line and not line.startswith("#") and dur is not None:
+                out.append((dur, line))
+                dur = None
+    return out
+
+
+class HlsWriter:
+    """Playlist HLS que recebe partes (MP4) em ordem e publica cada segmento.
+
+    `publish(path)` é chamado para cada segmento novo e, em seguida, para a
+    playlist atualizada (upload ao bucket, cópia local…)."""
+
+    def __init__(self, out_dir: str, publish: Callable[[str], None] | None = None,
+                 seg_s: int = SEG_S):
+        os.makedirs(out_dir, exist_ok=True)
+        self.dir      = out_dir
+        self.publish  = publish or (lambda path: None)
+        self.seg_s    = seg_s
+        self.playlist = os.path.join(out_dir, PLAYLIST)
+        self.entries: List[Tuple[float, str]] = []
+        self.offset   = 0.0                       # início da próxima parte (s)
+        self.parts    = 0
+        self.breaks: set[int] = set()             # índice do 1º segmento de cada parte
+
+    def add(self, mp4: str) -> int:
+        """Fatia `mp4` (stream copy) e publica; devolve nº de segmentos novos."""
+        tag = f"p{self.parts:03d}"
+        tmp = os.path.join(self.dir, f"{tag}.m3u8")
+        _run([
+            "ffmpeg", "-y", "-i", mp4, "-c", "copy",
+            "-output_ts_offset", f"{self.offset:.6f}",
+            "-f", "hls", "-hls_time", str(self.seg_s), "-hls_list_size", "0",
+            "-hls_segment_type", "mpegts",
+            "-hls_segment_filename", os.path.join(self.dir, f"{tag}_%04d.ts"),
+            tmp
+        ])
+        new = _parse(tmp)
+        os.remove(tmp)
+
+        for _, name in new:
+            self.publish(os.path.join(self.dir, name))
+        if self.parts:
+            self.breaks.add(len(self.entries))
+        self.entries += new
+        try:                                      # EXTINF arredonda nos keyframes
+            self.offset += probe.duration(mp4)
+        except (OSError, ValueError):
+            self.offset += sum(d for d, _ in new)
+        self.parts   += 1
+        self._write(final=False)
+        logger.info("📡 HLS: parte %d → %d segmentos (%.1fs publicados)",
+                    self.parts, len(new), self.offset)
+        return len(new)
+
+    def close(self) -> str:
+        """Fecha a playlist (#EXT-X-ENDLIST) e devolve o caminho dela."""
+        self._write(final=True)
+        return self.playlist
+
+    def _write(self, final: bool):
+        target = max([self.seg_s] + [math.ceil(d) for d, _ in self.entries])
+        lines  = ["#EXTM3U", "#EXT-X-VERSION:3",
+                  f"#EXT-X-TARGETDURATION:{target}",
+                  "#EXT-X-MEDIA-SEQUENCE:0", "#EXT-X-PLAYLIST-TYPE:EVENT"]
+        for i, (d, name) in enumerate(self.entries):
+            if i in self.breaks:
+                lines.append("#EXT-X-DISCONTINUITY")
+            lines += [f"#EXTINF:{d:.6f},", name]
+        if final:
+            lines.append("#EXT-X-ENDLIST")
+        tmp = self.playlist + ".tmp"
+        with open(tmp, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp, self.playlist)             # leitores nunca veem meia playlist
+        self.publish(self.playlist)
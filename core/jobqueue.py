@@ -0,0 +1,333 @@
+# ─────────────────────────────────────────────────────────────────────────────
+#  jobqueue.py  –  fila de render entre o web e os workers (core.worker)
+# ─────────────────────────────────────────────────────────────────────────────
+#  Com RENDER_QUEUE definido o web só enfileira (/create_video) e transmite o
+#  progresso (SSE); o render roda em `python -m core.worker`, em outro
+#  processo ou instância, e web e render escalam separados.
+#
+#      RENDER_QUEUE=sqlite:/data/render.db     um arquivo SQLite (WAL)
+#      RENDER_QUEUE=dir:/data/render_queue     pending/ running/ progress/
+#
+#  O progresso de cada job (o mesmo dict de progress_data) também fica na
+#  fila: o worker grava, o SSE do web lê. Um job "running" sem heartbeat há
+#  LEASE_S volta para a fila (worker morto); o próximo worker o retoma —
+#  com DURABLE_JOBS, a partir dos blocos já salvos (core.jobstore).
+#  Ordem de saída: a mesma do core.scheduler — log do custo + uso recente do
+#  cliente (decai com HALF_LIFE_S, guardado na própria fila), menos o aging.
+# ─────────────────────────────────────────────────────────────────────────────
+import os, json, time, fcntl, sqlite3, logging
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+
+from core.scheduler import HALF_LIFE_S, priority
+
+logger = logging.getLogger(__name__)
+
+LEASE_S  = float(os.environ.get("RENDER_QUEUE_LEASE_S", "120"))
+KEEP_S   = 24 * 3600                     # progresso de jobs já lidos/abandonados
+
+
+def _decay(value: float, dt: float) -> float:
+    return value * 0.5 ** (max(0.0, dt) / HALF_LIFE_S)
+
+
+class JobQueue(ABC):
+    """Interface comum; `claim` devolve {"id", "spec", "client"} ou None
+    (`prefix`: só jobs cujo id começa com ele)."""
+
+    @abstractmethod
+    def put(self, job_id: str, spec: dict, client: str, cost: float): ...
+
+    @abstractmethod
+    def claim(self, worker: str, prefix: str = "") -> dict | None: ...
+
+    @abstractmethod
+    def cancel(self, job_id: str):
+        """Tira da fila, se ainda não foi pego."""
+
+    @abstractmethod
+    def heartbeat(self, job_id: str): ...
+
+    @abstractmethod
+    def release(self, job_id: str):
+        """Devolve à fila um job em andamento."""
+
+    @abstractmethod
+    def finish(self, job_id: str): ...
+
+    @abstractmethod
+    def requeue_stale(self) -> int: ...
+
+    @abstractmethod
+    def progress(self, job_id: str, fields: dict): ...
+
+    @abstractmethod
+    def get(self, job_id: str) -> dict: ...
+
+    @abstractmethod
+    def forget(self, job_id: str): ...
+
+    @abstractmethod
+    def depth(self) -> dict:
+        """{"queued", "running"}"""
+
+
+# ╭──────────────────────────────────────────────────────────────────────────╮
+# │ SQLite                                                                  │
+# ╰──────────────────────────────────────────────────────────────────────────╯
+class SqliteQueue(JobQueue):
+    def __init__(self, path: str):
+        self.path = path
+        db = sqlite3.connect(path, timeout=30)     # WAL não muda dentro de transação
+        try:
+            db.execute("PRAGMA journal_mode=WAL")
+        finally:
+            db.close()
+        with self._db() as db:
+            db.execute("""CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY, spec TEXT, client TEXT, cost REAL,
+                state TEXT, worker TEXT, created REAL, heartbeat REAL,
+                progress TEXT NOT NULL DEFAULT '{}')""")
+            db.execute("""CREATE TABLE IF NOT EXISTS usage (
+                client TEXT PRIMARY KEY, value REAL, stamp REAL)""")
+
+    @contextmanager
+    def _db(self, write: bool = True):
+        """Uma conexão por operação; BEGIN IMMEDIATE serializa as escritas,
+        leituras (get/depth, o SSE) usam transação adiada e não bloqueiam no WAL."""
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            db.execute("BEGIN IMMEDIATE" if write else "BEGIN")
+            yield db
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        finally:
+            db.close()
+
+    def put(self, job_id, spec, client, cost):
+        with self._db() as db:
+            db.execute("INSERT INTO jobs (id, spec, client, cost, state, created) "
+                       "VALUES (?, ?, ?, ?, 'queued', ?)",
+                       (job_id, json.dumps(spec), client, cost, time.time()))
+
+    def claim(self, worker, prefix=""):
+        now = time.time()
+        with self._db() as db:
+            rows = db.execute("SELECT id, client, cost, created FROM jobs "
+                              "WHERE state = 'queued' AND substr(id, 1, ?) = ?",
+                              (len(prefix), prefix)).fetchall()
+            if not rows:
+                return None
+            usage = {c: _decay(v, now - t) for c, v, t in
+                     db.execute("SELECT client, value, stamp FROM usage")}
+            job_id, client, cost, _ = min(rows, key=lambda r: (
+                priority(r[2], usage.get(r[1], 0.0), now - r[3]), r[3]))
+            db.execute("UPDATE jobs SET state = 'running', worker = ?, heartbeat = ? "
+                       "WHERE id = ?", (worker, now, job_id))
+            db.execute("INSERT OR REPLACE INTO usage VALUES (?, ?, ?)",
+                       (client, usage.get(client, 0.0) + cost, now))
+            spec = db.execute("SELECT spec FROM jobs WHERE id = ?", (job_id,)).fetchone()[0]
+        return {"id": job_id, "spec": json.loads(spec), "client": client}
+
+    def cancel(self, job_id):
+        with self._db() as db:
+            db.execute("DELETE FROM jobs WHERE id = ? AND state = 'queued'", (job_id,))
+
+    def heartbeat(self, job_id):
+        with self._db() as db:
+            db.execute("UPDATE jobs SET heartbeat = ? WHERE id = ? AND state = 'running'",
+                       (time.time(), job_id))
+
+    def release(self, job_id):
+        with self._db() as db:
+            db.execute("UPDATE jobs SET state = 'queued', worker = NULL "
+                       "WHERE id = ? AND state = 'running'", (job_id,))
+
+    def finish(self, job_id):
+        with self._db() as db:
+            db.execute("UPDATE jobs SET state = 'done', heartbeat = ? WHERE id = ?",
+                       (time.time(), job_id))
+
+    def requeue_stale(self):
+        now = time.time()
+        with self._db() as db:
+            n = db.execute("UPDATE jobs SET state = 'queued', worker = NULL "
+                           "WHERE state = 'running' AND heartbeat < ?",
+                           (now - LEASE_S,)).rowcount
+            db.execute("DELETE FROM jobs WHERE state = 'done' AND heartbeat < ?",
+                       (now - KEEP_S,))
+            db.execute("DELETE FROM usage WHERE stamp < ?", (now - 10 * HALF_LIFE_S,))
+        return n
+
+    def progress(self, job_id, fields):
+        with self._db() as db:
+            row = db.execute("SELECT progress FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row:
+                db.execute("UPDATE jobs SET progress = ? WHERE id = ?",
+                           (json.dumps({**json.loads(row[0]), **fields}, default=str), job_id))
+
+    def get(self, job_id):
+        with self._db(write=False) as db:
+            row = db.execute("SELECT progress FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def forget(self, job_id):
+        with self._db() as db:
+            db.execute("DELETE FROM jobs WHERE id = ? AND state = 'done'", (job_id,))
+
+    def depth(self):
+        with self._db(write=False) as db:
+            rows = dict(db.execute("SELECT state, COUNT(*) FROM jobs "
+                                   "WHERE state IN ('queued', 'running') GROUP BY state"))
+        return {"queued": rows.get("queued", 0), "running": rows.get("running", 0)}
+
+
+# ╭──────────────────────────────────────────────────────────────────────────╮
+# │ Diretório (rename atômico entre pending/ e running/)                    │
+# ╰──────────────────────────────────────────────────────────────────────────╯
+class DirQueue(JobQueue):
+    def __init__(self, root: str):
+        self.root = root
+        for d in ("pending", "running", "progress"):
+            os.makedirs(os.path.join(root, d), exist_ok=True)
+
+    def _p(self, *parts) -> str:
+        return os.path.join(self.root, *parts)
+
+    def _write_json(self, path: str, obj: dict):
+        with open(path + ".tmp", "w") as f:
+            json.dump(obj, f, default=str)
+        os.replace(path + ".tmp", path)
+
+    @contextmanager
+    def _flock(self, path: str):
+        fd = os.open(path + ".lock", os.O_CREAT | os.O_RDWR, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)
+
+    def _usage(self, now: float) -> dict:
+        """cliente → uso decaído (usage.json, só lido/gravado sob _flock)."""
+        try:
+            with open(self._p("usage.json")) as f:
+                raw = json.load(f)
+        except (FileNotFoundError, ValueError):
+            raw = {}
+        return {c: _decay(v, now - t) for c, (v, t) in raw.items()
+                if now - t < 10 * HALF_LIFE_S}
+
+    def put(self, job_id, spec, client, cost):
+        self._write_json(self._p("progress", f"{job_id}.json"), {})
+        self._write_json(self._p("pending", f"{job_id}.json"),
+                         {"id": job_id, "spec": spec, "client": client,
+                          "cost": cost, "created": time.time()})
+
+    def claim(self, worker, prefix=""):
+        with self._flock(self._p("usage.json")):
+            now, jobs = time.time(), []
+            for name in os.listdir(self._p("pending")):
+                if name.endswith(".json") and name.startswith(prefix):
+                    try:
+                        with open(self._p("pending", name)) as f:
+                            jobs.append(json.load(f))
+                    except (OSError, ValueError):
+                        continue                          # sendo gravado/movido
+            usage = self._usage(now)
+            jobs.sort(key=lambda j: (priority(j["cost"], usage.get(j["client"], 0.0),
+                                              now - j["created"]), j["created"]))
+            for job in jobs:
+                try:                                      # só um worker vence o rename
+                    os.rename(self._p("pending", f"{job['id']}.json"),
+                              self._p("running", f"{job['id']}.json"))
+                except FileNotFoundError:
+                    continue
+                self.heartbeat(job["id"])
+                usage[job["client"]] = usage.get(job["client"], 0.0) + job["cost"]
+                self._write_json(self._p("usage.json"),
+                                 {c: [v, now] for c, v in usage.items()})
+                return {k: job[k] for k in ("id", "spec", "client")}
+        return None
+
+    def cancel(self, job_id):
+        try:
+            os.remove(self._p("pending", f"{job_id}.json"))
+        except FileNotFoundError:
+            pass
+
+    def heartbeat(self, job_id):
+        try:
+            os.utime(self._p("running", f"{job_id}.json"))
+        except FileNotFoundError:
+            pass
+
+    def release(self, job_id):
+        try:
+            os.rename(self._p("running", f"{job_id}.json"),
+                      self._p("pending", f"{job_id}.json"))
+        except FileNotFoundError:
+            pass
+
+    def finish(self, job_id):
+        try:
+            os.remove(self._p("running", f"{job_id}.json"))
+        except FileNotFoundError:
+            pass
+
+    def requeue_stale(self):
+        now, n = time.time(), 0
+        for name in os.listdir(self._p("running")):
+            try:
+                if os.path.getmtime(self._p("running", name)) < now - LEASE_S:
+                    self.release(name[:-5])
+                    n += 1
+            except FileNotFoundError:
+                pass
+        for name in os.listdir(self._p("progress")):
+            path = self._p("progress", name)
+            try:
+                if name.endswith(".json") and os.path.getmtime(path) < now - KEEP_S:
+                    os.remove(path)
+            except FileNotFoundError:
+                pass
+        return n
+
+    def progress(self, job_id, fields):
+        path = self._p("progress", f"{job_id}.json")
+        if not os.path.exists(path):
+            return
+        with self._flock(path):
+            self._write_json(path, {**self.get(job_id), **fields})
+
+    def get(self, job_id):
+        try:
+            with open(self._p("progress", f"{job_id}.json")) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def forget(self, job_id):
+        for suffix in (".json", ".json.lock"):
+            try:
+                os.remove(self._p("progress", job_id + suffix))
+            except FileNotFoundError:
+                pass
+
+    def depth(self):
+        count = lambda d: sum(n.endswith(".json") for n in os.listdir(self._p(d)))
+        return {"queued": count("pending"), "running": count("running")}
+
+
+def open_queue(url: str | None) -> JobQueue | None:
+    """"sqlite:<arquivo>" | "dir:<diretório>" | vazio → None (render no web)."""
+    if not url:
+        return None
+    kind, _, path = url.partition(":")
+    if kind == "sqlite":
+        return SqliteQueue(path)
+    if kind == "dir":
+        return DirQueue(path)
+    raise ValueError(f"RENDER_QUEUE inválido: {url} (use sqlite:<arquivo> ou dir:<diretório>)")
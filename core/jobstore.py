@@ -0,0 +1,328 @@
+# ─────────────────────────────────────────────────────────────────────────────
+#  jobstore.py  –  estado durável dos jobs: retomada após reciclagem/SIGTERM
+# ─────────────────────────────────────────────────────────────────────────────
+#  O gunicorn recicla o worker (max_requests), o Cloud Run manda SIGTERM ao
+#  reduzir instâncias e process_video roda numa thread daemon: o render em
+#  andamento sumia e o usuário recomeçava do zero. Agora cada job grava em
+#  jobs/<id>/ (disco local ou bucket):
+#
+#      job.json         spec do /create_video, cliente, fase, plano, perfil
+#                       escolhido, dono (host:pid), heartbeat, partes prontas
+#      parts/<p>.mp4    MP4 de cada bloco concluído (motor "blocks")
+#
+#  Um laço por processo renova o heartbeat dos seus jobs e adota os órfãos
+#  (fase "interrupted" ou heartbeat mais velho que LEASE_S). Toda escrita é
+#  um read‑modify‑write atômico (flock no disco, if_generation_match no GCS)
+#  e só o dono grava — um worker antigo terminando de drenar não sobrescreve
+#  o job já adotado. O job adotado volta à fila com o mesmo id e o
+#  Checkpoint pula os blocos já salvos. Ao terminar, jobs/<id>/ é apagado.
+#  Opcional (DURABLE_JOBS=1): sem ele os apps não gravam estado nenhum.
+# ─────────────────────────────────────────────────────────────────────────────
+import os, json, time, fcntl, shutil, socket, hashlib, logging, threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager, nullcontext
+
+logger = logging.getLogger(__name__)
+
+LEASE_S     = float(os.environ.get("JOB_LEASE_S", "120"))
+MAX_RESUMES = int(os.environ.get("JOB_MAX_RESUMES", "3"))   # evita loop com job que derruba o worker
+TERMINAL    = {"completed", "error", "cancelled"}
+
+
+def fingerprint(plan) -> str:
+    """O que as partes contêm: imagens (por nome), tempos, resolução, encode."""
+    d = plan.to_dict()
+    key = {"blocks": [(b["prefix"], [os.path.basename(p) for p in b["images"]], b["image_s"])
+                      for b in d["blocks"]],
+           "green_s": d["green_s"], "resolution": d["resolution"], "profile": d["profile"]}
+    return hashlib.sha1(json.dumps(key, sort_keys=True).encode()).hexdigest()[:16]
+
+
+class Checkpoint:
+    """Partes de um job no store: `restore` antes de renderizar, `save` depois."""
+
+    def __init__(self, store: "JobStore", job_id: str):
+        self.store, self.job_id = store, job_id
+        self.parts: dict[str, int] = {}
+        self.restored = 0                     # partes reaproveitadas neste render
+
+    def begin(self, plan):
+        """Grava o plano; partes de um plano diferente são descartadas."""
+        fp = fingerprint(plan)
+        st = self.store.load(self.job_id) or {}
+        self.parts = st.get("parts", {}) if st.get("plan_fp") == fp else {}
+        self.store.update(self.job_id, plan=plan.to_dict(), plan_fp=fp, parts=self.parts)
+
+    def restore(self, name: str, dst: str) -> bool:
+        if name not in self.parts:
+            return False
+        try:
+            ok = self.store.get_file(f"{self.job_id}/parts/{name}.mp4", dst)
+        except Exception as e:
+            logger.warning("⚠️ Parte %s não recuperada (%s): %s", name, self.job_id, e)
+            return False
+        if ok:
+            self.restored += 1
+            logger.info("♻️ Parte %s retomada do checkpoint (%s)", name, self.job_id)
+        return ok
+
+    def save(self, name: str, path: str):
+        try:
+            self.store.put_file(f"{self.job_id}/parts/{name}.mp4", path)
+        except Exception as e:
+            logger.warning("⚠️ Checkpoint da parte %s falhou (%s): %s", name, self.job_id, e)
+            return
+        self.parts[name] = os.path.getsize(path)
+        self.store.update(self.job_id, parts=self.parts)
+
+
+class JobStore(ABC):
+    """Base: estado JSON por job + arquivos; backends implementam o I/O."""
+
+    def __init__(self):
+        self._mine: set[str] = set()          # jobs deste processo
+        self._pid = None
+        self._closed = False
+
+    # ── backend ─────────────────────────────────────────────────────────
+    @abstractmethod
+    def _read(self, key: str) -> tuple[bytes | None, int]:
+        """(conteúdo | None, token de versão para `_write`)."""
+
+    @abstractmethod
+    def _write(self, key: str, data: bytes, token: int) -> bool:
+        """Grava se a versão ainda for `token`; False se outro gravou antes."""
+
+    @abstractmethod
+    def _jobs(self) -> list[str]: ...
+
+    @abstractmethod
+    def _delete(self, job_id: str): ...
+
+    @abstractmethod
+    def put_file(self, key: str, path: str): ...
+
+    @abstractmethod
+    def get_file(self, key: str, dst: str) -> bool: ...
+
+    def _guard(self, job_id: str):
+        return nullcontext()
+
+    # ── estado ──────────────────────────────────────────────────────────
+    @property
+    def owner(self) -> str:
+        return f"{socket.gethostname()}:{os.getpid()}"
+
+    def _mutate(self, job_id: str, fn) -> dict | None:
+        """Read‑modify‑write atômico; `fn(estado) → novo estado | None (não grava)`."""
+        key = f"{job_id}/job.json"
+        try:
+            for _ in range(5):
+                with self._guard(job_id):
+                    raw, token = self._read(key)
+                    st = fn(json.loads(raw) if raw else None)
+                    if st is None:
+                        return None
+                    if self._write(key, json.dumps(st, default=str).encode(), token):
+                        return st
+        except Exception as e:                    # durabilidade não derruba o render
+            logger.warning("⚠️ Estado do job %s não gravado: %s", job_id, e)
+        return None
+
+    def load(self, job_id: str) -> dict | None:
+        try:
+            raw, _ = self._read(f"{job_id}/job.json")
+        except Exception as e:
+            logger.warning("⚠️ Estado do job %s ilegível: %s", job_id, e)
+            return None
+        return json.loads(raw) if raw else None
+
+    def create(self, job_id: str, spec: dict, client: str):
+        """Novo job deste processo. Se já existir (fila core.jobqueue devolveu
+        o job a outro worker), assume o dono e mantém plano/partes."""
+        now = time.time()
+        self._mutate(job_id, lambda st: {
+            "created": now, "resumes": 0, **(st or {}),
+            "id": job_id, "spec": spec, "client": client, "phase": "queued",
+            "owner": self.owner, "heartbeat": now})
+        self._mine.add(job_id)
+
+    def update(self, job_id: str, **fields) -> dict | None:
+        """Só o dono grava (e nada depois de `interrupt`)."""
+        def fn(st):
+            if self._closed or not st or st.get("owner") != self.owner:
+                return None
+            return {**st, **fields, "heartbeat": time.time()}
+        return self._mutate(job_id, fn)
+
+    def finish(self, job_id: str):
+        """Job terminou (qualquer fase final): apaga jobs/<id>/. Depois de
+        `interrupt` não apaga — o render que falhou durante a drenagem foi
+        derrubado por ela, e o checkpoint fica para quem adotar o job."""
+        self._mine.discard(job_id)
+        if self._closed:
+            return
+        st = self.load(job_id)
+        if st and st.get("owner") == self.owner and st.get("phase") != "interrupted":
+            try:
+                self._delete(job_id)
+            except Exception as e:
+                logger.warning("⚠️ jobs/%s não removido: %s", job_id, e)
+
+    def checkpoint(self, job_id: str) -> Checkpoint:
+        return Checkpoint(self, job_id)
+
+    # ── adoção de órfãos ────────────────────────────────────────────────
+    def claim(self, job_id: str) -> dict | None:
+        """Assume o job se estiver interrompido ou sem heartbeat há LEASE_S."""
+        def fn(st):
+            if not st or st.get("phase") in TERMINAL or st.get("owner") == self.owner:
+                return None
+            if st.get("phase") != "interrupted" and time.time() - st.get("heartbeat", 0) < LEASE_S:
+                return None
+            if st.get("resumes", 0) >= MAX_RESUMES:
+                return {**st, "phase": "error", "error": "interrompido vezes demais"}
+            return {**st, "owner": self.owner, "phase": "queued",
+                    "heartbeat": time.time(), "resumes": st.get("resumes", 0) + 1}
+        st = self._mutate(job_id, fn)
+        if st and st["phase"] == "error":
+            logger.error("❌ Job %s abandonado após %d retomadas", job_id, st["resumes"])
+            self._delete(job_id)
+            return None
+        if st:
+            self._mine.add(job_id)
+        return st
+
+    def interrupt(self):
+        """Drenagem: marca os jobs deste processo para outro worker retomar."""
+        for job_id in list(self._mine):
+            self.update(job_id, phase="interrupted")
+        self._closed = True
+        logger.info("💾 %d job(s) marcados para retomada", len(self._mine))
+
+    def start(self, on_orphan):
+        """Laço deste processo (idempotente; refeito após fork): heartbeat dos
+        jobs locais e `on_orphan(estado)` para cada job adotado."""
+        if self._pid == os.getpid():
+            return
+        self._pid, self._mine, self._closed = os.getpid(), set(), False
+
+        def loop():
+            while not self._closed:
+                try:
+                    for job_id in self._jobs():
+                        st = self.claim(job_id)
+                        if st:
+                            logger.info("♻️ Job órfão %s adotado (%d parte(s) prontas)",
+                                        job_id, len(st.get("parts", {})))
+                            on_orphan(st)
+                except Exception as e:
+                    logger.warning("⚠️ Varredura de jobs falhou: %s", e)
+                time.sleep(LEASE_S / 4)
+                for job_id in list(self._mine):
+                    self.update(job_id)               # heartbeat
+        threading.Thread(target=loop, daemon=True, name="jobstore").start()
+
+
+class LocalJobStore(JobStore):
+    """jobs/<id>/ num diretório local (app_local, testes)."""
+
+    def __init__(self, root: str):
+        super().__init__()
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    @contextmanager
+    def _guard(self, job_id: str):
+        os.makedirs(self._path(job_id), exist_ok=True)
+        fd = os.open(self._path(f"{job_id}/.lock"), os.O_CREAT | os.O_RDWR, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)
+
+    def _read(self, key):
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read(), 0
+        except FileNotFoundError:
+            return None, 0
+
+    def _write(self, key, data, token):
+        tmp = self._path(f"{key}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, self._path(key))
+        return True
+
+    def _jobs(self):
+        return [d for d in os.listdir(self.root)
+                if os.path.exists(self._path(f"{d}/job.json"))]
+
+    def _delete(self, job_id):
+        shutil.rmtree(self._path(job_id), ignore_errors=True)
+
+    def put_file(self, key, path):
+        os.makedirs(os.path.dirname(self._path(key)), exist_ok=True)
+        shutil.copyfile(path, self._path(f"{key}.tmp"))
+        os.replace(self._path(f"{key}.tmp"), self._path(key))
+
+    def get_file(self, key, dst):
+        if not os.path.exists(self._path(key)):
+            return False
+        shutil.copyfile(self._path(key), dst)
+        return True
+
+
+class GcsJobStore(JobStore):
+    """jobs/<id>/ no bucket do GCS (app.py); escrita condicional por geração."""
+
+    def __init__(self, bucket_name: str, prefix: str = "jobs/"):
+        super().__init__()
+        self.bucket_name, self.prefix = bucket_name, prefix
+        self._bucket = None
+
+    @property
+    def bucket(self):
+        if self._bucket is None:
+            from google.cloud import storage
+            self._bucket = storage.Client().bucket(self.bucket_name)
+        return self._bucket
+
+    def _read(self, key):
+        blob = self.bucket.get_blob(self.prefix + key)
+        if not blob:
+            return None, 0                       # geração 0 = "não pode existir"
+        return blob.download_as_bytes(), blob.generation
+
+    def _write(self, key, data, token):
+        from google.api_core.exceptions import PreconditionFailed
+        try:
+            self.bucket.blob(self.prefix + key).upload_from_string(
+                data, content_type="application/json", if_generation_match=token)
+            return True
+        except PreconditionFailed:               # outro processo gravou antes
+            return False
+
+    def _jobs(self):
+        it = self.bucket.list_blobs(prefix=self.prefix, delimiter="/")
+        list(it)                                 # popula it.prefixes
+        return [p[len(self.prefix):].rstrip("/") for p in it.prefixes]
+
+    def _delete(self, job_id):
+        for blob in self.bucket.list_blobs(prefix=f"{self.prefix}{job_id}/"):
+            blob.delete()
+
+    def put_file(self, key, path):
+        self.bucket.blob(self.prefix + key).upload_from_filename(path)
+
+    def get_file(self, key, dst):
+        blob = self.bucket.get_blob(self.prefix + key)
+        if not blob:
+            return False
+        blob.download_to_filename(dst)
+        return True
@@ -0,0 +1,393 @@
+# ─────────────────────────────────────────────────────────────────────────────
+#  media_headers.py  –  leitura de cabeçalhos em Python puro (sem ffprobe)
+# ─────────────────────────────────────────────────────────────────────────────
+#  Áudio : MP3 (Xing/Info, VBRI, varredura de frames), WAV, FLAC, OGG
+#          (Vorbis/Opus) e M4A/MP4 (mvhd).
+#  Imagem: JPEG, PNG, GIF, BMP e WebP — só dimensões, sem decodificar pixels.
+#
+#  `parse(path)` devolve o mesmo dicionário de `probe._ffprobe` ou None quando
+#  o formato não é reconhecido / o arquivo está truncado (→ fallback ffprobe).
+# ─────────────────────────────────────────────────────────────────────────────
+import os, struct, logging
+
+logger = logging.getLogger(__name__)
+
+HEAD_BYTES = 64 * 1024                     # o suficiente p/ quase todo header
+SCAN_CHUNK = 1024 * 1024                   # MP3 sem Xing/VBRI: leitura por bloco
+SCAN_MIN_FRAC = 0.95                       # varredura que para antes disso → ffprobe
+
+
+def _info(fmt, duration=None, audio_codec=None, sample_rate=None,
+          channels=None, video_codec=None, width=None, height=None) -> dict:
+    return {"format": fmt, "duration": duration,
+            "audio_codec": audio_codec, "sample_rate": sample_rate,
+            "channels": channels, "video_codec": video_codec,
+            "width": width, "height": height}
+
+# ╭──────────────────────────────────────────────────────────────────────────╮
+# │ 1. MP3                                                                  │
+# ╰──────────────────────────────────────────────────────────────────────────╯
+_MP3_BITRATES = {   # (versão MPEG1?, layer) → kbps por índice
+    (True, 1):  [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    (True, 2):  [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    (True, 3):  [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    (False, 1): [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    (False, 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    (False, 3): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+_MP3_RATES = {3: [44100, 48000, 32000], 2: [22050, 24000, 16000],
+              0: [11025, 12000, 8000]}
+
+
+def _id3v2_size(buf: bytes) -> int:
+    if buf[:3] != b"ID3" or len(buf) < 10:
+        return 0
+    size = (buf[6] << 21) | (buf[7] << 14) | (buf[8] << 7) | buf[9]
+    return 10 + size + (10 if buf[5] & 0x10 else 0)
+
+
+def _mp3_frame(buf, i: int):
+    """Decodifica o header em buf[i:i+4] → (len, samples, sr, ch, ver, layer)."""
+    if i + 4 > len(buf) or buf[i] != 0xFF or (buf[i + 1] & 0xE0) != 0xE0:
+        return None
+    ver   = (buf[i + 1] >> 3) & 3          # 3=MPEG1 2=MPEG2 0=MPEG2.5
+    layer = 4 - ((buf[i + 1] >> 1) & 3)    # 1, 2, 3
+    br_i  = buf[i + 2] >> 4
+    sr_i  = (buf[i + 2] >> 2) & 3
+    if ver == 1 or layer == 4 or br_i in (0, 15) or sr_i == 3:
+        return None
+    mpeg1 = ver == 3
+    br  = _MP3_BITRATES[(mpeg1, layer)][br_i] * 1000
+    sr  = _MP3_RATES[ver][sr_i]
+    pad = (buf[i + 2] >> 1) & 1
+    ch  = 1 if (buf[i + 3] >> 6) == 3 else 2
+    if layer == 1:
+        return (12 * br // sr + pad) * 4, 384, sr, ch, ver, layer
+    spf = 1152 if (layer == 2 or mpeg1) else 576
+    return spf // 8 * br // sr + pad, spf, sr, ch, ver, layer
+
+
+def _lame_gap(buf, k: int, total: int) -> int:
+    """Atraso do encoder + padding (amostras) da tag LAME em buf[k:], ou 0.
+
+    Como o ffprobe (gapless): duração = frames × spf − atraso − padding."""
+    tag = buf[k:k + 24]
+    if len(tag) < 24 or not tag[:4].isalpha():       # "LAME", "Lavf", "Lavc"…
+        return 0
+    delay = (tag[21] << 4) | (tag[22] >> 4)
+    pad   = ((tag[22] & 0x0F) << 8) | tag[23]
+    return delay + pad if delay + pad < total else 0
+
+
+def _parse_mp3(path: str, head: bytes, size: int) -> dict | None:
+    start = _id3v2_size(head)
+    with open(path, "rb") as f:
+        f.seek(start)
+        buf = f.read(HEAD_BYTES)
+
+    # sincroniza no 1º frame válido seguido de outro frame válido
+    i = 0
+    while i < len(buf) - 4:
+        fr = _mp3_frame(buf, i)
+        if fr and (i + fr[0] >= len(buf) - 4 or _mp3_frame(buf, i + fr[0])):
+            break
+        i += 1
+    else:
+        return None
+    flen, spf, sr, ch, ver, layer = fr
+
+    # Xing / Info (VBR ou CBR com LAME)
+    side = (32 if ch == 2 else 17) if ver == 3 else (17 if ch == 2 else 9)
+    x = i + 4 + side
+    if buf[x:x + 4] in (b"Xing", b"Info") and struct.unpack(">I", buf[x + 4:x + 8])[0] & 1:
+        flags  = struct.unpack(">I", buf[x + 4:x + 8])[0]
+        frames = struct.unpack(">I", buf[x + 8:x + 12])[0]
+        samples = frames * spf - _lame_gap(buf, x + 12 + (4 if flags & 2 else 0)
+                                           + (100 if flags & 4 else 0)
+                                           + (4 if flags & 8 else 0), frames * spf)
+        return _info("mp3", samples / sr, "mp3", sr, ch)
+
+    # VBRI (Fraunhofer) — sempre 32 bytes após o header
+    v = i + 4 + 32
+    if buf[v:v + 4] == b"VBRI":
+        frames = struct.unpack(">I", buf[v + 14:v + 18])[0]
+        return _info("mp3", frames * spf / sr, "mp3", sr, ch)
+
+    # sem tabela → varre todos os frames, em blocos (sem carregar o arquivo)
+    with open(path, "rb") as f:
+        f.seek(max(start + i, size - 128))
+        end = size - 128 if f.read(3) == b"TAG" else size   # ID3v1 no fim
+        frames, used = _scan_frames(f, start + i, end)
+    if not frames or used < SCAN_MIN_FRAC * (end - start - i):
+        return None                        # lixo no meio / tag desconhecida → ffprobe
+    return _info("mp3", frames * spf / sr, "mp3", sr, ch)
+
+
+def _scan_frames(f, pos: int, end: int) -> tuple[int, int]:
+    """(frames, bytes percorridos) de `pos` até o 1º frame inválido ou `end`."""
+    frames, j, buf, base = 0, 0, b"", pos
+    while base + j + 4 <= end:
+        if j + 4 > len(buf):                # header fora do bloco → lê o próximo
+            base += j
+            f.seek(base)
+            buf, j = f.read(min(SCAN_CHUNK, end - base)), 0
+            if len(buf) < 4:
+                break
+        fr = _mp3_frame(buf, j)
+        if fr is None:
+            break
+        frames += 1
+        j += fr[0]
+    return frames, min(base + j, end) - pos
+
+# ╭──────────────────────────────────────────────────────────────────────────╮
+# │ 2. WAV / FLAC / OGG / M4A                                               │
+# ╰──────────────────────────────────────────────────────────────────────────╯
+_WAV_CODECS = {1: "pcm_{s}{bits}le", 3: "pcm_f{bits}le", 6: "pcm_alaw", 7: "pcm_mulaw"}
+
+
+def _parse_wav(path: str, head: bytes, size: int) -> dict | None:
+    fmt, i = None, 12
+    with open(path, "rb") as f:
+        while True:
+            f.seek(i)
+            ck = f.read(8)
+            if len(ck) < 8:
+                return None
+            cid, clen = ck[:4], struct.unpack("<I", ck[4:])[0]
+            if cid == b"fmt ":
+                fmt = f.read(16)
+                if len(fmt) < 16:
+                    return None
+            elif cid == b"data" and fmt:
+                tag, ch, sr, byte_rate, _, bits = struct.unpack("<HHIIHH", fmt)
+                if clen == 0xFFFFFFFF or i + 8 + clen > size:   # streaming/truncado
+                    clen = size - i - 8
+                if not byte_rate:
+                    return None
+                codec = _WAV_CODECS.get(tag)
+                if codec:
+                    codec = codec.format(s="u" if bits == 8 else "s", bits=bits)
+                    codec = "pcm_u8" if codec == "pcm_u8le" else codec
+                return _info("wav", clen / byte_rate, codec, sr, ch)
+            i += 8 + clen + (clen & 1)
+
+
+def _parse_flac(path: str, head: bytes, size: int) -> dict | None:
+    i = _id3v2_size(head)
+    if head[i:i + 4] != b"fLaC":
+        return None
+    blk = head[i + 4:i + 4 + 4 + 34]
+    if len(blk) < 38 or blk[0] & 0x7F != 0:              # STREAMINFO
+        return None
+    v = int.from_bytes(blk[4 + 10:4 + 18], "big")
+    sr, ch, total = v >> 44, ((v >> 41) & 7) + 1, v & ((1 << 36) - 1)
+    if not sr or not total:                 # total desconhecido → ffprobe
+        return None
+    return _info("flac", total / sr, "flac", sr, ch)
+
+
+def _parse_ogg(path: str, head: bytes, size: int) -> dict | None:
+    # 1º pacote começa logo após a tabela de segmentos da 1ª página
+    nseg = head[26]
+    pkt  = head[27 + nseg:27 + nseg + 64]
+    serial = head[14:18]
+    if pkt[:7] == b"\x01vorbis":
+        codec, ch, sr = "vorbis", pkt[11], struct.unpack("<I", pkt[12:16])[0]
+        rate, skip = sr, 0
+    elif pkt[:8] == b"OpusHead":
+        codec, ch, sr = "opus", pkt[9], 48000
+        rate, skip = 48000, struct.unpack("<H", pkt[10:12])[0]
+    else:
+        return None
+
+    # granule position da última página deste stream
+    with open(path, "rb") as f:
+        f.seek(max(0, size - HEAD_BYTES))
+        tail = f.read()
+    j = tail.rfind(b"OggS")
+    while j >= 0 and tail[j + 14:j + 18] != serial:
+        j = tail.rfind(b"OggS", 0, j)
+    if j < 0 or j + 14 > len(tail):
+        return None
+    granule = struct.unpack("<q", tail[j + 6:j + 14])[0]
+    if granule <= 0:
+        return None
+    return _info("ogg", (granule - skip) / rate, codec, sr, ch)
+
+
+def _mp4_boxes(f, start: int, end: int):
+    """Itera (tipo, início do payload, fim) das caixas em [start, end)."""
+    i = start
+    while i + 8 <= end:
+        f.seek(i)
+        hdr = f.read(16)
+        if len(hdr) < 8:
+            return
+        blen, btype = struct.unpack(">I4s", hdr[:8])
+        hl = 8
+        if blen == 1:
+            blen, hl = struct.unpack(">Q", hdr[8:16])[0], 16
+        elif blen == 0:
+            blen = end - i
+        if blen < hl:
+            return
+        yield btype, i + hl, min(i + blen, end)
+        i += blen
+
+
+_MP4_CODECS = {b"mp4a": "aac", b"alac": "alac", b"ac-3": "ac3",
+               b"ec-3": "eac3", b"Opus": "opus", b"fLaC": "flac"}
+
+
+def _parse_mp4(path: str, head: bytes, size: int) -> dict | None:
+    with open(path, "rb") as f:
+        moov = next(((s, e) for t, s, e in _mp4_boxes(f, 0, size) if t == b"moov"), None)
+        if not moov:
+            return None
+        duration = codec = sr = ch = None
+        for t, s, e in _mp4_boxes(f, *moov):
+            if t == b"mvhd":
+                f.seek(s)
+                b = f.read(32)
+                if b[0] == 1:
+                    scale, dur = struct.unpack(">IQ", b[20:32])
+                else:
+                    scale, dur = struct.unpack(">II", b[12:20])
+                duration = dur / scale if scale else None
+            elif t == b"trak" and codec is None:
+                codec, sr, ch = _mp4_audio_track(f, s, e)
+    if duration is None:
+        return None
+    return _info("mp4", duration, codec, sr, ch)
+
+
+def _mp4_audio_track(f, s: int, e: int):
+    def child(s, e, name):
+        return next(((cs, ce) for t, cs, ce in _mp4_boxes(f, s, e) if t == name), None)
+
+    mdia = child(s, e, b"mdia")
+    hdlr = mdia and child(*mdia, b"hdlr")
+    if not hdlr:
+        return None, None, None
+    f.seek(hdlr[0] + 8)
+    if f.read(4) != b"soun":
+        return None, None, None
+    stsd = None
+    for name in (b"minf", b"stbl", b"stsd"):
+        mdia = stsd = child(*mdia, name) if mdia else None
+    if not stsd:
+        return None, None, None
+    f.seek(stsd[0] + 8)                     # version/flags + entry_count
+    entry = f.read(36)
+    if len(entry) < 36:
+        return None, None, None
+    fourcc = entry[4:8]
+    ch = struct.unpack(">H", entry[24:26])[0]
+    sr = struct.unpack(">I", entry[32:36])[0] >> 16
+    return _MP4_CODECS.get(fourcc, fourcc.decode("latin-1").strip()), sr or None, ch or None
+
+# ╭──────────────────────────────────────────────────────────────────────────╮
+# │ 3. Imagens                                                              │
+# ╰──────────────────────────────────────────────────────────────────────────╯
+_JPEG_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7,
+             0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def _parse_jpeg(path: str, head: bytes, size: int) -> dict | None:
+    with open(path, "rb") as f:
+        f.seek(2)
+        while True:
+            b = f.read(1)
+            while b == b"\xff":             # bytes de preenchimento
+                b = f.read(1)
+            if not b:
+                return None
+            marker = b[0]
+            if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+                continue                    # marcadores sem payload
+            seg = f.read(2)
+            if len(seg) < 2:
+                return None
+            seglen = struct.unpack(">H", seg)[0]
+            if marker in _JPEG_SOF:
+                sof = f.read(5)
+                if len(sof) < 5:
+                    return None
+                h, w = struct.unpack(">HH", sof[1:5])
+                return _info("jpeg", video_codec="mjpeg", width=w, height=h) if w and h else None
+            if marker == 0xD9 or seglen < 2:
+                return None
+            f.seek(seglen - 2, os.SEEK_CUR)
+            b = f.read(1)
+            if b != b"\xff":
+                return None
+
+
+def _parse_png(path, head, size):
+    if head[12:16] != b"IHDR":
+        return None
+    w, h = struct.unpack(">II", head[16:24])
+    return _info("png", video_codec="png", width=w, height=h)
+
+
+def _parse_gif(path, head, size):
+    w, h = struct.unpack("<HH", head[6:10])
+    return _info("gif", video_codec="gif", width=w, height=h)
+
+
+def _parse_bmp(path, head, size):
+    dib = struct.unpack("<I", head[14:18])[0]
+    if dib == 12:
+        w, h = struct.unpack("<HH", head[18:22])
+    else:
+        w, h = struct.unpack("<ii", head[18:26])
+    return _info("bmp", video_codec="bmp", width=abs(w), height=abs(h))
+
+
+def _parse_webp(path, head, size):
+    chunk = head[12:16]
+    if chunk == b"VP8 " and head[23:26] == b"\x9d\x01\x2a":
+        w, h = struct.unpack("<HH", head[26:30])
+        w, h = w & 0x3FFF, h & 0x3FFF
+    elif chunk == b"VP8L" and head[20] == 0x2F:
+        v = int.from_bytes(head[21:25], "little")
+        w, h = (v & 0x3FFF) + 1, ((v >> 14) & 0x3FFF) + 1
+    elif chunk == b"VP8X":
+        w = int.from_bytes(head[24:27], "little") + 1
+        h = int.from_bytes(head[27:30], "little") + 1
+    else:
+        return None
+    return _info("webp", video_codec="webp", width=w, height=h)
+
+# ╭──────────────────────────────────────────────────────────────────────────╮
+# │ 4. Despacho por assinatura                                              │
+# ╰──────────────────────────────────────────────────────────────────────────╯
+def _sniff(head: bytes):
+    if head[:3] == b"\xff\xd8\xff":                       return _parse_jpeg
+    if head[:8] == b"\x89PNG\r\n\x1a\n":                  return _parse_png
+    if head[:6] in (b"GIF87a", b"GIF89a"):                return _parse_gif
+    if head[:2] == b"BM" and len(head) >= 26:             return _parse_bmp
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":     return _parse_webp
+    if head[:4] == b"RIFF" and head[8:12] == b"WAVE":     return _parse_wav
+    if head[:4] == b"OggS" and len(head) >= 28:           return _parse_ogg
+    if head[4:8] == b"ftyp":                              return _parse_mp4
+    i = _id3v2_size(head)
+    if head[i:i + 4] == b"fLaC" or head[:4] == b"fLaC":   return _parse_flac
+    if head[:3] == b"ID3" or _mp3_frame(head, 0):         return _parse_mp3
+    return None
+
+
+def parse(path: str) -> dict | None:
+    """Metadados lidos direto dos cabeçalhos; None → usar ffprobe."""
+    try:
+        size = os.path.getsize(path)
+        with open(path, "rb") as f:
+            head = f.read(HEAD_BYTES)
+        parser = _sniff(head)
+        if parser is None:
+            return None
+        return parser(path, head, size)
+    except (OSError, struct.error, IndexError, ValueError, ZeroDivisionError) as e:
+        logger.debug("Cabeçalho ilegível em %s (%s)", path, e)
+        return None
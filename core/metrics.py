@@ -0,0 +1,169 @@
+# ─────────────────────────────────────────────────────────────────────────────
+#  metrics.py  –  tempos por etapa, contadores e /metrics (texto Prometheus)
+# ─────────────────────────────────────────────────────────────────────────────
+#  Sem dependência nova: contadores/histogramas simples com lock e a
+#  exposição no formato texto 0.0.4. `stage("encode")` mede uma etapa e
+#  soma no histograma global e nos tempos do job corrente (thread-local),
+#  que vão no payload final de progresso.
+# ─────────────────────────────────────────────────────────────────────────────
+import time, threading
+from collections import deque
+from contextlib import contextmanager
+
+_lock     = threading.Lock()
+_registry: list = []
+_local    = threading.local()                    # job corrente + pilha de etapas
+
+BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+
+
+def _fmt_labels(names, values, extra: str = "") -> str:
+    parts = [f'{n}="{v}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels=()):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self.values: dict[tuple, float] = {}
+        _registry.append(self)
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.labels)
+        with _lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self) -> list[str]:
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        out += [f"{self.name}{_fmt_labels(self.labels, k)} {v}"
+                for k, v in sorted(self.values.items())]
+        return out
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels=(), buckets=BUCKETS):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self.buckets = tuple(buckets)
+        self.values: dict[tuple, list] = {}      # labels → [contagens…, soma, n]
+        _registry.append(self)
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.labels)
+        with _lock:
+            row = self.values.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            for i, b in enumerate(self.buckets):
+                if value <= b:
+                    row[i] += 1
+            row[-2] += value
+            row[-1] += 1
+
+    def render(self) -> list[str]:
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, row in sorted(self.values.items()):
+            for b, c in [*zip(self.buckets, row), ("+Inf", row[-1])]:
+                le = 'le="%s"' % b
+                out.append(f"{self.name}_bucket{_fmt_labels(self.labels, key, le)} {c}")
+            out.append(f"{self.name}_sum{_fmt_labels(self.labels, key)} {round(row[-2], 6)}")
+            out.append(f"{self.name}_count{_fmt_labels(self.labels, key)} {row[-1]}")
+        return out
+
+
+# ── métricas do serviço ─────────────────────────────────────────────────────
+JOBS      = Counter("mergevideo_jobs_total", "Jobs finalizados", ["status"])
+STAGE_S   = Histogram("mergevideo_stage_seconds", "Duração de cada etapa", ["stage"])
+FFMPEG_S  = Histogram("mergevideo_ffmpeg_seconds", "Duração de cada processo ffmpeg",
+                      ["stage"])
+FFMPEG_ERRORS = Counter("mergevideo_ffmpeg_failures_total", "ffmpeg com código ≠ 0",
+                        ["stage"])
+BYTES     = Counter("mergevideo_bytes_total", "Bytes transferidos", ["direction"])
+REALTIME  = Histogram("mergevideo_encode_realtime_factor",
+                      "Segundos de vídeo por segundo de render", ["engine"],
+                      buckets=(0.25, 0.5, 1, 2, 4, 8, 16, 32, 64, 128))
+
+
+# renders recentes (fim, segundos de mídia, segundos de render) → /ready
+_recent: deque = deque(maxlen=256)
+
+
+def record_encode(media_s: float, elapsed_s: float, engine: str = ""):
+    """Fim de um render: histograma REALTIME + janela de vazão recente."""
+    REALTIME.observe(media_s / max(elapsed_s, 1e-3), engine=engine)
+    with _lock:
+        _recent.append((time.time(), media_s, elapsed_s))
+
+
+def throughput(window_s: float = 900) -> dict:
+    """Vazão dos renders terminados nos últimos `window_s` s."""
+    since = time.time() - window_s
+    with _lock:
+        rows = [r for r in _recent if r[0] >= since]
+    media, busy = sum(r[1] for r in rows), sum(r[2] for r in rows)
+    return {"window_s": window_s, "jobs": len(rows), "media_s": round(media, 1),
+            "realtime_x": round(media / busy, 2) if busy else None}
+
+
+def render() -> str:
+    """Todas as métricas no formato texto do Prometheus."""
+    with _lock:
+        lines = [line for m in _registry for line in m.render()]
+    return "\n".join(lines) + "\n"
+
+
+# ── tempos por job / etapa ──────────────────────────────────────────────────
+def current_stage() -> str:
+    stack = getattr(_local, "stages", None)
+    return stack[-1] if stack else ""
+
+
+def begin_job() -> dict:
+    """Zera os tempos da thread atual (uma thread por job); devolve o dict
+    que as etapas seguintes vão preenchendo."""
+    _local.timings, _local.stages = {}, []
+    return _local.timings
+
+
+@contextmanager
+def stage(name: str):
+    """Mede uma etapa (aninhável) → histograma + tempos do job."""
+    stack = getattr(_local, "stages", None)
+    if stack is None:
+        stack = _local.stages = []
+    stack.append(name)
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        dt = time.perf_counter() - t0
+        stack.pop()
+        STAGE_S.observe(dt, stage=name)
+        totals = _local.__dict__.setdefault("totals", {})
+        totals[name] = totals.get(name, 0.0) + dt
+        timings = getattr(_local, "timings", None)
+        if timings is not None:
+            timings[name] = round(timings.get(name, 0) + dt, 3)
+
+
+def stage_total(*names: str) -> float:
+    """Segundos já gastos nas etapas `names` por esta thread (sem zerar por
+    job): a diferença antes/depois mede o que rodou dentro de outra etapa."""
+    totals = getattr(_local, "totals", {})
+    return sum(totals.get(n, 0.0) for n in names)
+
+
+@contextmanager
+def ffmpeg_run():
+    """Um processo ffmpeg: histograma/falhas por etapa corrente."""
+    st, t0 = current_stage(), time.perf_counter()
+    try:
+        yield
+    except Exception:
+        FFMPEG_ERRORS.inc(stage=st)
+        raise
+    finally:
+        dt = time.perf_counter() - t0
+        FFMPEG_S.observe(dt, stage=st)
+        timings = getattr(_local, "timings", None)
+        if timings is not None:
+            timings["ffmpeg"] = round(timings.get("ffmpeg", 0) + dt, 3)
@@ -0,0 +1,94 @@
+# ─────────────────────────────────────────────────────────────────────────────
+#  perflog.py  –  um registro JSON por job (JSONL) para análise de desempenho
+# ─────────────────────────────────────────────────────────────────────────────
+#  Forma da entrada (imagens, grupos, bytes, duração do áudio, resolução,
+#  perfil), tempos por etapa (core.metrics), CPU e pico de RSS dos ffmpeg
+#  filhos (getrusage(RUSAGE_CHILDREN)), pico de disco temporário e tamanho
+#  da saída. As linhas ficam num buffer e são gravadas em lote com um único
+#  write() em modo append — seguro entre threads e entre workers do gunicorn.
+#
+#  Obs.: RUSAGE_CHILDREN é do processo inteiro; com jobs simultâneos o delta
+#  de CPU inclui os filhos dos outros jobs e o RSS é o maior já visto.
+# ─────────────────────────────────────────────────────────────────────────────
+import os, json, time, atexit, logging, resource, threading
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+LOG_PATH    = os.environ.get("PERF_LOG_PATH", "perf_records.jsonl")
+FLUSH_LINES = int(os.environ.get("PERF_LOG_FLUSH_LINES", "20"))
+FLUSH_S     = float(os.environ.get("PERF_LOG_FLUSH_S", "30"))
+
+_lock  = threading.Lock()
+_buf: list[str] = []
+_timer: threading.Timer | None = None
+
+
+def flush():
+    """Grava o buffer (um write só → linhas nunca se intercalam)."""
+    global _timer
+    with _lock:
+        lines, _buf[:] = list(_buf), []
+        if _timer:
+            _timer.cancel()
+            _timer = None
+    if not lines:
+        return
+    try:
+        fd = os.open(LOG_PATH, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, "".join(lines).encode())
+        finally:
+            os.close(fd)
+    except OSError as e:
+        logger.warning("⚠️ Registros de desempenho perdidos (%d): %s", len(lines), e)
+
+
+def write(record: dict):
+    """Enfileira um registro; grava a cada FLUSH_LINES ou FLUSH_S segundos."""
+    global _timer
+    line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+    with _lock:
+        _buf.append(line)
+        full = len(_buf) >= FLUSH_LINES
+        if not full and _timer is None:
+            _timer = threading.Timer(FLUSH_S, flush)
+            _timer.daemon = True
+            _timer.start()
+    if full:
+        flush()
+
+
+atexit.register(flush)
+
+
+class JobRecord:
+    """Acumula o registro de um job; `finish` o envia ao buffer."""
+
+    def __init__(self, job_id: str):
+        self.rec  = {"job_id": job_id,
+                     "ts": datetime.now(timezone.utc).isoformat(timespec="seconds")}
+        self._t0  = time.perf_counter()
+        self._ru0 = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+    def update(self, **fields):
+        self.rec.update(fields)
+
+    def stats(self, stats: dict | None):
+        """Campos relevantes das estatísticas de generate_*_video."""
+        for k in ("engine", "profile", "resolution", "outputs", "media_s",
+                  "output_bytes", "tmp_peak_bytes", "elapsed_s"):
+            if stats and k in stats:
+                self.rec[k] = stats[k]
+
+    def finish(self, status: str, timings: dict | None = None, **fields):
+        ru = resource.getrusage(resource.RUSAGE_CHILDREN)
+        self.rec.update(
+            status=status,
+            wall_s=round(time.perf_counter() - self._t0, 3),
+            phases=dict(timings or {}),
+            child_cpu_user_s=round(ru.ru_utime - self._ru0.ru_utime, 3),
+            child_cpu_sys_s=round(ru.ru_stime - self._ru0.ru_stime, 3),
+            child_peak_rss_mb=round(ru.ru_maxrss / 1024, 1),   # Linux: KB
+            **fields)
+        write(self.rec)
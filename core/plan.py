@@ -0,0 +1,88 @@
+# ─────────────────────────────────────────────────────────────────────────────
+#  plan.py  –  RenderPlan: o que será renderizado, antes de renderizar
+# ─────────────────────────────────────────────────────────────────────────────
+#  Blocos (grupos por prefixo), duração de cada imagem, telas verdes,
+#  resolução, motor e perfil num objeto serializável. generate_final_video
+#  monta o plano e só então o executa; /estimate monta o mesmo plano (só com
+#  nomes de arquivo) e pede a previsão de custo a core.cost.
+# ─────────────────────────────────────────────────────────────────────────────
+from dataclasses import dataclass, asdict, field
+from typing import Dict, List, Tuple
+
+from core import profiles
+from core.ffmpeg_processor import (
+    ENGINES, _audio_duration, _resolution, _runs, _scaled_res
+)
+
+
+@dataclass
+class BlockPlan:
+    prefix:  str
+    images:  List[str]
+    image_s: float                     # tempo de tela de cada imagem
+
+
+@dataclass
+class RenderPlan:
+    blocks:     List[BlockPlan]
+    audio_path: str | None
+    audio_s:    float                  # narração, repetida em cada bloco
+    green_s:    float                  # tela verde entre blocos
+    resolution: Tuple[int, int]
+    engine:     str
+    profile:    dict = field(default_factory=profiles.get)
+
+    @property
+    def groups(self) -> Dict[str, List[str]]:
+        return {b.prefix: b.images for b in self.blocks}
+
+    @property
+    def gaps(self) -> int:
+        return len(self.blocks) - 1 if self.green_s > 0 else 0
+
+    @property
+    def media_s(self) -> float:
+        """Duração total do vídeo final."""
+        return len(self.blocks) * self.audio_s + self.gaps * self.green_s
+
+    @property
+    def images(self) -> int:
+        return sum(len(b.images) for b in self.blocks)
+
+    @property
+    def unique_images(self) -> int:
+        return len({p for b in self.blocks for p in b.images})
+
+    @property
+    def frames(self) -> int:
+        """Frames distintos (vfr: repetições consecutivas viram um frame)."""
+        return sum(len(_runs(b.images)) for b in self.blocks) + self.gaps
+
+    def to_dict(self) -> dict:
+        d = asdict(self)
+        d["resolution"] = list(self.resolution)
+        d.update(media_s=round(self.media_s, 3), images=self.images,
+                 unique_images=self.unique_images, frames=self.frames)
+        return d
+
+
+def make_plan(image_groups: Dict[str, List[str]], audio_path: str | None,
+              green_sec: float, aspect_ratio: str, engine: str = "blocks",
+              profile: str | dict | None = None,
+              audio_s: float | None = None) -> RenderPlan:
+    """Plano do job. `audio_s` evita o probe (ex.: /estimate sem download)."""
+    if engine not in ENGINES:
+        raise ValueError(f"Motor desconhecido: {engine}")
+    prof = profiles.get(profile)
+    if audio_s is None:
+        audio_s = _audio_duration(audio_path)
+    blocks = []
+    for pref, imgs in sorted(image_groups.items()):
+        if not imgs:
+            raise ValueError("Lista de imagens vazia")
+        blocks.append(BlockPlan(pref, list(imgs), audio_s / len(imgs)))
+    return RenderPlan(
+        blocks=blocks, audio_path=audio_path, audio_s=float(audio_s),
+        green_s=float(green_sec),
+        resolution=_scaled_res(_resolution(aspect_ratio), prof.get("short_side")),
+        engine=engine, profile=prof)
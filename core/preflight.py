@@ -0,0 +1,162 @@
+# ─────────────────────────────────────────────────────────────────────────────
+#  preflight.py  –  validação paralela das entradas antes de renderizar
+# ─────────────────────────────────────────────────────────────────────────────
+#  Pega em segundos o que hoje só aparece no meio do encode: upload vazio,
+#  extensão/conteúdo trocados, cabeçalho corrompido, nome sem dígitos (quebra
+#  o sort de group_images_by_prefix) e áudio sem duração.
+# ─────────────────────────────────────────────────────────────────────────────
+import os, time, logging
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from core import media_headers, probe
+from core.ffmpeg_processor import _group_key, _sort_key
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".gif", ".bmp", ".webp")
+AUDIO_EXTS = (".mp3", ".wav", ".aac", ".flac", ".ogg", ".m4a")
+
+# extensão → formato devolvido por media_headers.parse
+_EXT_FORMAT = {".jpg": "jpeg", ".jpeg": "jpeg", ".png": "png", ".gif": "gif",
+               ".bmp": "bmp", ".webp": "webp", ".mp3": "mp3", ".wav": "wav",
+               ".flac": "flac", ".ogg": "ogg", ".m4a": "mp4"}
+
+MAX_SIDE = 16384                           # limite prático do scale/x264
+
+
+class PreflightError(Exception):
+    """Entradas inválidas; `report` traz o diagnóstico por arquivo."""
+
+    def __init__(self, report: dict):
+        self.report = report
+        bad = [f"{e['file']}: {'; '.join(e['errors'])}"
+               for e in report["files"] if e["errors"]]
+        more = f" (+{len(bad) - 5} arquivos)" if len(bad) > 5 else ""
+        super().__init__("Pré-validação falhou — " + " | ".join(bad[:5]) + more)
+
+# ╭──────────────────────────────────────────────────────────────────────────╮
+# │ 1. Checagens                                                            │
+# ╰──────────────────────────────────────────────────────────────────────────╯
+def _entry(name: str) -> dict:
+    return {"file": name, "errors": [], "warnings": []}
+
+def check_names(images: List[str], audio: str | None) -> dict:
+    """Só nomes (dá p/ rodar antes do download): extensão e chaves de grupo/ordem."""
+    entries, seen = [], defaultdict(dict)
+    for name in images:
+        e = _entry(os.path.basename(name))
+        if not name.lower().endswith(IMAGE_EXTS):
+            e["errors"].append("extensão de imagem não suportada")
+        try:
+            n = _sort_key(name)
+        except IndexError:
+            e["errors"].append("nome sem número para ordenação")
+        else:
+            grp = _group_key(name)
+            if n in seen[grp]:
+                e["warnings"].append(
+                    f"mesma posição {grp}{n} que {seen[grp][n]} (ordem ambígua)")
+            seen[grp][n] = e["file"]
+        entries.append(e)
+
+    if audio is None:
+        e = _entry("<áudio>")
+        e["errors"].append("áudio obrigatório")
+        entries.append(e)
+    elif not audio.lower().endswith(AUDIO_EXTS):
+        e = _entry(os.path.basename(audio))
+        e["errors"].append("extensão de áudio não suportada")
+        entries.append(e)
+    return _report(entries)
+
+
+def _check_file(path: str, kind: str, name: str | None = None) -> dict:
+    name = os.path.basename(name or path)
+    e = _entry(name)
+    try:
+        size = os.path.getsize(path)
+    except OSError as ex:
+        e["errors"].append(f"ilegível ({ex.strerror})")
+        return e
+    if size == 0:
+        e["errors"].append("arquivo vazio (0 bytes)")
+        return e
+
+    hdr = media_headers.parse(path)
+    expect = _EXT_FORMAT.get(os.path.splitext(name)[1].lower())
+    if hdr and expect and hdr["format"] != expect:
+        e["warnings"].append(f"extensão {expect} mas conteúdo {hdr['format']}")
+    try:
+        info = hdr or probe.probe(path)
+    except Exception:
+        e["errors"].append("cabeçalho ilegível / arquivo corrompido")
+        return e
+
+    if kind == "image":
+        w, h = info.get("width"), info.get("height")
+        if info.get("audio_codec") and not info.get("video_codec"):
+            e["errors"].append("conteúdo é áudio, não imagem")
+        elif not w or not h:
+            e["errors"].append("dimensões ilegíveis")
+        elif max(w, h) > MAX_SIDE:
+            e["errors"].append(f"{w}x{h} excede {MAX_SIDE}px")
+        e.update(width=w, height=h)
+    else:
+        d = info.get("duration")
+        if not info.get("audio_codec"):
+            e["errors"].append("nenhuma faixa de áudio")
+        elif not d or d <= 0:
+            e["errors"].append("duração do áudio ilegível")
+        e.update(duration=d)
+    e["bytes"] = size
+    return e
+
+
+def check_files(img_paths: List[str], audio_path: str | None,
+                audio_name: str | None = None,
+                max_workers: int | None = None) -> dict:
+    """Cabeçalhos/dimensões/duração, em paralelo sobre todas as entradas."""
+    workers = max_workers or min(32, (os.cpu_count() or 1) * 4)
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        futs = [ex.submit(_check_file, p, "image") for p in img_paths]
+        if audio_path:
+            futs.append(ex.submit(_check_file, audio_path, "audio", audio_name))
+        entries = [f.result() for f in futs]
+    return _report(entries)
+
+# ╭──────────────────────────────────────────────────────────────────────────╮
+# │ 2. Relatório                                                            │
+# ╰──────────────────────────────────────────────────────────────────────────╯
+def _report(entries: list[dict]) -> dict:
+    return {"ok": not any(e["errors"] for e in entries),
+            "errors":   sum(len(e["errors"]) for e in entries),
+            "warnings": sum(len(e["warnings"]) for e in entries),
+            "files": entries}
+
+
+def run(img_paths: List[str], audio_path: str | None,
+        image_names: List[str] | None = None,
+        audio_name: str | None = None) -> dict:
+    """Pré-validação completa; levanta PreflightError com o relatório."""
+    t0 = time.perf_counter()
+    names = check_names(image_names or img_paths, audio_name or audio_path)
+    files = check_files(img_paths, audio_path, audio_name)
+
+    by_name = {e["file"]: e for e in files["files"]}
+    for e in names["files"]:
+        if e["file"] in by_name:
+            by_name[e["file"]]["errors"][:0] = e["errors"]
+            by_name[e["file"]]["warnings"][:0] = e["warnings"]
+        else:
+            files["files"].append(e)
+    report = _report(files["files"])
+    report["elapsed_s"] = round(time.perf_counter() - t0, 3)
+
+    logger.info("🛫 Preflight: %d arquivos, %d erros, %d avisos em %.2fs",
+                len(report["files"]), report["errors"], report["warnings"],
+                report["elapsed_s"])
+    if not report["ok"]:
+        raise PreflightError(report)
+    return report
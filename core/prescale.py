@@ -0,0 +1,124 @@
+# ─────────────────────────────────────────────────────────────────────────────
+#  prescale.py  –  redução prévia (paralela) de imagens muito grandes
+# ─────────────────────────────────────────────────────────────────────────────
+#  Fotos de 6000–8000 px eram decodificadas inteiras dentro de _make_block só
+#  para virar 1080x1920. Aqui cada imagem grande é reduzida uma vez, em
+#  paralelo (um ffmpeg por imagem), antes do encode. Em JPEG usamos
+#  `-lowres` (escala na DCT: decodifica 1/2, 1/4 ou 1/8 dos pixels).
+#  Pool de threads, não de processos: cada tarefa só espera um ffmpeg
+#  externo, então o trabalho já roda em processos separados, sem GIL.
+#
+#  `est_saved_s` é uma estimativa: MP a menos no encode × custo de
+#  decode+scale por MP, medido uma vez por processo nesta máquina (decode
+#  repetido da maior imagem do job, descontando o arranque do ffmpeg) ou
+#  fixado em PRESCALE_DECODE_S_MP.
+# ─────────────────────────────────────────────────────────────────────────────
+import os, math, time, logging, subprocess, threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+
+from core import probe
+from core.ffmpeg_processor import _run
+
+logger = logging.getLogger(__name__)
+
+MIN_RATIO    = 1.5          # só reduz se a imagem for ≥1,5× o alvo
+DECODE_S_MP  = float(os.environ.get("PRESCALE_DECODE_S_MP", "0"))   # 0 = medir
+FALLBACK_S_MP = 0.012       # se a medição falhar (s por megapixel)
+
+_calib: dict = {}
+_calib_lock  = threading.Lock()
+
+
+def _time_decode(src: str, res: Tuple[int, int], frames: int) -> float:
+    w, h = res
+    t0 = time.perf_counter()
+    subprocess.run(["ffmpeg", "-v", "error", "-loop", "1", "-framerate", "1",
+                    "-i", src, "-frames:v", str(frames),
+                    "-vf", f"scale={w}:{h}:force_original_aspect_ratio=decrease",
+                    "-f", "null", "-"], check=True, capture_output=True)
+    return time.perf_counter() - t0
+
+
+def decode_cost(src: str, mp: float, res: Tuple[int, int]) -> Tuple[float, str]:
+    """(s por MP de decode+scale, origem): env → medido (uma vez) → padrão."""
+    if DECODE_S_MP > 0:
+        return DECODE_S_MP, "env"
+    with _calib_lock:
+        if not _calib:
+            try:                                   # (6 − 1) decodes sem o arranque
+                dt = _time_decode(src, res, 6) - _time_decode(src, res, 1)
+                _calib.update(s_mp=max(dt, 0.0) / 5 / mp, source="measured")
+                logger.info("⏱️  Decode medido: %.4fs/MP (%s, %.1f MP)",
+                            _calib["s_mp"], os.path.basename(src), mp)
+            except (OSError, subprocess.CalledProcessError, ZeroDivisionError) as e:
+                logger.warning("⚠️ Medição de decode falhou (%s); usando %.3fs/MP",
+                               e, FALLBACK_S_MP)
+                _calib.update(s_mp=FALLBACK_S_MP, source="default")
+    return _calib["s_mp"], _calib["source"]
+
+
+def _fit(w: int, h: int, res: Tuple[int, int]) -> Tuple[int, int, float]:
+    """Tamanho que cabe em `res` mantendo o aspecto (= scale ...:decrease)."""
+    s = min(res[0] / w, res[1] / h)
+    return max(1, round(w * s)), max(1, round(h * s)), s
+
+
+def _lowres(scale: float) -> int:
+    """Maior fator DCT 2^k (k ≤ 3) que ainda fica acima do alvo."""
+    return max(0, min(3, int(math.floor(math.log2(1 / scale))))) if scale < 1 else 0
+
+
+def _prescale_one(src: str, dst: str, res: Tuple[int, int]) -> dict:
+    info = probe.probe(src)
+    w, h = info["width"], info["height"]
+    mp   = w * h / 1e6
+    fw, fh, s = _fit(w, h, res)
+    if s * MIN_RATIO > 1:                          # já é pequena
+        return {"path": src, "src_mp": mp, "decoded_mp": 0.0, "out_mp": mp}
+
+    k = _lowres(s) if info["video_codec"] == "mjpeg" else 0
+    _run(["ffmpeg", "-y", "-v", "error",
+          *(["-lowres", str(k)] if k else []),
+          "-i", src,
+          "-vf", f"scale={fw}:{fh}:flags=lanczos",
+          "-frames:v", "1", "-q:v", "2", dst])
+    return {"path": dst, "src_mp": mp,
+            "decoded_mp": mp / 4 ** k, "out_mp": fw * fh / 1e6}
+
+
+def prescale_images(images: List[str], res: Tuple[int, int], dst_dir: str,
+                    workers: int | None = None) -> Tuple[List[str], dict]:
+    """Reduz as imagens maiores que `res`; devolve (novos caminhos, stats)."""
+    t0 = time.perf_counter()
+    os.makedirs(dst_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    dsts = [os.path.join(dst_dir, f"{i:05d}_{os.path.splitext(os.path.basename(p))[0]}.jpg")
+            for i, p in enumerate(images)]
+
+    with ThreadPoolExecutor(max_workers=workers) as ex:     # cada job = 1 processo ffmpeg
+        results = list(ex.map(_prescale_one, images, dsts, [res] * len(images)))
+
+    done    = [r for r in results if r["decoded_mp"]]
+    elapsed = time.perf_counter() - t0
+    saved   = sum(r["src_mp"] - r["out_mp"] for r in done)
+    s_mp, source = 0.0, None
+    if done:                                       # maior original = medição mais estável
+        big = max(range(len(results)), key=lambda i: results[i]["src_mp"])
+        s_mp, source = decode_cost(images[big], results[big]["src_mp"], res)
+    stats = {"images":      len(images),
+             "prescaled":   len(done),
+             "workers":     workers,
+             "src_mp":      round(sum(r["src_mp"] for r in results), 1),
+             "decoded_mp":  round(sum(r["decoded_mp"] for r in done), 1),
+             "encode_mp":   round(sum(r["out_mp"] for r in results), 1),
+             "elapsed_s":   round(elapsed, 2),
+             "decode_s_mp": round(s_mp, 5),
+             "decode_s_mp_source": source,         # measured | env | default
+             "est_saved_s": round(saved * s_mp - elapsed, 2)}
+    logger.info("🗜️  Prescale: %d/%d imagens | %.1f MP → %.1f MP decodificados "
+                "no encode | %.2fs | ganho estimado %.2fs (%.4fs/MP, %s)",
+                stats["prescaled"], stats["images"], stats["src_mp"],
+                stats["encode_mp"], stats["elapsed_s"], stats["est_saved_s"],
+                s_mp, source)
+    return [r["path"] for r in results], stats
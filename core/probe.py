@@ -0,0 +1,163 @@
+# ─────────────────────────────────────────────────────────────────────────────
+#  probe.py  –  metadados de mídia (duração, codecs, sample rate, dimensões)
+# ─────────────────────────────────────────────────────────────────────────────
+import os, json, hashlib, logging, subprocess, tempfile, threading
+from collections import OrderedDict
+
+from core import media_headers
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.environ.get(
+    "PROBE_CACHE_DIR",
+    os.path.join(tempfile.gettempdir(), "mergevideo_probe"))
+
+MEM_ENTRIES = int(os.environ.get("PROBE_MEM_ENTRIES", "4096"))   # por cache, em memória
+
+
+class _Lru(OrderedDict):
+    """dict limitado a MEM_ENTRIES (o worker do gunicorn vive dias: sem
+    limite, uma entrada por upload de todos os jobs). Usar sob _lock."""
+
+    def get(self, key, default=None):
+        if key not in self:
+            return default
+        self.move_to_end(key)
+        return self[key]
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        if len(self) > MEM_ENTRIES:
+            self.popitem(last=False)
+
+
+_mem: _Lru = _Lru()                        # content hash → metadados
+_stat_mem: _Lru = _Lru()                   # (path, size, mtime) → metadados
+_keys: _Lru = _Lru()                       # (path, size, mtime) → content hash
+_lock = threading.Lock()
+
+# ╭──────────────────────────────────────────────────────────────────────────╮
+# │ 1. Chaves de cache                                                      │
+# ╰──────────────────────────────────────────────────────────────────────────╯
+def _stat_key(path: str) -> tuple:
+    st = os.stat(path)
+    return (os.path.realpath(path), st.st_size, st.st_mtime_ns)
+
+def _content_hash(path: str) -> str:
+    """sha256 do conteúdo — sobrevive a cópias/novos downloads do mesmo arquivo."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def file_hash(path: str) -> str:
+    """Hash de conteúdo, memoizado por (path, size, mtime)."""
+    sk = _stat_key(path)
+    with _lock:
+        digest = _keys.get(sk)
+    if digest is None:
+        digest = _content_hash(path)
+        with _lock:
+            _keys[sk] = digest
+    return digest
+
+def _disk_path(digest: str) -> str:
+    return os.path.join(CACHE_DIR, digest[:2], f"{digest}.json")
+
+def _disk_get(digest: str) -> dict | None:
+    try:
+        with open(_disk_path(digest)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _disk_put(digest: str, info: dict) -> None:
+    dst = _disk_path(digest)
+    try:
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        tmp = f"{dst}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(info, f)
+        os.replace(tmp, dst)                   # escrita atômica
+    except OSError as e:
+        logger.warning("⚠️  Cache de probe indisponível (%s)", e)
+
+# ╭──────────────────────────────────────────────────────────────────────────╮
+# │ 2. ffprobe                                                              │
+# ╰──────────────────────────────────────────────────────────────────────────╯
+def _ffprobe(path: str) -> dict:
+    out = subprocess.check_output(
+        ["ffprobe", "-v", "quiet", "-print_format", "json",
+         "-show_entries",
+         "format=duration,format_name:"
+         "stream=codec_type,codec_name,sample_rate,channels,width,height",
+         path],
+        text=True
+    )
+    raw = json.loads(out)
+    fmt = raw.get("format", {})
+    info = {"format": fmt.get("format_name"),
+            "duration": float(fmt["duration"]) if fmt.get("duration") else None,
+            "audio_codec": None, "sample_rate": None, "channels": None,
+            "video_codec": None, "width": None, "height": None}
+    for s in raw.get("streams", []):
+        if s.get("codec_type") == "audio" and info["audio_codec"] is None:
+            info["audio_codec"] = s.get("codec_name")
+            info["sample_rate"] = int(s["sample_rate"]) if s.get("sample_rate") else None
+            info["channels"]    = s.get("channels")
+        elif s.get("codec_type") == "video" and info["video_codec"] is None:
+            info["video_codec"] = s.get("codec_name")
+            info["width"], info["height"] = s.get("width"), s.get("height")
+    return info
+
+# ╭──────────────────────────────────────────────────────────────────────────╮
+# │ 3. API                                                                  │
+# ╰──────────────────────────────────────────────────────────────────────────╯
+def probe(path: str) -> dict:
+    """Metadados de `path` — memória → cabeçalho → disco → ffprobe."""
+    sk = _stat_key(path)
+    with _lock:
+        info = _stat_mem.get(sk)
+    if info is None:
+        info = media_headers.parse(path) or _probe_slow(path)
+        with _lock:
+            _stat_mem[sk] = info
+    return dict(info)
+
+def _probe_slow(path: str) -> dict:
+    """Formatos que media_headers não entende: cache por hash + ffprobe."""
+    digest = file_hash(path)
+    with _lock:
+        info = _mem.get(digest)
+    if info is not None:
+        return dict(info)
+
+    info = _disk_get(digest)
+    if info is None:
+        info = _ffprobe(path)
+        _disk_put(digest, info)
+        logger.info("🔎 Probe %s → %s", os.path.basename(path), info)
+
+    with _lock:
+        _mem[digest] = info
+    return info
+
+def duration(path: str) -> float:
+    d = probe(path)["duration"]
+    if d is None:
+        raise ValueError(f"Duração desconhecida: {path}")
+    return d
+
+def dimensions(path: str) -> tuple[int, int]:
+    info = probe(path)
+    if not info["width"] or not info["height"]:
+        raise ValueError(f"Dimensões desconhecidas: {path}")
+    return info["width"], info["height"]
+
+def clear_memory_cache() -> None:
+    with _lock:
+        _mem.clear()
+        _stat_mem.clear()
+        _keys.clear()
@@ -0,0 +1,80 @@
+# ─────────────────────────────────────────────────────────────────────────────
+#  profiles.py  –  perfis de encode (draft / standard / archival)
+# ─────────────────────────────────────────────────────────────────────────────
+#  Um perfil define preset/CRF do x264, fps, GOP e bitrate do AAC; blocos,
+#  telas verdes, concat final e os motores graph/pyav seguem o mesmo perfil.
+#  "standard" reproduz exatamente o encode histórico (veryfast, CRF 18).
+#  "preview" também reduz a resolução (short_side = menor lado, em px).
+# ─────────────────────────────────────────────────────────────────────────────
+from typing import List
+
+DEFAULT_PROFILE = "standard"
+
+PROFILES: dict[str, dict] = {
+    # o mais rápido possível: revisão de ordem/tempos, não para publicar
+    "draft": {
+        "preset": "ultrafast", "crf": 28, "fps": 15, "gop": 150,
+        "tune": "stillimage", "audio_bitrate": "96k",
+        "profile": "high", "level": "4.2",
+    },
+    "standard": {
+        "preset": "veryfast", "crf": 18, "fps": 25, "gop": None,
+        "tune": None, "audio_bitrate": "192k",
+        "profile": "high", "level": "4.2",
+    },
+    # master para reuso/arquivo: encode lento, quase sem perdas
+    "archival": {
+        "preset": "slow", "crf": 14, "fps": 25, "gop": 250,
+        "tune": "stillimage", "audio_bitrate": "256k",
+        "profile": "high", "level": "4.2",
+    },
+    # prévia 480p entregue antes do render completo (conferir ordem/cortes)
+    "preview": {
+        "preset": "ultrafast", "crf": 30, "fps": 15, "gop": 150,
+        "tune": "stillimage", "audio_bitrate": "64k",
+        "profile": "high", "level": "4.2", "short_side": 480,
+    },
+}
+
+
+def get(name: str | dict | None = None) -> dict:
+    """Perfil por nome (None → padrão). ValueError se não existir.
+
+    Um dict (perfil já resolvido/ajustado, ex.: core.adaptive) passa direto."""
+    if isinstance(name, dict):
+        return name
+    name = name or DEFAULT_PROFILE
+    if name not in PROFILES:
+        raise ValueError(f"Perfil desconhecido: {name} "
+                         f"(opções: {', '.join(PROFILES)})")
+    return {"name": name, **PROFILES[name]}
+
+
+def video_args(p: dict) -> List[str]:
+    """Argumentos libx264 do perfil (sem -r; fps entra no comando)."""
+    args = ["-c:v", "libx264", "-preset", p["preset"], "-crf", str(p["crf"]),
+            "-profile:v", p["profile"], "-level", p["level"]]
+    if p.get("tune"):
+        args += ["-tune", p["tune"]]
+    if p.get("gop"):
+        args += ["-g", str(p["gop"])]
+    if p.get("keyint_s"):                      # keyframe por tempo (vfr: frames ≠ tempo)
+        args += ["-force_key_frames", f"expr:gte(t,n_forced*{p['keyint_s']})"]
+    return args
+
+
+def audio_args(p: dict) -> List[str]:
+    return ["-c:a", "aac", "-b:a", p["audio_bitrate"], "-ar", "48000", "-ac", "2"]
+
+
+def x264_options(p: dict) -> dict:
+    """Mesmo perfil no formato de opções do PyAV."""
+    opts = {"preset": p["preset"], "crf": str(p["crf"]),
+            "profile": p["profile"], "level": p["level"]}
+    if p.get("tune"):
+        opts["tune"] = p["tune"]
+    if p.get("gop"):
+        opts["g"] = str(p["gop"])
+    if p.get("keyint_s"):                      # o motor força o I-frame por pts
+        opts["forced-idr"] = "1"
+    return opts
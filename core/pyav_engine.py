@@ -0,0 +1,213 @@
+# ─────────────────────────────────────────────────────────────────────────────
+#  pyav_engine.py  –  render em processo (PyAV + NumPy), sem arquivos temporários
+# ─────────────────────────────────────────────────────────────────────────────
+#  Cada imagem é decodificada uma vez, escalada e centralizada (letterbox) num
+#  buffer NumPy pré-alocado do tamanho final e entregue direto ao libx264 via
+#  PyAV. Como no motor por blocos (-vsync vfr), sai um frame por imagem, no
+#  instante round(j × dur_f × fps); o áudio é reamostrado e codificado em AAC
+#  no mesmo container, sem MP4 intermediário. Os quadros prontos ficam num
+#  LRU por caminho (até PYAV_CACHE_MB): repetição não seguida — cartela,
+#  logo, já unificados por core.dedup — não é decodificada de novo.
+#
+#  Dependências opcionais:  pip install av numpy
+# ─────────────────────────────────────────────────────────────────────────────
+import os, logging
+from collections import OrderedDict
+from fractions import Fraction
+from typing import Dict, List, Tuple
+
+from core import profiles
+
+logger = logging.getLogger(__name__)
+
+try:
+    import av
+    import numpy as np
+except ImportError:                                # pragma: no cover
+    av = np = None
+
+SAMPLE_RATE = 48000
+CACHE_MB    = float(os.environ.get("PYAV_CACHE_MB", "256"))   # quadros YUV decodificados
+GREEN       = (0, 255, 0)
+
+
+def _pict(name: str):
+    """Tipo de quadro: enum PictureType (PyAV ≥ 12) ou string (versões antigas)."""
+    enum = getattr(av.video.frame, "PictureType", None)
+    return getattr(enum, name) if enum else name
+
+
+def _require():
+    if av is None:
+        raise RuntimeError("Motor 'pyav' requer PyAV e NumPy: pip install av numpy")
+
+
+class _Letterbox:
+    """Buffer RGB (H×W×3) reutilizado para todas as imagens do job."""
+
+    def __init__(self, res: Tuple[int, int]):
+        self.w, self.h = res
+        self.buf = np.zeros((self.h, self.w, 3), dtype=np.uint8)
+
+    def frame(self, path: str):
+        with av.open(path) as c:
+            src = next(c.decode(video=0))
+        s  = min(self.w / src.width, self.h / src.height)
+        fw = max(1, min(self.w, round(src.width * s)))
+        fh = max(1, min(self.h, round(src.height * s)))
+        img = src.reformat(width=fw, height=fh, format="rgb24",
+                           interpolation="BICUBIC").to_ndarray()
+        x, y = (self.w - fw) // 2, (self.h - fh) // 2
+        self.buf[:] = 0
+        self.buf[y:y + fh, x:x + fw] = img
+        return self._yuv()
+
+    def solid(self, rgb):
+        self.buf[:] = rgb
+        return self._yuv()
+
+    def _yuv(self):
+        return av.VideoFrame.from_ndarray(self.buf, format="rgb24").reformat(format="yuv420p")
+
+
+class _AudioOut:
+    """Codifica áudio em AAC com pts contínuo (em amostras a 48 kHz)."""
+
+    def __init__(self, out, bitrate: str = "192k"):
+        self.out = out
+        self.stream = out.add_stream("aac", rate=SAMPLE_RATE, layout="stereo")
+        self.stream.bit_rate = int(bitrate.rstrip("k")) * 1000
+        self.fifo = av.AudioFifo()
+        self.pts  = 0
+
+    def _drain(self, final: bool = False):
+        size = self.stream.codec_context.frame_size or 1024
+        while self.fifo.samples >= size or (final and self.fifo.samples):
+            fr = self.fifo.read(min(size, self.fifo.samples) if final else size)
+            fr.pts, fr.time_base = self.pts, Fraction(1, SAMPLE_RATE)
+            self.pts += fr.samples
+            self.out.mux(self.stream.encode(fr))
+
+    def _write(self, frame):
+        frame.pts = None
+        self.fifo.write(frame)
+        self._drain()
+
+    def narration(self, path: str, seconds: float):
+        """Áudio integral do bloco, cortado/completado em `seconds`."""
+        want, got = round(seconds * SAMPLE_RATE), 0
+        rs = av.AudioResampler(format="fltp", layout="stereo", rate=SAMPLE_RATE)
+
+        def frames():
+            with av.open(path) as c:
+                for fr in c.decode(audio=0):
+                    yield from rs.resample(fr)
+            yield from rs.resample(None)           # esvazia o resampler
+
+        for r in frames():
+            if got + r.samples > want:
+                arr = np.ascontiguousarray(r.to_ndarray()[:, :want - got])
+                r = av.AudioFrame.from_ndarray(arr, format="fltp", layout="stereo")
+                r.sample_rate = SAMPLE_RATE
+            got += r.samples
+            if r.samples:
+                self._write(r)
+            if got >= want:
+                break
+        self.silence((want - got) / SAMPLE_RATE)
+
+    def silence(self, seconds: float):
+        n = round(seconds * SAMPLE_RATE)
+        while n > 0:
+            k = min(n, 4096)
+            fr = av.AudioFrame.from_ndarray(np.zeros((2, k), dtype=np.float32),
+                                            format="fltp", layout="stereo")
+            fr.sample_rate = SAMPLE_RATE
+            self._write(fr)
+            n -= k
+
+    def close(self):
+        self._drain(final=True)
+        self.out.mux(self.stream.encode(None))
+
+
+def render_pyav(image_groups: Dict[str, List[str]], audio_path: str,
+                output_path: str, green_sec: float, res: Tuple[int, int],
+                dur_a: float, progress_cb, prof: dict | None = None) -> dict:
+    """Motor "pyav": mesma timeline dos outros motores, num só passe em processo."""
+    _require()
+    prof = prof or profiles.get()
+    fps  = prof["fps"]
+    blocks = sorted(image_groups.items())
+    total_imgs = sum(len(v) for _, v in blocks)
+    stats = {"frames": 0, "decoded": 0}
+
+    with av.open(output_path, "w", options={"movflags": "+faststart"}) as out:
+        vs = out.add_stream("libx264", rate=fps)
+        vs.width, vs.height, vs.pix_fmt = res[0], res[1], "yuv420p"
+        vs.time_base = Fraction(1, fps)
+        vs.options = profiles.x264_options(prof)
+        audio = _AudioOut(out, prof["audio_bitrate"])
+        box   = _Letterbox(res)
+        cache: OrderedDict[str, object] = OrderedDict()   # LRU caminho → frame YUV
+        cache_max = max(1, int(CACHE_MB * 2**20 // (res[0] * res[1] * 3 // 2)))
+        last = None                               # último quadro de imagem enviado
+
+        keyint = prof.get("keyint_s")              # HLS: I-frame a cada keyint_s
+        next_key = 0.0
+
+        def put(frame, pts):
+            nonlocal next_key
+            frame.pts, frame.time_base = pts, vs.time_base
+            key = bool(keyint) and pts / fps >= next_key
+            if key:
+                frame.pict_type = _pict("I")
+                next_key = (pts / fps // keyint + 1) * keyint
+            out.mux(vs.encode(frame))
+            if key:
+                frame.pict_type = _pict("NONE")       # frame em cache pode voltar
+            stats["frames"] += 1
+
+        t0_us, last_pts, done = 0, -1, 0
+        for b, (pref, imgs) in enumerate(blocks):
+            if not imgs:
+                raise ValueError("Lista de imagens vazia")
+            d_us = round(dur_a / len(imgs) * 1e6)
+            for j, img in enumerate(imgs):
+                pts = ((t0_us + j * d_us) * fps + 500_000) // 1_000_000
+                done += 1
+                if pts <= last_pts:                # vfr: mesmo instante → descarta
+                    continue
+                if img in cache:
+                    cache.move_to_end(img)
+                else:
+                    cache[img] = box.frame(img)
+                    stats["decoded"] += 1
+                    if len(cache) > cache_max:
+                        cache.popitem(last=False)
+                last = cache[img]
+                put(last, pts)
+                last_pts = pts
+                if done % 25 == 0:
+                    progress_cb(10 + int(done / total_imgs * 78), "processing",
+                                f"Renderizando (pyav) {done}/{total_imgs}")
+            audio.narration(audio_path, dur_a)
+            t0_us += round(dur_a * 1e6)
+
+            if b != len(blocks) - 1 and green_sec > 0:
+                pts = (t0_us * fps + 500_000) // 1_000_000
+                put(box.solid(GREEN), pts)
+                last_pts, last = pts, None
+                audio.silence(green_sec)
+                t0_us += round(green_sec * 1e6)
+
+        # último frame repetido no fim → vídeo cobre toda a timeline
+        end = (t0_us * fps + 500_000) // 1_000_000 - 1
+        if end > last_pts and last is not None:
+            put(last, end)
+        out.mux(vs.encode(None))
+        audio.close()
+
+    logger.info("🐍 PyAV: %d frames codificados, %d imagens decodificadas",
+                stats["frames"], stats["decoded"])
+    return stats
@@ -0,0 +1,164 @@
+# ─────────────────────────────────────────────────────────────────────────────
+#  scheduler.py  –  fila de jobs: menor-primeiro, justa por cliente, com aging
+# ─────────────────────────────────────────────────────────────────────────────
+#  Antes cada /create_video abria uma thread na hora: um lote de 2 000
+#  imagens disputava CPU com os shorts de 20 imagens de todo mundo. Agora há
+#  `slots` jobs simultâneos e, quando um slot libera, roda o job de menor
+#
+#      ln(1 + custo + uso recente do cliente) − espera / AGING_S
+#
+#  custo = imagens × duração do áudio × grupos (unidade relativa). O uso do
+#  cliente soma os jobs dele em execução e o que já rodou (decai com meia-vida
+#  HALF_LIFE_S), então um cliente não monopoliza a fila. O aging é aditivo
+#  sobre o log: um job 1000× maior que os outros espera ~7 × AGING_S, não
+#  horas; e quem espera MAX_WAIT_S passa na frente de tudo. Jobs acima de
+#  BATCH_COST rodam com nice/ionice baixos (herdados pelos ffmpeg filhos da
+#  thread). `release`/`reacquire` devolvem o slot enquanto o job espera o
+#  usuário (confirmação da prévia). `drain` para de despachar
+#  (SIGTERM/reciclagem) e espera os jobs em execução.
+# ─────────────────────────────────────────────────────────────────────────────
+import os, math, time, shutil, logging, itertools, subprocess, threading
+from collections import defaultdict
+
+logger = logging.getLogger(__name__)
+
+AGING_S     = float(os.environ.get("SCHED_AGING_S", "120"))
+HALF_LIFE_S = float(os.environ.get("SCHED_HALF_LIFE_S", "600"))
+BATCH_COST  = float(os.environ.get("SCHED_BATCH_COST", "200000"))
+MAX_WAIT_S  = float(os.environ.get("SCHED_MAX_WAIT_S", "1800"))
+BATCH_NICE  = 10
+
+
+def job_cost(images: int, audio_s: float, groups: int) -> float:
+    """Custo relativo usado na ordenação."""
+    return max(1, images) * max(1.0, audio_s) * max(1, groups)
+
+
+def priority(cost: float, usage: float, wait: float) -> float:
+    """Menor sai primeiro (também usada por core.jobqueue)."""
+    if wait >= MAX_WAIT_S:
+        return -math.inf                        # empate → ordem de chegada
+    return math.log1p(max(0.0, cost + usage)) - wait / AGING_S
+
+
+def _lower_priority():
+    """nice/ionice da thread atual (Linux: prioridade é por thread)."""
+    tid = threading.get_native_id()
+    try:
+        os.setpriority(os.PRIO_PROCESS, tid, BATCH_NICE)
+    except (OSError, AttributeError):
+        pass
+    if shutil.which("ionice"):
+        subprocess.run(["ionice", "-c", "2", "-n", "7", "-p", str(tid)],
+                       capture_output=True)
+
+
+class JobScheduler:
+    def __init__(self, slots: int, on_queue=None):
+        self.slots    = max(1, slots)
+        self.on_queue = on_queue or (lambda positions: None)
+        self._lock    = threading.Lock()
+        self._queue: list[dict] = []
+        self._running = 0
+        self._paused  = False
+        self._idle    = threading.Condition(self._lock)
+        self._usage   = defaultdict(float)      # cliente → custo (decai)
+        self._stamp   = defaultdict(float)      # cliente → última atualização
+        self._seq     = itertools.count()
+        self._local   = threading.local()       # job da thread atual
+
+    # ── uso por cliente (decaimento exponencial) ────────────────────────
+    def _decayed(self, client: str, now: float) -> float:
+        dt = now - self._stamp[client]
+        self._usage[client] *= 0.5 ** (dt / HALF_LIFE_S)
+        self._stamp[client] = now
+        return self._usage[client]
+
+    def _priority(self, job: dict, now: float) -> float:
+        return priority(job["cost"], self._decayed(job["client"], now), now - job["t"])
+
+    # ── API ─────────────────────────────────────────────────────────────
+    def submit(self, job_id: str, client: str, cost: float, fn, *args):
+        job = {"id": job_id, "client": client or "anon", "cost": float(cost),
+               "fn": fn, "args": args, "t": time.monotonic(), "seq": next(self._seq)}
+        with self._lock:
+            self._queue.append(job)
+        logger.info("🗂️  Job %s na fila (cliente %s, custo %.0f)", job_id, job["client"], cost)
+        self._dispatch()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"slots": self.slots, "running": self._running,
+                    "queued": len(self._queue), "paused": self._paused}
+
+    def release(self) -> dict | None:
+        """Devolve o slot do job da thread atual (ex.: esperando a confirmação
+        da prévia). Fora de um job do scheduler devolve None."""
+        job = getattr(self._local, "job", None)
+        if job is None or job.get("released"):
+            return None
+        with self._lock:
+            job["released"] = True
+            self._running -= 1
+            self._idle.notify_all()
+        logger.info("⏸️  Job %s liberou o slot", job["id"])
+        self._dispatch()
+        return job
+
+    def reacquire(self, job: dict):
+        """Volta `job` (de `release`) à fila e bloqueia até ganhar um slot."""
+        wake = threading.Event()
+        with self._lock:
+            job.update(t=time.monotonic(), seq=next(self._seq), wake=wake)
+            self._queue.append(job)
+        self._dispatch()
+        wake.wait()
+
+    def drain(self, timeout: float) -> int:
+        """Para de iniciar jobs e espera os em execução até `timeout` s;
+        devolve quantos ainda rodam (a fila fica parada)."""
+        deadline = time.monotonic() + timeout
+        with self._idle:
+            self._paused = True
+            while self._running and (left := deadline - time.monotonic()) > 0:
+                self._idle.wait(left)
+            return self._running
+
+    # ── despacho ────────────────────────────────────────────────────────
+    def _dispatch(self):
+        started = []
+        with self._lock:
+            now = time.monotonic()
+            while not self._paused and self._running < self.slots and self._queue:
+                job = min(self._queue, key=lambda j: (self._priority(j, now), j["seq"]))
+                self._queue.remove(job)
+                self._running += 1
+                self._usage[job["client"]] = self._decayed(job["client"], now) + job["cost"]
+                started.append(job)
+            order = sorted(self._queue, key=lambda j: (self._priority(j, now), j["seq"]))
+            positions = {j["id"]: i + 1 for i, j in enumerate(order)}
+
+        for job in started:
+            if job.get("wake"):                 # thread parada em reacquire
+                job.update(released=False)
+                job.pop("wake").set()
+                continue
+            threading.Thread(target=self._run, args=(job,), daemon=True).start()
+        self.on_queue(positions)
+
+    def _run(self, job: dict):
+        batch = job["cost"] >= BATCH_COST
+        if batch:
+            _lower_priority()
+        logger.info("▶️  Job %s iniciado (espera %.1fs%s)", job["id"],
+                    time.monotonic() - job["t"], ", prioridade de lote" if batch else "")
+        self._local.job = job
+        try:
+            job["fn"](*job["args"])
+        finally:
+            self._local.job = None
+            with self._lock:
+                if not job.get("released"):     # saiu sem reacquire: slot já devolvido
+                    self._running -= 1
+                self._idle.notify_all()
+            self._dispatch()
@@ -0,0 +1,116 @@
+# ─────────────────────────────────────────────────────────────────────────────
+#  worker.py  –  processo de render separado do web (fila core.jobqueue)
+# ─────────────────────────────────────────────────────────────────────────────
+#  O web (app.py / app_local.py com RENDER_QUEUE) só enfileira e transmite o
+#  progresso; aqui `slots` threads pegam jobs da fila e rodam a mesma função
+#  de processamento do app (download → preflight → render → upload), cujo
+#  progresso vai para a fila. Assim o timeout/concurrency do web não limita o
+#  encode e cada lado escala sozinho.
+#
+#      RENDER_QUEUE=sqlite:/data/render.db python -m core.worker
+#      RENDER_QUEUE=dir:/data/q python -m core.worker --target app_local:process_video_local
+#
+#  Com app_local o worker precisa do mesmo diretório de trabalho do web
+#  (./local_storage). SIGTERM/SIGINT: para de pegar jobs, espera os ativos
+#  até DRAIN_TIMEOUT_S e devolve o resto à fila.
+# ─────────────────────────────────────────────────────────────────────────────
+import os, time, signal, socket, logging, argparse, importlib, threading
+
+from core import jobqueue, perflog
+
+logger = logging.getLogger(__name__)
+
+DRAIN_TIMEOUT = float(os.environ.get("DRAIN_TIMEOUT_S", "8"))
+
+
+class Worker:
+    def __init__(self, queue: jobqueue.JobQueue, run, slots: int, poll_s: float = 1.0,
+                 prefix: str = ""):
+        self.queue, self.run, self.slots, self.poll_s = queue, run, max(1, slots), poll_s
+        self.prefix  = prefix                    # só jobs com este prefixo de id
+        self.name    = f"{socket.gethostname()}:{os.getpid()}"
+        self._active: set[str] = set()
+        self._released: set[str] = set()      # devolvidos à fila no drain
+        self._lock   = threading.Lock()
+        self._stop   = threading.Event()
+
+    def _job(self, job: dict):
+        try:
+            self.run(job["spec"], job["id"])
+        except Exception:
+            logger.exception("❌ Job %s falhou no worker", job["id"])
+        finally:
+            if job["id"] not in self._released:
+                self.queue.finish(job["id"])
+            with self._lock:
+                self._active.discard(job["id"])
+
+    def serve(self):
+        logger.info("🛠️  Worker %s: %d slot(s)", self.name, self.slots)
+        beat = 0.0
+        while not self._stop.is_set():
+            now = time.monotonic()
+            if now - beat > jobqueue.LEASE_S / 4:
+                beat = now
+                with self._lock:
+                    active = list(self._active)
+                for job_id in active:
+                    self.queue.heartbeat(job_id)
+                if self.queue.requeue_stale():
+                    logger.info("♻️ Jobs de workers mortos voltaram à fila")
+            with self._lock:
+                free = len(self._active) < self.slots
+            job = self.queue.claim(self.name, self.prefix) if free else None
+            if not job:
+                self._stop.wait(self.poll_s)
+                continue
+            logger.info("▶️  Job %s (cliente %s)", job["id"], job["client"])
+            with self._lock:
+                self._active.add(job["id"])
+            threading.Thread(target=self._job, args=(job,), daemon=True).start()
+
+    def stop(self, *_):
+        """Para de pegar jobs (handler de SIGTERM/SIGINT); serve() retorna."""
+        self._stop.set()
+
+    def drain(self, timeout: float = DRAIN_TIMEOUT):
+        """Espera os jobs ativos até `timeout` s e devolve o resto à fila."""
+        deadline = time.monotonic() + timeout
+        while self._active and time.monotonic() < deadline:
+            time.sleep(0.2)
+        with self._lock:
+            left = list(self._active)
+            self._released.update(left)
+        for job_id in left:
+            self.queue.release(job_id)
+        perflog.flush()
+        logger.info("🛑 Worker drenado (%d job(s) devolvidos à fila)", len(left))
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Worker de render (fila RENDER_QUEUE)")
+    ap.add_argument("--queue", default=os.environ.get("RENDER_QUEUE"),
+                    help="sqlite:<arquivo> | dir:<diretório> (padrão: $RENDER_QUEUE)")
+    ap.add_argument("--target", default=os.environ.get("RENDER_TARGET", "app:process_video"),
+                    help="modulo:funcao(spec, job_id) que processa o job")
+    ap.add_argument("--slots", type=int, default=int(os.environ.get(
+        "MAX_CONCURRENT_JOBS", max(1, (os.cpu_count() or 2) // 2))))
+    ap.add_argument("--poll", type=float, default=1.0, help="s entre consultas à fila vazia")
+    args = ap.parse_args()
+    if not args.queue:
+        ap.error("defina --queue ou RENDER_QUEUE")
+
+    os.environ["RENDER_QUEUE"] = args.queue            # o app publica progresso na fila
+    mod, fn = args.target.split(":")
+    run = getattr(importlib.import_module(mod), fn)
+    logging.basicConfig(level=logging.INFO)
+
+    worker = Worker(jobqueue.open_queue(args.queue), run, args.slots, args.poll)
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    worker.serve()
+    worker.drain()
+
+
+if __name__ == "__main__":
+    main()
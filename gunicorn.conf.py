@@ -25,4 +25,18 @@ proc_name = "darkcreator100k-mergevideo"
 # Memory and resource limits
 max_requests = 100
 max_requests_jitter = 10
-preload_app = True
\ No newline at end of file
+preload_app = True
+
+# Jobs duráveis (core.jobstore): ao subir o worker retoma jobs órfãos; ao
+# sair (reciclagem por max_requests ou SIGTERM do Cloud Run) drena e deixa
+# os jobs em andamento marcados para retomada
+def post_worker_init(worker):
+    hooks = getattr(worker.wsgi, "extensions", {}).get("durable_jobs")
+    if hooks:
+        hooks["start"]()
+
+
+def worker_exit(server, worker):
+    hooks = getattr(getattr(worker, "wsgi", None), "extensions", {}).get("durable_jobs")
+    if hooks:
+        hooks["drain"]()
@@ -0,0 +1,4 @@
+# Testes rodam da raiz do repositório: python -m pytest -q tests
+import os, sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,27 @@
+"""
+Alvo de core.worker para tests/test_distributed.py: core.distributed.render_task
+com _make_block trocado por um stub (sem ffmpeg). O "MP4" é um JSON com as
+imagens do bloco; cada render anota o prefixo em DIST_SHARED_DIR/rendered.log.
+"""
+import os, json
+
+from core import distributed, ffmpeg_processor
+
+
+def fake_block(images, audio, out_mp4, res, dur_a=None, chunks=1, profile=None, **_):
+    with open(out_mp4, "w") as f:
+        json.dump({"images": [os.path.basename(p) for p in images], "dur_a": dur_a,
+                   "res": list(res), "profile": profile["name"], "pid": os.getpid()}, f)
+    shared = os.environ.get("DIST_SHARED_DIR") or distributed.SHARED_DIR
+    with open(os.path.join(shared, "rendered.log"), "a") as f:
+        f.write(prefix(images) + "\n")
+
+
+def prefix(images) -> str:
+    """Prefixo do bloco pelas entradas copiadas (`<prefixo>_<n>.<ext>`)."""
+    return os.path.basename(images[0]).split("_")[0]
+
+
+def render_task(spec: dict, task_id: str):
+    ffmpeg_processor._make_block = fake_block
+    distributed.render_task(spec, task_id)
@@ -0,0 +1,155 @@
+"""
+Motor "distributed" com workers locais (core.worker em subprocessos) sobre um
+DIST_SHARED_DIR temporário e fila dir:. _make_block, _green e _concat_parts
+são stubs (tests/dist_stub.py): não precisa de ffmpeg.
+"""
+import os, sys, json, signal, subprocess
+
+import pytest
+
+from core import distributed, ffmpeg_processor as fp, jobqueue
+from core.plan import make_plan
+from tests import dist_stub
+
+ROOT    = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+AUDIO_S = 6.0
+GROUPS  = {"A": 3, "B": 2, "C": 4, "D": 1}
+
+
+@pytest.fixture
+def shared(tmp_path, monkeypatch):
+    """Diretório compartilhado + fila; stubs no coordenador (este processo)."""
+    root = tmp_path / "shared"
+    root.mkdir()
+    url = f"dir:{root / 'queue'}"
+    monkeypatch.setattr(distributed, "SHARED_DIR", str(root))
+    monkeypatch.setattr(distributed, "QUEUE_URL", url)
+    monkeypatch.setattr(distributed, "LOCAL_SLOTS", 0)
+    monkeypatch.setattr(distributed, "POLL_S", 0.05)
+    monkeypatch.setattr(distributed, "TASK_TIMEOUT", 30)
+    monkeypatch.setattr(fp, "_make_block", dist_stub.fake_block)
+
+    def green(path, dur, res, prof=None):
+        with open(path, "w") as f:
+            json.dump({"green": dur}, f)
+
+    concat = []
+
+    def concat_parts(parts, output_path, tmpd, prof):
+        for p in parts:                            # as partes somem no fim do job
+            with open(p) as f:
+                concat.append(json.load(f))
+        with open(output_path, "w") as f:
+            json.dump(concat, f)
+
+    monkeypatch.setattr(fp, "_green", green)
+    monkeypatch.setattr(fp, "_concat_parts", concat_parts)
+    return root, url, concat
+
+
+def _plan(tmp_path, green_s=1.0):
+    src = tmp_path / "src"
+    src.mkdir()
+    audio = src / "audio.mp3"
+    audio.write_bytes(b"\0" * 64)
+    groups = {}
+    for pref, n in GROUPS.items():
+        for i in range(1, n + 1):
+            (src / f"{pref}{i}.jpg").write_bytes(pref.encode() * 16)
+            groups.setdefault(pref, []).append(str(src / f"{pref}{i}.jpg"))
+    return make_plan(groups, str(audio), green_s, "9x16", "distributed", "preview",
+                     audio_s=AUDIO_S)
+
+
+def _workers(root, url, n):
+    env = {**os.environ, "DIST_SHARED_DIR": str(root), "PYTHONPATH": ROOT,
+           "RENDER_QUEUE_LEASE_S": "30"}
+    return [subprocess.Popen([sys.executable, "-m", "core.worker", "--queue", url,
+                              "--target", "tests.dist_stub:render_task",
+                              "--slots", "1", "--poll", "0.05"],
+                             cwd=ROOT, env=env, stdout=subprocess.DEVNULL,
+                             stderr=subprocess.DEVNULL)
+            for _ in range(n)]
+
+
+def _stop(procs):
+    for p in procs:
+        p.send_signal(signal.SIGTERM)
+    for p in procs:
+        try:
+            p.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            p.kill()
+
+
+def test_worker_processes_render_each_block_once_in_order(shared, tmp_path):
+    root, url, concat = shared
+    plan = _plan(tmp_path)
+    procs = _workers(root, url, 3)
+    try:
+        stats = fp.execute_plan(plan, str(tmp_path / "out.mp4"), lambda *a: None,
+                                dedup=False)
+    finally:
+        _stop(procs)
+
+    with open(root / "rendered.log") as f:
+        rendered = f.read().split()
+    assert sorted(rendered) == sorted(GROUPS)                        # cada bloco 1×
+
+    blocks = concat[0::2]
+    assert [b["images"] for b in blocks] == [                       # ordem da timeline
+        [f"{p}_{n:05d}.jpg" for n in range(GROUPS[p])] for p in sorted(GROUPS)]
+    assert concat[1::2] == [{"green": 1.0}] * (len(GROUPS) - 1)
+    assert all(b["dur_a"] == pytest.approx(AUDIO_S) for b in blocks)
+    assert all(b["profile"] == "preview" for b in blocks)          # perfil do plano
+    assert {b["pid"] for b in blocks} - {os.getpid()}              # feito fora daqui
+    assert stats["distributed"]["tasks"] == len(GROUPS)
+    assert os.listdir(root / "jobs") == []                          # limpeza
+
+
+def test_local_slots_claim_only_own_job(shared, tmp_path, monkeypatch):
+    root, url, concat = shared
+    monkeypatch.setattr(distributed, "LOCAL_SLOTS", 1)
+    q = jobqueue.open_queue(url)
+    q.put("otherjob.A", {"queue": url}, client="other", cost=0.0)   # de outro coordenador
+    fp.execute_plan(_plan(tmp_path, green_s=0), str(tmp_path / "out.mp4"),
+                    lambda *a: None, dedup=False)
+    assert len(concat) == len(GROUPS)
+    assert q.claim("t", "otherjob.")["id"] == "otherjob.A"          # intocada
+
+
+def test_failed_block_cancels_pending_tasks(shared, tmp_path, monkeypatch):
+    root, url, _ = shared
+    monkeypatch.setattr(distributed, "LOCAL_SLOTS", 1)
+
+    def boom(images, audio, out_mp4, res, **kw):
+        if dist_stub.prefix(images) == "B":
+            raise RuntimeError("encode falhou")
+        dist_stub.fake_block(images, audio, out_mp4, res, **kw)
+
+    monkeypatch.setattr(fp, "_make_block", boom)
+    with pytest.raises(RuntimeError, match="Bloco B falhou"):
+        fp.execute_plan(_plan(tmp_path), str(tmp_path / "out.mp4"),
+                        lambda *a: None, dedup=False)
+    q = jobqueue.open_queue(url)
+    assert q.depth()["queued"] == 0                                  # C, D canceladas
+    assert os.listdir(root / "jobs") == []
+
+
+def test_task_of_cleaned_up_job_is_discarded(shared, tmp_path):
+    root, url, _ = shared
+    q = jobqueue.open_queue(url)
+    parts = tmp_path / "gone" / "parts"
+    audio = tmp_path / "audio.mp3"
+    audio.write_bytes(b"\0")
+    spec = {"queue": url, "images": ["A_00000.jpg"], "audio": str(audio), "res": [480, 854],
+            "dur_a": 1.0, "chunks": 1, "profile": {"name": "preview"},
+            "out": str(parts / "A.mp4")}
+    q.put("gone.A", spec, client="gone", cost=0.0)
+    distributed.render_task(spec, "gone.A")           # parts/ já apagado: descarta
+    assert not parts.exists()
+    assert q.get("gone.A").get("status") is None
+
+    audio.unlink()                                    # entradas também: nem renderiza
+    distributed.render_task(spec, "gone.A")
+    assert (root / "rendered.log").read_text().split() == ["A"]
@@ -0,0 +1,121 @@
+"""
+core.jobqueue: SqliteQueue e DirQueue (mesmos testes nos dois) num diretório
+temporário — ordem de saída, uso por cliente, prefixo, cancel, lease.
+"""
+import pytest
+
+from core import jobqueue, scheduler
+from core.jobqueue import JobQueue
+
+
+@pytest.fixture(params=["sqlite", "dir"])
+def url(request, tmp_path):
+    return (f"sqlite:{tmp_path / 'q.db'}" if request.param == "sqlite"
+            else f"dir:{tmp_path / 'q'}")
+
+
+@pytest.fixture
+def q(url):
+    return jobqueue.open_queue(url)
+
+
+def _drain(q, prefix=""):
+    out = []
+    while (job := q.claim("w", prefix)):
+        out.append(job["id"])
+    return out
+
+
+def test_backend_missing_methods_fails_at_construction():
+    class Partial(JobQueue):
+        def put(self, job_id, spec, client, cost):
+            pass
+
+    with pytest.raises(TypeError):
+        Partial()
+
+
+def test_open_queue_rejects_unknown_scheme():
+    assert jobqueue.open_queue("") is None
+    with pytest.raises(ValueError):
+        jobqueue.open_queue("redis://x")
+
+
+def test_claim_returns_spec_and_client(q):
+    q.put("j1", {"images": ["a.jpg"]}, client="c1", cost=3.0)
+    assert q.claim("w") == {"id": "j1", "spec": {"images": ["a.jpg"]}, "client": "c1"}
+    assert q.claim("w") is None
+    assert q.depth() == {"queued": 0, "running": 1}
+
+
+def test_cheaper_job_first(q):
+    q.put("big", {}, client="c", cost=1000.0)
+    q.put("small", {}, client="c", cost=1.0)
+    assert _drain(q) == ["small", "big"]
+
+
+def test_fair_share_between_clients(q):
+    for i in range(3):
+        q.put(f"a{i}", {}, client="a", cost=10.0)
+    q.put("b0", {}, client="b", cost=10.0)
+    assert _drain(q) == ["a0", "b0", "a1", "a2"]
+
+
+def test_usage_is_shared_by_every_queue_instance(q, url):
+    q.put("a0", {}, client="a", cost=10.0)
+    q.put("a1", {}, client="a", cost=10.0)
+    q.put("b0", {}, client="b", cost=10.0)
+    assert q.claim("w1")["id"] == "a0"
+    other = jobqueue.open_queue(url)                 # outro worker, mesma fila
+    assert other.claim("w2")["id"] == "b0"
+
+
+def test_max_wait_falls_back_to_arrival_order(q, monkeypatch):
+    monkeypatch.setattr(scheduler, "MAX_WAIT_S", 0.0)
+    q.put("big", {}, client="c", cost=1000.0)
+    q.put("small", {}, client="c", cost=1.0)
+    assert _drain(q) == ["big", "small"]
+
+
+def test_prefix_claim_only_matching_jobs(q):
+    q.put("other.A", {}, client="other", cost=0.0)
+    q.put("job1.A", {}, client="job1", cost=1.0)
+    q.put("job1.B", {}, client="job1", cost=2.0)
+    assert _drain(q, "job1.") == ["job1.A", "job1.B"]
+    assert q.depth()["queued"] == 1
+    assert q.claim("w")["id"] == "other.A"
+
+
+def test_cancel_removes_only_queued(q):
+    q.put("j1", {}, client="c", cost=1.0)
+    q.put("j2", {}, client="c", cost=2.0)
+    assert q.claim("w")["id"] == "j1"
+    q.cancel("j1")                                   # já pego: segue rodando
+    q.cancel("j2")
+    assert q.depth() == {"queued": 0, "running": 1}
+    q.release("j1")
+    assert q.claim("w")["id"] == "j1"
+
+
+def test_stale_job_requeued(q, monkeypatch):
+    q.put("j1", {}, client="c", cost=1.0)
+    q.claim("w1")
+    assert q.requeue_stale() == 0                    # heartbeat em dia
+    monkeypatch.setattr(jobqueue, "LEASE_S", -1.0)
+    assert q.requeue_stale() == 1                    # worker morto
+    assert q.depth() == {"queued": 1, "running": 0}
+    assert q.claim("w2")["id"] == "j1"
+
+
+def test_progress_merges_and_forget_after_finish(q):
+    q.put("j1", {}, client="c", cost=1.0)
+    q.progress("j1", {"status": "processing", "progress": 10})
+    q.progress("j1", {"progress": 50})
+    assert q.get("j1") == {"status": "processing", "progress": 50}
+    q.claim("w")
+    q.finish("j1")
+    assert q.depth() == {"queued": 0, "running": 0}
+    q.forget("j1")
+    assert q.get("j1") == {}
+    q.progress("j1", {"status": "x"})                # job esquecido: nada a gravar
+    assert q.get("j1") == {}
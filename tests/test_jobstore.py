@@ -0,0 +1,111 @@
+"""
+core.jobstore com LocalJobStore num diretório temporário: adoção (claim) de
+job interrompido ou sem heartbeat, checkpoint de partes e finish() depois da
+drenagem. Outro processo = outra instância com outro `owner`.
+"""
+import pytest
+
+from core import jobstore
+from core.jobstore import JobStore, LocalJobStore
+from core.plan import make_plan
+
+
+class OtherProcess(LocalJobStore):
+    owner = "outra-instancia:1"
+
+
+@pytest.fixture
+def stores(tmp_path):
+    root = str(tmp_path / "jobs")
+    return LocalJobStore(root), OtherProcess(root)
+
+
+def _plan():
+    return make_plan({"A": ["a1.jpg", "a2.jpg"], "B": ["b1.jpg"]}, "audio.mp3",
+                     1, "9x16", audio_s=4.0)
+
+
+def test_backend_missing_methods_fails_at_construction():
+    class Partial(JobStore):
+        def _read(self, key):
+            return None, 0
+
+    with pytest.raises(TypeError):
+        Partial()
+
+
+def test_live_job_is_not_claimed(stores):
+    a, b = stores
+    a.create("j1", {"x": 1}, "cli")
+    assert b.claim("j1") is None
+    assert a.load("j1")["owner"] == a.owner
+
+
+def test_interrupted_job_is_claimed_once(stores):
+    a, b = stores
+    a.create("j1", {"x": 1}, "cli")
+    a.interrupt()
+    st = b.claim("j1")
+    assert st["owner"] == b.owner and st["phase"] == "queued" and st["resumes"] == 1
+    assert st["spec"] == {"x": 1}
+    assert b.claim("j1") is None                    # já é dele
+
+
+def test_expired_lease_is_claimed_and_old_owner_cannot_write(stores, monkeypatch):
+    a, b = stores
+    a.create("j1", {}, "cli")
+    monkeypatch.setattr(jobstore, "LEASE_S", 0.0)   # heartbeat de A venceu
+    assert b.claim("j1")["owner"] == b.owner
+    assert a.update("j1", phase="rendering") is None
+    assert a.load("j1")["phase"] == "queued"
+
+
+def test_too_many_resumes_drops_job(stores, monkeypatch):
+    a, b = stores
+    monkeypatch.setattr(jobstore, "MAX_RESUMES", 1)
+    a.create("j1", {}, "cli")
+    a.update("j1", resumes=1, phase="interrupted")
+    assert b.claim("j1") is None
+    assert a.load("j1") is None
+
+
+def test_finish_after_interrupt_keeps_checkpoint(stores, tmp_path):
+    a, b = stores
+    a.create("j1", {}, "cli")
+    ck = a.checkpoint("j1")
+    ck.begin(_plan())
+    part = tmp_path / "A.mp4"
+    part.write_bytes(b"mp4 do bloco A")
+    ck.save("A", str(part))
+
+    a.interrupt()                                   # SIGTERM: drenagem
+    a.finish("j1")                                  # render derrubado pela drenagem
+    assert a.load("j1")["phase"] == "interrupted"
+
+    assert b.claim("j1")
+    ck2 = b.checkpoint("j1")
+    ck2.begin(_plan())                              # mesmo plano: partes valem
+    dst = tmp_path / "restored.mp4"
+    assert ck2.restore("A", str(dst)) and dst.read_bytes() == b"mp4 do bloco A"
+    assert not ck2.restore("B", str(dst))
+    assert ck2.restored == 1
+
+    b.finish("j1")                                  # concluído pelo novo dono
+    assert b.load("j1") is None
+
+
+def test_changed_plan_discards_parts(stores, tmp_path):
+    a, _ = stores
+    a.create("j1", {}, "cli")
+    ck = a.checkpoint("j1")
+    ck.begin(_plan())
+    part = tmp_path / "A.mp4"
+    part.write_bytes(b"x")
+    ck.save("A", str(part))
+
+    other = make_plan({"A": ["a1.jpg"], "B": ["b1.jpg"]}, "audio.mp3", 1, "9x16",
+                      audio_s=4.0)
+    ck2 = a.checkpoint("j1")
+    ck2.begin(other)
+    assert not ck2.restore("A", str(tmp_path / "r.mp4"))
+    assert a.load("j1")["parts"] == {}
@@ -0,0 +1,44 @@
+"""
+core.media_headers: MP3 sem Xing/VBRI (varredura de frames) em arquivos
+sintéticos — frames CBR 128 kbps / 44,1 kHz com payload zerado.
+"""
+import pytest
+
+from core import media_headers
+
+FRAME = b"\xff\xfb\x90\x64" + b"\0" * 413          # MPEG1 L3, 417 bytes, 1152 amostras
+SPF_S = 1152 / 44100
+
+
+def _write(tmp_path, data: bytes, name="a.mp3") -> str:
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+@pytest.fixture(params=[1024 * 1024, 1000])        # um bloco só / frames cortados entre blocos
+def chunk(request, monkeypatch):
+    monkeypatch.setattr(media_headers, "SCAN_CHUNK", request.param)
+
+
+def test_frame_scan_counts_every_frame(tmp_path, chunk):
+    info = media_headers.parse(_write(tmp_path, FRAME * 300))
+    assert info["duration"] == pytest.approx(300 * SPF_S)
+    assert (info["sample_rate"], info["channels"]) == (44100, 2)
+
+
+def test_frame_scan_skips_id3_tags(tmp_path, chunk):
+    id3v2 = b"ID3\x04\x00\x00\x00\x00\x00\x0a" + b"\0" * 10
+    id3v1 = b"TAG" + b"\0" * 125
+    info = media_headers.parse(_write(tmp_path, id3v2 + FRAME * 120 + id3v1))
+    assert info["duration"] == pytest.approx(120 * SPF_S)
+
+
+def test_short_trailer_is_tolerated(tmp_path, chunk):
+    info = media_headers.parse(_write(tmp_path, FRAME * 200 + b"APETAGEX" + b"\0" * 24))
+    assert info["duration"] == pytest.approx(200 * SPF_S)
+
+
+def test_junk_mid_file_falls_back_to_ffprobe(tmp_path, chunk):
+    data = FRAME * 100 + b"\x00\x13\x37" + FRAME * 100
+    assert media_headers.parse(_write(tmp_path, data)) is None
@@ -0,0 +1,66 @@
+"""
+Motor "pyav" × motor "blocks": mesmo job sintético, mesma timeline.
+
+Confere a duração total e o instante de cada frame de imagem (fora das telas
+verdes, que o "blocks" grava a fps constante e o "pyav" como um frame só).
+Pulado sem PyAV/NumPy ou sem ffmpeg/ffprobe no PATH.
+"""
+import json, shutil, subprocess
+
+import pytest
+
+pytest.importorskip("av")
+pytest.importorskip("numpy")
+if not (shutil.which("ffmpeg") and shutil.which("ffprobe")):
+    pytest.skip("ffmpeg/ffprobe ausentes", allow_module_level=True)
+
+from core import ffmpeg_processor as fp
+from bench.synth import make_audio, make_images
+
+AUDIO_S  = 3.0
+GROUPS   = {"A": 5, "B": 4}
+PROFILE  = "preview"                    # 480p/15 fps: rápido e sem calibrar core.cost
+
+
+def _probe(path: str) -> tuple[float, list[float]]:
+    """(duração, pts dos pacotes de vídeo em ordem de apresentação)."""
+    raw = json.loads(subprocess.check_output(
+        ["ffprobe", "-v", "error", "-select_streams", "v:0",
+         "-show_entries", "format=duration:packet=pts_time", "-of", "json", path],
+        text=True))
+    return (float(raw["format"]["duration"]),
+            sorted(float(p["pts_time"]) for p in raw["packets"]))
+
+
+def _in_green(t: float, green_s: float) -> bool:
+    span = AUDIO_S + green_s
+    return green_s > 0 and t < span * (len(GROUPS) - 1) and t % span >= AUDIO_S - 1e-6
+
+
+@pytest.fixture(scope="module")
+def job(tmp_path_factory):
+    src = tmp_path_factory.mktemp("pyav")
+    imgs = make_images(str(src / "img"), GROUPS, size=(320, 240))
+    return fp.group_images_by_prefix(imgs), make_audio(str(src), AUDIO_S), src
+
+
+@pytest.mark.parametrize("green_s", [0, 1])
+def test_pyav_matches_blocks(job, green_s):
+    groups, audio, src = job
+    out = {}
+    for engine in ("blocks", "pyav"):
+        path = str(src / f"{engine}_{green_s}.mp4")
+        fp.generate_final_video(groups, audio, path, green_s, "9x16",
+                                lambda *a: None, engine=engine, profile=PROFILE)
+        out[engine] = _probe(path)
+
+    (dur_b, ts_b), (dur_p, ts_p) = out["blocks"], out["pyav"]
+    assert abs(dur_b - dur_p) <= 0.1 * len(GROUPS)
+
+    tick = 1 / fp.profiles.get(PROFILE)["fps"]
+    ts_b = [t for t in ts_b if not _in_green(t, green_s)]
+    ts_p = [t for t in ts_p if not _in_green(t, green_s)]
+    near = lambda t, ts: any(abs(t - u) <= tick / 2 for u in ts)
+    assert all(near(t, ts_p) for t in ts_b)
+    assert all(near(t, ts_b) for t in ts_p[:-1])   # o último é o frame de fim do pyav
+    assert len(ts_b) >= sum(GROUPS.values())